@@ -74,6 +74,9 @@ async def map_request_to_params(req: JobRequest) -> dict:
         "tex_seed": 1234
     }
     
+    if req.constraints.materials is not None:
+        params["texture_size"] = req.constraints.materials.texture_resolution
+
     # Fix quality.steps if it exists
     if hasattr(req.quality, 'steps'):
         params["num_inference_steps"] = req.quality.steps
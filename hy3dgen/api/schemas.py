@@ -123,7 +123,8 @@ class UV(BaseModel):
 
 class Materials(BaseModel):
     pbr: bool
-    texture_resolution: int
+    # Atlas edge length in texels, 4K and up bake in tiles
+    texture_resolution: int = Field(..., ge=64, le=8192)
     maps: List[MapType]
     single_material: bool
 
@@ -317,6 +318,19 @@ class ChannelPacking(BaseModel):
     preset: Literal["orm", "rma", "none"] = "orm"
     outputs: List[Dict[str, Any]] = Field(default_factory=list)
 
+class GLBExport(BaseModel):
+    compression: Literal["none", "quantize", "draco"] = "none"
+    texture_format: Literal["png", "jpeg", "webp"] = "png"
+    texture_quality: int = Field(90, ge=1, le=100)
+
+class UVUnwrap(BaseModel):
+    # xatlas chart / pack options; 0 keeps the xatlas default
+    resolution: int = Field(0, ge=0, le=16384)
+    padding: int = Field(0, ge=0, le=64)
+    max_chart_size: int = Field(0, ge=0)
+    brute_force: bool = False
+    max_iterations: int = Field(1, ge=1, le=16)
+
 class MeshOpsMaterials(Materials):
     # Extension of base materials with extra Ops configs
     atlas: bool = False
@@ -329,6 +343,8 @@ class MeshOpsConstraints(Constraints):
     naming: Optional[Naming] = None
     file_safety: Optional[FileSafety] = None
     blend_policy: Optional[BlendPolicy] = None
+    glb_export: Optional[GLBExport] = None
+    uv_unwrap: Optional[UVUnwrap] = None
 
 class Engine(BaseModel):
     engine_version: Optional[str] = None
@@ -2,9 +2,10 @@ import httpx
 import os
 import logging
 from PIL import Image
-from io import BytesIO
 from urllib.parse import urlparse
 
+from hy3dgen.image_io import MAX_IMAGE_SIDE, load_image
+
 logger = logging.getLogger("hy3dgen.api.utils")
 
 # [SECURITY] Allowed zones for local file access
@@ -61,7 +62,8 @@ async def download_file(uri: str) -> bytes:
     else:
         raise ValueError(f"Unsupported URI scheme: {parsed.scheme}")
 
-async def download_image_as_pil(uri: str) -> Image.Image:
+async def download_image_as_pil(uri: str, max_side: int = MAX_IMAGE_SIDE) -> Image.Image:
+    """Image at uri, decoded at most max_side px wide and high, RGBA if it has transparency."""
     data = await download_file(uri)
-    return Image.open(BytesIO(data)).convert("RGB")
+    return load_image(data, max_side=max_side)
 
@@ -38,6 +38,9 @@ def create_app(args=None):
          parser.add_argument('--host', type=str, default='127.0.0.1')
          parser.add_argument('--device', type=str, default='cuda')
          parser.add_argument('--low_vram_mode', action='store_true', default=True)
+         parser.add_argument('--quantization', type=str, default=None, choices=['int8'])
+         parser.add_argument('--compile', action='store_true')
+         parser.add_argument('--rembg_model', type=str, default='u2net')
          args, _ = parser.parse_known_args()
 
     logger.info(f"Initializing Archeon 3D API Server on {args.host}:{args.port}")
@@ -56,7 +59,10 @@ def create_app(args=None):
             device=args.device, 
             enable_t2i=True, 
             enable_tex=True, 
-            low_vram_mode=args.low_vram_mode
+            low_vram_mode=args.low_vram_mode,
+            quantization=getattr(args, 'quantization', None),
+            compile=getattr(args, 'compile', False),
+            rembg_model=getattr(args, 'rembg_model', 'u2net')
         )
     
     model_mgr.register_model("Normal", get_loader(args.model_path, args.subfolder))
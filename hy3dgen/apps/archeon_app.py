@@ -18,6 +18,8 @@ from contextlib import asynccontextmanager
 # Internal Modular Imports
 from hy3dgen.manager import ModelManager, PriorityRequestManager
 from hy3dgen.inference import InferencePipeline
+from hy3dgen.image_io import load_image
+from hy3dgen.meshops import export_ops
 from hy3dgen.apps.ui_templates import CSS_STYLES, HTML_TEMPLATE_MODEL_VIEWER, HTML_PLACEHOLDER, HTML_ERROR_TEMPLATE
 from hy3dgen.utils.system import setup_logging, get_user_cache_dir, find_free_port
 
@@ -28,6 +30,7 @@ logger = setup_logging("archeon_app")
 SAVE_DIR = str(get_user_cache_dir() / "gradio_cache")
 HAS_T2I = False
 HAS_TEXTUREGEN = True
+GLB_EXPORT_OPTIONS = None
 request_manager = None
 i18n = {'msg_stop_confirm': 'Are you sure you want to stop generation?'}
 
@@ -57,7 +60,10 @@ def export_mesh(mesh, folder, textured=False, file_type='glb'):
     filename = "textured_mesh" if textured else "white_mesh"
     path = os.path.join(folder, f"{filename}.{file_type}")
     
-    if textured:
+    if file_type == 'glb' and GLB_EXPORT_OPTIONS:
+        # Streaming writer with mesh/texture compression
+        export_ops.export_glb(mesh, path, **GLB_EXPORT_OPTIONS)
+    elif textured:
         try:
            # Trimesh export
            mesh.export(path)
@@ -111,6 +117,13 @@ async def unified_generation(
     if image is None and not caption:
         raise gr.Error("Please provide an Image or a Text Prompt.")
 
+    # Uploads arrive as file paths and are decoded here, at the resolution the pipeline needs
+    if isinstance(image, str):
+        try:
+            image = load_image(image)
+        except (ValueError, OSError) as e:
+            raise gr.Error(f"Could not read the image: {e}")
+
     # Seed
     if randomize_seed:
         seed = np.random.randint(0, 2**32)
@@ -164,7 +177,7 @@ async def unified_generation(
         if mesh is None:
              raise ValueError("Generation finished but returned No Mesh.")
 
-        path = export_mesh(mesh, save_folder, textured=HAS_TEXTUREGEN, file_type=export_format)
+        path = await export_ops.run_export(export_mesh, mesh, save_folder, textured=HAS_TEXTUREGEN, file_type=export_format)
         
         if not os.path.exists(path) or os.path.getsize(path) == 0:
              raise ValueError(f"Exported file missing/empty: {path}")
@@ -215,7 +228,7 @@ def build_app():
                 
                 with gr.Tabs():
                     with gr.Tab("Image Prompt"):
-                        image_input = gr.Image(label="Input Image", type="pil", height=300)
+                        image_input = gr.Image(label="Input Image", type="filepath", image_mode=None, height=300)
                         
                     with gr.Tab("Text Prompt"):
                         caption_input = gr.Textbox(label="Prompt", placeholder="A 3D model of...")
@@ -299,7 +312,7 @@ def _maybe_open_browser(host: str, port: int, open_browser: bool) -> None:
 # --- Main Entry Point ---
 
 def main():
-    global request_manager, SAVE_DIR, HAS_T2I, HAS_TEXTUREGEN
+    global request_manager, SAVE_DIR, HAS_T2I, HAS_TEXTUREGEN, GLB_EXPORT_OPTIONS
     
     parser = argparse.ArgumentParser()
     parser.add_argument("--model_path", type=str, default='tencent/Hunyuan3D-2')
@@ -312,7 +325,17 @@ def main():
     parser.add_argument('--enable_t23d', action='store_true')
     parser.add_argument('--disable_tex', action='store_true')
     parser.add_argument('--low_vram_mode', action='store_true', default=True)
+    parser.add_argument('--quantization', type=str, default=None, choices=['int8'],
+                        help='Weight-only quantization of the shape and paint models')
+    parser.add_argument('--compile', action='store_true',
+                        help='torch.compile the shape model, compiled at startup and cached on disk')
+    parser.add_argument('--rembg_model', type=str, default='u2net',
+                        help='rembg model for background removal, e.g. u2netp for speed')
     parser.add_argument('--no_open_browser', action='store_true', help='Disable auto-opening the browser')
+    parser.add_argument('--glb_compression', type=str, default='none', choices=export_ops.GLB_COMPRESSION,
+                        help='Geometry compression for GLB exports')
+    parser.add_argument('--glb_texture_format', type=str, default='png', choices=export_ops.TEXTURE_FORMATS,
+                        help='Texture encoding for GLB exports')
     args = parser.parse_args()
 
     # Config Globals
@@ -322,6 +345,8 @@ def main():
     
     HAS_T2I = args.enable_t23d
     HAS_TEXTUREGEN = not args.disable_tex
+    if args.glb_compression != 'none' or args.glb_texture_format != 'png':
+        GLB_EXPORT_OPTIONS = {"compression": args.glb_compression, "texture_format": args.glb_texture_format}
 
     # Environment Log
     logger.info(f"Archeon 3D Legacy UI Startup. Device: {args.device}")
@@ -343,7 +368,8 @@ def main():
         return lambda: InferencePipeline(
             model_path=model_path, tex_model_path=args.texgen_model_path, subfolder=subfolder,
             device=args.device, enable_t2i=HAS_T2I, enable_tex=HAS_TEXTUREGEN,
-            low_vram_mode=args.low_vram_mode
+            low_vram_mode=args.low_vram_mode, quantization=args.quantization, compile=args.compile,
+            rembg_model=args.rembg_model
         )
     model_mgr.register_model("Normal", get_loader("tencent/Hunyuan3D-2", "hunyuan3d-dit-v2-0-turbo"))
     
@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+
+def _tensor_digest(hasher, tensor: torch.Tensor):
+    tensor = tensor.detach().contiguous()
+    hasher.update(f"{tuple(tensor.shape)}{tensor.dtype}".encode())
+    hasher.update(tensor.view(-1).view(torch.uint8).cpu().numpy().tobytes())
+
+
+def module_fingerprint(module: nn.Module) -> str:
+    """Content hash of a module's class, config, weights and their placement."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(type(module).__qualname__.encode())
+    config = getattr(module, "config", None)
+    if config is not None and hasattr(config, "to_json_string"):
+        hasher.update(config.to_json_string(use_diff=False).encode())
+    for name, tensor in module.state_dict().items():
+        hasher.update(f"{name}@{tensor.device}".encode())
+        _tensor_digest(hasher, tensor)
+    return hasher.hexdigest()
+
+
+class EncoderRegistry:
+    """
+    Frozen vision backbones shared by every pipeline of the process. share() hands out one
+    device-resident instance per set of identical weights, so two pipelines built on the same
+    DINO or CLIP checkpoint hold one copy. Inside feature_cache(), the scope of one job, a
+    backbone's features are memoized per input image.
+    """
+
+    def __init__(self):
+        # Weak values: a backbone is freed with the last pipeline using it
+        self._backbones = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        # Jobs run on worker threads, each with its own feature cache
+        self._local = threading.local()
+
+    def share(self, backbone: nn.Module) -> nn.Module:
+        """
+        The registered backbone with the same weights, dtype and device as `backbone`,
+        registering `backbone` if there is none. Call it after the backbone's final .to(),
+        as later moves of a shared backbone affect every pipeline holding it.
+        """
+        fingerprint = module_fingerprint(backbone)
+        with self._lock:
+            shared = self._backbones.get(fingerprint)
+            if shared is None:
+                self._backbones[fingerprint] = backbone
+                return backbone
+        if shared is not backbone:
+            logger.info(f"Sharing an already loaded {type(backbone).__name__} instead of a second copy")
+        return shared
+
+    def __len__(self):
+        return len(self._backbones)
+
+    @contextmanager
+    def feature_cache(self):
+        outer = getattr(self._local, "features", None)
+        if outer is not None:
+            # Nested scopes belong to the same job
+            yield self
+            return
+        self._local.features = {}
+        try:
+            yield self
+        finally:
+            self._local.features = None
+
+    def cached_features(self, backbone: nn.Module, inputs: torch.Tensor,
+                        compute: Callable[[], torch.Tensor]) -> torch.Tensor:
+        cache: Optional[Dict] = getattr(self._local, "features", None)
+        if cache is None or torch.is_grad_enabled():
+            return compute()
+        hasher = hashlib.blake2b(digest_size=16)
+        _tensor_digest(hasher, inputs)
+        key = (id(backbone), hasher.hexdigest())
+        entry = cache.get(key)
+        # Holding the backbone keeps its id unique for the comparison
+        if entry is not None and entry[0] is backbone:
+            return entry[1]
+        features = compute()
+        cache[key] = (backbone, features)
+        return features
+
+
+encoder_registry = EncoderRegistry()
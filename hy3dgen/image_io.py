@@ -0,0 +1,57 @@
+import logging
+from io import BytesIO
+from typing import BinaryIO, Union
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side images are handed on at. Condition images are cropped to the object and
+# resized to ~512 px, so this leaves headroom for objects filling only part of the frame.
+MAX_IMAGE_SIDE = 1024
+# Headers claiming a larger side are rejected outright
+MAX_IMAGE_DIMENSION = 32768
+# Pixels actually decoded, i.e. after the JPEG decoder's reduction
+MAX_DECODED_PIXELS = 64 * 1024 * 1024
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+def _reduced_size(size, max_side):
+    width, height = size
+    scale = max_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def load_image(source: Union[bytes, str, BinaryIO], max_side: int = MAX_IMAGE_SIDE,
+               max_pixels: int = MAX_DECODED_PIXELS) -> Image.Image:
+    """
+    Decode an uploaded image with its longest side at most `max_side`.
+
+    Image.open only parses the header, so dimensions are checked before any pixel is decoded.
+    JPEGs are decoded by libjpeg at the smallest 1/2, 1/4 or 1/8 scale that still covers
+    `max_side` (Image.draft); other formats decode fully, which `max_pixels` bounds, and are
+    downscaled with the integer reduce() before resampling. EXIF orientation is applied and an
+    alpha channel is kept, the result is RGBA if the image has transparency and RGB otherwise.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    with Image.open(source) as image:
+        width, height = image.size
+        if max(width, height) > MAX_IMAGE_DIMENSION:
+            raise ImageTooLargeError(f"Image dimensions {width}x{height} exceed {MAX_IMAGE_DIMENSION} px.")
+        if max(width, height) > max_side:
+            image.draft(None, _reduced_size(image.size, max_side))
+        decoded_width, decoded_height = image.size
+        if decoded_width * decoded_height > max_pixels:
+            raise ImageTooLargeError(f"Image of {width}x{height} px is too large to decode.")
+        if image.size != (width, height):
+            logger.debug(f"Decoding {width}x{height} {image.format} at {decoded_width}x{decoded_height}")
+        image.load()
+        # convert() copies, the result outlives the file
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    return ImageOps.exif_transpose(image)
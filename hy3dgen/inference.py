@@ -2,13 +2,15 @@ import time
 import torch
 import logging
 import trimesh
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from hy3dgen.encoder_registry import encoder_registry
 from hy3dgen.rembg import BackgroundRemover
 from hy3dgen.shapegen import Hunyuan3DDiTFlowMatchingPipeline, FloaterRemover, DegenerateFaceRemover, FaceReducer
 from hy3dgen.texgen import Hunyuan3DPaintPipeline
 from hy3dgen.text2image import HunyuanDiTPipeline
 from hy3dgen.shapegen.utils import get_logger
+from hy3dgen.meshops.mesh_buffer import MeshBuffer
 
 logger = get_logger("inference")
 
@@ -26,11 +28,18 @@ class InferencePipeline:
                  enable_tex: bool = False,
                  use_flashvdm: bool = True,
                  mc_algo: str = 'mc',
-                 low_vram_mode: bool = False):
+                 low_vram_mode: bool = False,
+                 quantization: Optional[str] = None,
+                 compile: bool = False,
+                 rembg_model: str = 'u2net'):
         
         self.device = device
+        if low_vram_mode and torch.device(device).type == 'cpu':
+            # Everything already lives in system memory, there is nothing to offload to
+            logger.info("low_vram_mode has no effect on CPU, disabling it.")
+            low_vram_mode = False
         self.low_vram_mode = low_vram_mode
-        self.rembg = BackgroundRemover()
+        self.rembg = BackgroundRemover(model_name=rembg_model)
         
         logger.info(f"Loading ShapeGen model from {model_path}...")
         self.pipeline = Hunyuan3DDiTFlowMatchingPipeline.from_pretrained(
@@ -39,11 +48,16 @@ class InferencePipeline:
             use_safetensors=True,
             device=device,
             low_vram_mode=low_vram_mode,
+            quantization=quantization,
         )
         
         if use_flashvdm:
             self.pipeline.enable_flashvdm(mc_algo=mc_algo)
 
+        if compile:
+            # Graphs are built by warmup(), which ModelManager runs right after loading
+            self.pipeline.compile()
+
         if low_vram_mode:
             logger.info("Enabling CPU offload for ShapeGen model...")
             self.pipeline.enable_model_cpu_offload()
@@ -65,7 +79,8 @@ class InferencePipeline:
             self.pipeline_tex = Hunyuan3DPaintPipeline.from_pretrained(
                 tex_model_path, 
                 subfolder='hunyuan3d-paint-v2-0-turbo',
-                low_vram_mode=low_vram_mode
+                low_vram_mode=low_vram_mode,
+                quantization=quantization
             )
             if low_vram_mode:
                 logger.info("Enabling CPU offload for TexGen model...")
@@ -77,11 +92,20 @@ class InferencePipeline:
         self.degenerate_remover = DegenerateFaceRemover()
         self.face_reducer = FaceReducer()
 
+    def warmup(self):
+        """Builds the compiled shape-pipeline graphs ahead of the first request, if compiled."""
+        self.pipeline.warmup()
+
     def generate(self, uid: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Main entry point for generation.
         params: dict containing 'image', 'text', 'seed', 'do_texture', etc.
         """
+        # Image-encoder features are shared by every stage of the job that encodes the same image
+        with encoder_registry.feature_cache():
+            return self._generate(uid, params)
+
+    def _generate(self, uid: str, params: Dict[str, Any]) -> Dict[str, Any]:
         # Helper for progress reporting
         progress_callback = params.get("progress_callback", None)
         cancel_event = params.get("cancel_event", None)
@@ -141,13 +165,8 @@ class InferencePipeline:
              if params.get("do_rembg", True):
                  report_progress(10, "Removing Background (Multi-View)...")
                  t1 = time.time()
-                 new_image = {}
-                 for k, v in image.items():
-                     if v.mode == "RGB": # or check_box_rembg
-                        new_image[k] = self.rembg(v)
-                     else:
-                        new_image[k] = v
-                 image = new_image
+                 # All views in one pass; views that already have an alpha cut-out pass through
+                 image = dict(zip(image.keys(), self.rembg.remove_batch(list(image.values()))))
                  stats['time']['rembg'] = time.time() - t1
         
         # 2. Shape Generation
@@ -207,7 +226,7 @@ class InferencePipeline:
 
         # Convert Latent2MeshOutput to trimesh if needed
         if hasattr(mesh, 'mesh_v') and hasattr(mesh, 'mesh_f'):
-            mesh = trimesh.Trimesh(vertices=mesh.mesh_v, faces=mesh.mesh_f)
+            mesh = MeshBuffer.from_latent(mesh).to_trimesh()
             logger.info(f"[{uid}] Converted Latent2MeshOutput to trimesh")
 
         # Post-processing: Always apply basic cleanup for better quality
@@ -246,6 +265,8 @@ class InferencePipeline:
                     'guidance_scale': params.get("tex_guidance_scale", 5.0),
                     'seed': int(params.get("tex_seed", 0))
                 }
+                if params.get("texture_size"):
+                    tex_kwargs['texture_size'] = int(params["texture_size"])
                 logger.info(f"[{uid}] TexGen Params: {tex_kwargs}")
                 
                 # Ensure pipeline is ready
@@ -63,7 +63,7 @@ class ModelManager:
         # but for simplicity here we assume it's acceptable or wrapped.
         start_time = time.time()
         try:
-            self.workers[model_key] = self.loaders[model_key]()
+            self.workers[model_key] = self._load(model_key)
             self.lru_order.append(model_key)
             logger.info(f"Model '{model_key}' loaded in {time.time() - start_time:.2f}s")
         except Exception as e:
@@ -80,7 +80,7 @@ class ModelManager:
             
             # Retry load
             try:
-                 self.workers[model_key] = self.loaders[model_key]()
+                 self.workers[model_key] = self._load(model_key)
                  self.lru_order.append(model_key)
                  logger.info(f"Model '{model_key}' loaded successfully on retry.")
             except Exception as e2:
@@ -89,6 +89,13 @@ class ModelManager:
 
         return self.workers[model_key]
 
+    def _load(self, model_key: str):
+        worker = self.loaders[model_key]()
+        # Compile warm-up belongs to loading, not to the first request on the model
+        if hasattr(worker, 'warmup'):
+            worker.warmup()
+        return worker
+
     async def offload_lru_model(self):
         """Offload the least recently used model."""
         if not self.lru_order:
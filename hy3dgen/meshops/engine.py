@@ -11,7 +11,7 @@ from PIL import Image
 
 from hy3dgen.api.schemas import MeshOpsRequest, JobResponse, JobStatus, Artifact, ArtifactType, Operation, MapType
 from hy3dgen.api.utils import download_file, download_image_as_pil
-from . import ops
+from . import ops, lod_ops, export_ops
 
 logger = logging.getLogger("meshops.engine")
 
@@ -135,6 +135,9 @@ class MeshOpsEngine:
         # 3. Sort
         sorted_pipeline = self._topological_sort(pipeline)
         
+        uv_cfg = req.constraints.uv_unwrap
+        uv_options = uv_cfg.model_dump() if uv_cfg else None
+
         # 4. Execute
         report_ops = []
         for op_def in sorted_pipeline:
@@ -157,8 +160,7 @@ class MeshOpsEngine:
                         meshes[mid] = ops.cleanup_mesh(mesh, params)
                     elif op_type == "decimate":
                         target_faces = params.get("target_tris", 10000)
-                        if len(mesh.faces) > target_faces:
-                            meshes[mid] = mesh.simplify_quadratic_decimation(target_faces)
+                        meshes[mid] = lod_ops.decimate_mesh(mesh, target_faces)
                     elif op_type == "auto_texture":
                         from . import tex_ops
                         images = []
@@ -175,6 +177,13 @@ class MeshOpsEngine:
                         mgr = get_manager()
                         inf_pipe = await mgr.get_worker("Normal")
                         tex_pipe = getattr(inf_pipe, "pipeline_tex", None)
+                        if uv_options and "uv_unwrap" not in params:
+                            params = {**params, "uv_unwrap": uv_options}
+                        materials = req.constraints.materials
+                        if materials and "texture_size" not in params:
+                            params = {**params, "texture_size": materials.texture_resolution}
+                        if materials and materials.auto_texturing and "upscale" not in params:
+                            params = {**params, "upscale": materials.auto_texturing.upscale}
                         meshes[mid] = await tex_ops.apply_auto_texture(mesh, tex_pipe, image_input, params)
                         
                     elif op_type == "channel_packing":
@@ -209,10 +218,20 @@ class MeshOpsEngine:
                         else:
                             high_mesh = meshes[high_id]
                         
+                        # Request-level BakingConfig provides defaults, op params override
+                        materials = req.constraints.materials
+                        baking = materials.baking if materials and materials.baking else None
+
                         try:
-                            bake_maps = params.get("maps", ["normal", "ao"])
+                            bake_maps = params.get("maps", baking.maps if baking else ["normal", "ao"])
                             resolution = params.get("resolution", 2048)
-                            results = await tex_ops.bake_maps_native(high_mesh, mesh, bake_maps, resolution=resolution)
+                            results = await tex_ops.bake_maps_native(
+                                high_mesh, mesh, bake_maps, resolution=resolution,
+                                ray_distance=params.get("ray_distance", baking.ray_distance if baking else 0.0),
+                                antialiasing=params.get("antialiasing", baking.antialiasing if baking else "none"),
+                                ao_samples=params.get("ao_samples", 16),
+                                uv_options=params.get("uv_unwrap", uv_options),
+                            )
                             
                             for mname, mpath in results.items():
                                 fname = f"{req.output.artifact_prefix}_{mid}_baked_{mname}.png"
@@ -243,16 +262,53 @@ class MeshOpsEngine:
         out_artifacts = []
         out_fmt = (req.constraints.target_formats[0].value if req.constraints.target_formats else "glb")
         
+        lod_cfg = req.constraints.lod
+        glb_cfg = req.constraints.glb_export
+        glb_options = glb_cfg.model_dump() if glb_cfg else None
+
+        # Exports run concurrently on the export worker pool, one per entry of out_artifacts
+        exports = []
         for mid, mesh in meshes.items():
             fname = f"{req.output.artifact_prefix}_{mid}.{out_fmt}"
             fpath = f"/tmp/{fname}"
-            ops.export_mesh(mesh, fpath, out_fmt)
+            if lod_cfg and lod_cfg.generate:
+                levels = lod_ops.normalize_levels(lod_cfg.levels)
+                lods = await asyncio.to_thread(lod_ops.generate_lod_chain, mesh, levels)
+                lod_faces = [len(lod.faces) for lod in lods]
+                if out_fmt == "glb":
+                    # All levels in one file via MSFT_lod
+                    exports.append(export_ops.run_export(lod_ops.export_lod_glb, lods, fpath, levels,
+                                                         **(glb_options or {})))
+                    out_artifacts.append(Artifact(
+                        type=ArtifactType.MESH,
+                        format=out_fmt,
+                        uri=fpath,
+                        metadata={"mesh_id": mid, "lod_levels": levels, "lod_faces": lod_faces}
+                    ))
+                else:
+                    for i, (ratio, lod) in enumerate(zip(levels, lods)):
+                        lod_path = f"/tmp/{req.output.artifact_prefix}_{mid}_lod{i}.{out_fmt}"
+                        exports.append(export_ops.run_export(ops.export_mesh, lod, lod_path, out_fmt))
+                        out_artifacts.append(Artifact(
+                            type=ArtifactType.MESH,
+                            format=out_fmt,
+                            uri=lod_path,
+                            metadata={"mesh_id": mid, "lod": i, "lod_ratio": ratio, "faces": lod_faces[i]}
+                        ))
+                continue
+
+            exports.append(export_ops.run_export(ops.export_mesh, mesh, fpath, out_fmt, glb_options))
             out_artifacts.append(Artifact(
                 type=ArtifactType.MESH,
                 format=out_fmt,
                 uri=fpath,
                 metadata={"mesh_id": mid}
             ))
+        # GLB writer exports return the compression actually applied, e.g. "quantize" when
+        # "draco" was requested without DracoPy
+        for artifact, compression in zip(out_artifacts, await asyncio.gather(*exports)):
+            if compression is not None:
+                artifact.metadata["compression"] = compression
             
         out_artifacts.extend(extra_artifacts)
         
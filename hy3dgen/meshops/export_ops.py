@@ -0,0 +1,362 @@
+import io
+import os
+import json
+import struct
+import asyncio
+import functools
+import logging
+import numpy as np
+import trimesh
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, Union
+
+logger = logging.getLogger("meshops.export_ops")
+
+GLB_COMPRESSION = ("none", "quantize", "draco")
+TEXTURE_FORMATS = ("png", "jpeg", "webp")
+
+EXPORT_WORKERS = int(os.environ.get("HY3DGEN_EXPORT_WORKERS", max(1, min(4, os.cpu_count() or 1))))
+
+# Draco quantization, matching gltf-pipeline defaults
+DRACO_POSITION_BITS = 14
+DRACO_TEXCOORD_BITS = 12
+DRACO_NORMAL_BITS = 10
+DRACO_COMPRESSION_LEVEL = 7
+
+# glTF constants
+_BYTE, _UNSIGNED_BYTE, _SHORT, _UNSIGNED_SHORT, _UNSIGNED_INT, _FLOAT = 5120, 5121, 5122, 5123, 5125, 5126
+_ARRAY_BUFFER, _ELEMENT_ARRAY_BUFFER = 34962, 34963
+_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+_MIME = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+_PIL_FORMAT = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+# Draco attribute_type -> glTF attribute
+_DRACO_ATTRIBUTES = {0: "POSITION", 1: "NORMAL", 2: "COLOR_0", 3: "TEXCOORD_0"}
+
+_pool = None
+
+def _export_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="mesh_export")
+    return _pool
+
+def _pad4(n: int) -> int:
+    return (4 - n % 4) % 4
+
+class _GLBBuilder:
+    """
+    Collects glTF JSON and binary blobs. Blobs are kept as separate arrays and only
+    written out in `write`, so the BIN chunk is never assembled in memory.
+    """
+    def __init__(self):
+        self.gltf = {"asset": {"version": "2.0", "generator": "hy3dgen.meshops"},
+                     "scene": 0, "scenes": [{"nodes": [0]}], "nodes": [], "meshes": [],
+                     "accessors": [], "bufferViews": [], "buffers": []}
+        self.blobs = []
+        self.offset = 0
+        self.used = set()
+        self.required = set()
+
+    def use(self, extension: str, required: bool = False):
+        self.used.add(extension)
+        if required:
+            self.required.add(extension)
+
+    def add_blob(self, data: Union[bytes, np.ndarray], target: Optional[int] = None,
+                 stride: Optional[int] = None) -> int:
+        view = memoryview(data).cast("B") if isinstance(data, np.ndarray) else memoryview(data)
+        buffer_view = {"buffer": 0, "byteOffset": self.offset, "byteLength": view.nbytes}
+        if target is not None:
+            buffer_view["target"] = target
+        if stride is not None:
+            buffer_view["byteStride"] = stride
+        self.blobs.append(view)
+        self.offset += view.nbytes + _pad4(view.nbytes)
+        self.gltf["bufferViews"].append(buffer_view)
+        return len(self.gltf["bufferViews"]) - 1
+
+    def add_accessor(self, component_type: int, count: int, components: int,
+                     buffer_view: Optional[int] = None, normalized: bool = False,
+                     minmax: Optional[np.ndarray] = None) -> int:
+        accessor = {"componentType": component_type, "count": int(count), "type": _TYPES[components]}
+        if buffer_view is not None:
+            accessor["bufferView"] = buffer_view
+        if normalized:
+            accessor["normalized"] = True
+        if minmax is not None:
+            accessor["min"] = minmax.min(axis=0).tolist()
+            accessor["max"] = minmax.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_array(self, arr: np.ndarray, component_type: int, components: int, target: int,
+                  normalized: bool = False, minmax: bool = False, stride: Optional[int] = None) -> int:
+        arr = np.ascontiguousarray(arr)
+        bv = self.add_blob(arr, target=target, stride=stride)
+        values = arr[:, :components] if arr.ndim == 2 else arr.reshape(-1, 1)
+        return self.add_accessor(component_type, len(arr) if arr.ndim == 2 else arr.size, components,
+                                 buffer_view=bv, normalized=normalized,
+                                 minmax=values if minmax else None)
+
+    def write(self, f: BinaryIO):
+        self.gltf["buffers"] = [{"byteLength": self.offset}] if self.offset else []
+        if not self.gltf["bufferViews"]:
+            del self.gltf["bufferViews"]
+        if self.used:
+            self.gltf["extensionsUsed"] = sorted(self.used)
+        if self.required:
+            self.gltf["extensionsRequired"] = sorted(self.required)
+
+        json_chunk = json.dumps(self.gltf, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * _pad4(len(json_chunk))
+        total = 12 + 8 + len(json_chunk) + (8 + self.offset if self.offset else 0)
+
+        f.write(struct.pack("<4sII", b"glTF", 2, total))
+        f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+        f.write(json_chunk)
+        if self.offset:
+            f.write(struct.pack("<I4s", self.offset, b"BIN\x00"))
+            for view in self.blobs:
+                f.write(view)
+                f.write(b"\x00" * _pad4(view.nbytes))
+
+def _encode_image(image, texture_format: str, quality: int):
+    """Returns (bytes, format actually used). JPEG falls back to PNG for images with alpha."""
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    if texture_format == "jpeg" and "A" in image.getbands():
+        texture_format = "png"
+    buf = io.BytesIO()
+    if texture_format == "png":
+        image.save(buf, format="PNG", optimize=False)
+    else:
+        image.save(buf, format=_PIL_FORMAT[texture_format], quality=quality)
+    return buf.getvalue(), texture_format
+
+def _add_texture(builder: _GLBBuilder, image, texture_format: str, quality: int) -> int:
+    data, fmt = _encode_image(image, texture_format, quality)
+    bv = builder.add_blob(data)
+    gltf = builder.gltf
+    gltf.setdefault("images", []).append({"bufferView": bv, "mimeType": _MIME[fmt]})
+    if "samplers" not in gltf:
+        gltf["samplers"] = [{"magFilter": 9729, "minFilter": 9987, "wrapS": 10497, "wrapT": 10497}]
+    texture = {"sampler": 0}
+    image_index = len(gltf["images"]) - 1
+    if fmt == "webp":
+        texture["extensions"] = {"EXT_texture_webp": {"source": image_index}}
+        builder.use("EXT_texture_webp", required=True)
+    else:
+        texture["source"] = image_index
+    gltf.setdefault("textures", []).append(texture)
+    return len(gltf["textures"]) - 1
+
+def _add_material(builder: _GLBBuilder, material, texture_format: str, quality: int) -> int:
+    if hasattr(material, "to_pbr"):
+        material = material.to_pbr()
+    pbr = {}
+    out = {"pbrMetallicRoughness": pbr}
+
+    if getattr(material, "baseColorFactor", None) is not None:
+        pbr["baseColorFactor"] = (np.asarray(material.baseColorFactor, dtype=np.float64) / 255.0).tolist()
+    if getattr(material, "metallicFactor", None) is not None:
+        pbr["metallicFactor"] = float(material.metallicFactor)
+    if getattr(material, "roughnessFactor", None) is not None:
+        pbr["roughnessFactor"] = float(material.roughnessFactor)
+    if getattr(material, "emissiveFactor", None) is not None:
+        out["emissiveFactor"] = np.asarray(material.emissiveFactor, dtype=np.float64).tolist()
+    if getattr(material, "doubleSided", None):
+        out["doubleSided"] = True
+    if getattr(material, "alphaMode", None):
+        out["alphaMode"] = material.alphaMode
+
+    for attr, parent, key in (("baseColorTexture", pbr, "baseColorTexture"),
+                              ("metallicRoughnessTexture", pbr, "metallicRoughnessTexture"),
+                              ("normalTexture", out, "normalTexture"),
+                              ("occlusionTexture", out, "occlusionTexture"),
+                              ("emissiveTexture", out, "emissiveTexture")):
+        image = getattr(material, attr, None)
+        if image is not None:
+            parent[key] = {"index": _add_texture(builder, image, texture_format, quality)}
+
+    builder.gltf.setdefault("materials", []).append(out)
+    return len(builder.gltf["materials"]) - 1
+
+def _mesh_channels(mesh: trimesh.Trimesh, include_normals: bool):
+    """Per-vertex arrays in glTF conventions (V flipped, RGBA uint8 colors)."""
+    uv = material = colors = None
+    visual = mesh.visual
+    if getattr(visual, "kind", None) == "texture" and getattr(visual, "uv", None) is not None:
+        uv = np.array(visual.uv, dtype=np.float32)
+        uv[:, 1] = 1.0 - uv[:, 1]
+        material = visual.material
+    elif getattr(visual, "kind", None) == "vertex":
+        colors = np.asarray(visual.vertex_colors, dtype=np.uint8)
+    normals = np.asarray(mesh.vertex_normals, dtype=np.float32) if include_normals else None
+    return uv, normals, colors, material
+
+def _quantized_primitive(builder: _GLBBuilder, node: dict, vertices, faces, uv, normals, colors) -> dict:
+    """
+    KHR_mesh_quantization: int16 positions (dequantized through the node transform),
+    int8 normals and uint16 texture coordinates when they fit in [0, 1].
+    """
+    builder.use("KHR_mesh_quantization", required=True)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    center = (lo + hi) / 2.0
+    scale = float(np.max(hi - lo) / 2.0) or 1.0
+    node["translation"] = center.tolist()
+    node["scale"] = [scale, scale, scale]
+
+    # Pad VEC3 int16 / int8 to 4-byte aligned strides
+    pos = np.zeros((len(vertices), 4), dtype=np.int16)
+    pos[:, :3] = np.round((vertices - center) / scale * 32767.0)
+    attributes = {"POSITION": builder.add_array(pos, _SHORT, 3, _ARRAY_BUFFER, normalized=True,
+                                                minmax=True, stride=8)}
+    if normals is not None:
+        nrm = np.zeros((len(normals), 4), dtype=np.int8)
+        nrm[:, :3] = np.round(np.clip(normals, -1.0, 1.0) * 127.0)
+        attributes["NORMAL"] = builder.add_array(nrm, _BYTE, 3, _ARRAY_BUFFER, normalized=True, stride=4)
+    if uv is not None:
+        if uv.min() >= 0.0 and uv.max() <= 1.0:
+            quv = np.round(uv * 65535.0).astype(np.uint16)
+            attributes["TEXCOORD_0"] = builder.add_array(quv, _UNSIGNED_SHORT, 2, _ARRAY_BUFFER, normalized=True)
+        else:
+            attributes["TEXCOORD_0"] = builder.add_array(uv, _FLOAT, 2, _ARRAY_BUFFER)
+    if colors is not None:
+        attributes["COLOR_0"] = builder.add_array(colors, _UNSIGNED_BYTE, 4, _ARRAY_BUFFER, normalized=True)
+    return {"attributes": attributes}
+
+def _plain_primitive(builder: _GLBBuilder, vertices, uv, normals, colors) -> dict:
+    attributes = {"POSITION": builder.add_array(vertices, _FLOAT, 3, _ARRAY_BUFFER, minmax=True)}
+    if normals is not None:
+        attributes["NORMAL"] = builder.add_array(normals, _FLOAT, 3, _ARRAY_BUFFER)
+    if uv is not None:
+        attributes["TEXCOORD_0"] = builder.add_array(uv, _FLOAT, 2, _ARRAY_BUFFER)
+    if colors is not None:
+        attributes["COLOR_0"] = builder.add_array(colors, _UNSIGNED_BYTE, 4, _ARRAY_BUFFER, normalized=True)
+    return {"attributes": attributes}
+
+def _draco_primitive(builder: _GLBBuilder, vertices, faces, uv, normals, colors) -> dict:
+    """KHR_draco_mesh_compression. Accessors carry no bufferView; counts come from the decoded payload."""
+    import DracoPy
+
+    blob = DracoPy.encode(vertices.astype(np.float64), faces,
+                          quantization_bits=DRACO_POSITION_BITS,
+                          compression_level=DRACO_COMPRESSION_LEVEL,
+                          tex_coord=None if uv is None else uv.astype(np.float64),
+                          tex_coord_quantization_bits=DRACO_TEXCOORD_BITS,
+                          normals=None if normals is None else normals.astype(np.float64),
+                          normal_quantization_bits=DRACO_NORMAL_BITS,
+                          colors=colors)
+    # Draco may dedupe points and assigns its own attribute ids; read both back
+    decoded = DracoPy.decode(blob)
+    builder.use("KHR_draco_mesh_compression", required=True)
+
+    count = len(decoded.points)
+    attributes, draco_ids = {}, {}
+    for attr in decoded.attributes:
+        name = _DRACO_ATTRIBUTES.get(attr["attribute_type"])
+        if name is None:
+            continue
+        if name == "POSITION":
+            acc = builder.add_accessor(_FLOAT, count, 3, minmax=np.asarray(decoded.points))
+        elif name == "COLOR_0":
+            acc = builder.add_accessor(_UNSIGNED_BYTE, count, 4, normalized=True)
+        else:
+            acc = builder.add_accessor(_FLOAT, count, attr["num_components"])
+        attributes[name] = acc
+        draco_ids[name] = int(attr["unique_id"])
+
+    n_indices = int(np.asarray(decoded.faces).size)
+    index_type = _UNSIGNED_SHORT if count < 65536 else _UNSIGNED_INT
+    indices = builder.add_accessor(index_type, n_indices, 1)
+    bv = builder.add_blob(blob)
+    return {"attributes": attributes, "indices": indices,
+            "extensions": {"KHR_draco_mesh_compression": {"bufferView": bv, "attributes": draco_ids}}}
+
+def resolve_glb_options(compression: str = "none", texture_format: str = "png") -> str:
+    """Validates GLB export options and returns the compression that will actually be used."""
+    if compression not in GLB_COMPRESSION:
+        raise ValueError(f"Unknown GLB compression: {compression}")
+    if texture_format not in TEXTURE_FORMATS:
+        raise ValueError(f"Unknown texture format: {texture_format}")
+    if compression == "draco":
+        try:
+            import DracoPy  # noqa: F401
+        except ImportError:
+            logger.warning("DracoPy not found. Falling back to KHR_mesh_quantization.")
+            compression = "quantize"
+    return compression
+
+def _add_mesh_node(builder: _GLBBuilder, mesh: trimesh.Trimesh, name: str, compression: str,
+                   texture_format: str, texture_quality: int, include_normals: bool,
+                   materials: dict) -> int:
+    """
+    Appends `mesh` as a new node and mesh, returns the node index. `materials` maps
+    id(material) to its glTF index, so meshes sharing a material share its textures.
+    """
+    if isinstance(mesh, trimesh.Scene):
+        mesh = mesh.to_geometry()
+
+    vertices = np.asarray(mesh.vertices, dtype=np.float32)
+    faces = np.asarray(mesh.faces)
+    uv, normals, colors, material = _mesh_channels(mesh, include_normals)
+
+    node = {"mesh": len(builder.gltf["meshes"]), "name": name}
+    builder.gltf["nodes"].append(node)
+
+    if compression == "draco":
+        primitive = _draco_primitive(builder, vertices, faces, uv, normals, colors)
+    else:
+        if compression == "quantize":
+            primitive = _quantized_primitive(builder, node, vertices, faces, uv, normals, colors)
+        else:
+            primitive = _plain_primitive(builder, vertices, uv, normals, colors)
+        if len(vertices) < 65536:
+            primitive["indices"] = builder.add_array(faces.astype(np.uint16).reshape(-1), _UNSIGNED_SHORT, 1,
+                                                     _ELEMENT_ARRAY_BUFFER)
+        else:
+            primitive["indices"] = builder.add_array(faces.astype(np.uint32).reshape(-1), _UNSIGNED_INT, 1,
+                                                     _ELEMENT_ARRAY_BUFFER)
+    primitive["mode"] = 4
+
+    if material is not None:
+        if id(material) not in materials:
+            materials[id(material)] = _add_material(builder, material, texture_format, texture_quality)
+        primitive["material"] = materials[id(material)]
+    builder.gltf["meshes"].append({"primitives": [primitive]})
+    return len(builder.gltf["nodes"]) - 1
+
+def _write_glb(builder: _GLBBuilder, file_obj: Union[str, BinaryIO]):
+    if isinstance(file_obj, str):
+        with open(file_obj, "wb") as f:
+            builder.write(f)
+    else:
+        builder.write(file_obj)
+
+def export_glb(mesh: trimesh.Trimesh, file_obj: Union[str, BinaryIO], compression: str = "none",
+               texture_format: str = "png", texture_quality: int = 90, include_normals: bool = True):
+    """
+    Writes a single-mesh GLB directly to `file_obj` (a path or a writable binary stream).
+
+    compression: "none" (float32 attributes), "quantize" (KHR_mesh_quantization) or
+    "draco" (KHR_draco_mesh_compression, needs DracoPy; falls back to "quantize").
+    texture_format: "png", "jpeg" or "webp" (EXT_texture_webp).
+    Returns the compression actually applied.
+    """
+    compression = resolve_glb_options(compression, texture_format)
+    if isinstance(mesh, trimesh.Scene):
+        mesh = mesh.to_geometry()
+    builder = _GLBBuilder()
+    _add_mesh_node(builder, mesh, getattr(mesh, "metadata", {}).get("name", "mesh"), compression,
+                   texture_format, texture_quality, include_normals, materials={})
+    _write_glb(builder, file_obj)
+    return compression
+
+async def run_export(fn, *args, **kwargs):
+    """Runs an export callable on the shared export worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_export_pool(), functools.partial(fn, *args, **kwargs))
+
+async def export_glb_async(mesh: trimesh.Trimesh, file_obj: Union[str, BinaryIO], **kwargs):
+    return await run_export(export_glb, mesh, file_obj, **kwargs)
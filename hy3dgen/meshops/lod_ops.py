@@ -0,0 +1,162 @@
+import logging
+import numpy as np
+import trimesh
+from typing import List, Optional
+
+from . import export_ops
+
+logger = logging.getLogger("meshops.lod_ops")
+
+DEFAULT_LOD_LEVELS = [1.0, 0.5, 0.25, 0.1]
+
+# Same settings as shapegen.postprocessors.reduce_face
+QUADRIC_PARAMS = dict(
+    qualitythr=1.0,
+    preserveboundary=True,
+    boundaryweight=3,
+    preservenormal=True,
+    preservetopology=True,
+    autoclean=True,
+)
+
+# The texture-aware variant has no topology / autoclean options
+TEXTURE_QUADRIC_PARAMS = dict(
+    qualitythr=1.0,
+    preserveboundary=True,
+    boundaryweight=3,
+    preservenormal=True,
+)
+
+def normalize_levels(levels: Optional[List[float]]) -> List[float]:
+    """
+    Sorts LOD ratios from finest to coarsest and drops values outside (0, 1].
+    """
+    levels = [float(level) for level in (levels or DEFAULT_LOD_LEVELS) if 0.0 < float(level) <= 1.0]
+    levels = sorted(set(levels), reverse=True)
+    return levels or [1.0]
+
+class _QuadricSimplifier:
+    """
+    Progressive quadric edge-collapse simplifier.
+
+    The mesh is uploaded once and every call continues collapsing from the current
+    state, so a chain of targets costs one pass down to the coarsest level instead of
+    one full-resolution decimation per level. Uses pymeshlab when available and falls
+    back to trimesh's simplify_quadric_decimation on the previous level otherwise.
+
+    Textured meshes are welded by position with their UVs moved to the face corners,
+    so collapses can cross UV seams, and decimated with the texture-aware filter.
+    Levels come back split along the seams again and share the input's material.
+    """
+    def __init__(self, mesh: trimesh.Trimesh):
+        self.mesh = mesh
+        visual = mesh.visual
+        self.textured = getattr(visual, "kind", None) == "texture" and getattr(visual, "uv", None) is not None
+        try:
+            import pymeshlab
+            kwargs = {}
+            if self.textured:
+                kwargs["v_tex_coords_matrix"] = np.asarray(visual.uv, dtype=np.float64)
+            self.ms = pymeshlab.MeshSet()
+            self.ms.add_mesh(pymeshlab.Mesh(vertex_matrix=np.asarray(mesh.vertices, dtype=np.float64),
+                                            face_matrix=np.asarray(mesh.faces, dtype=np.int32), **kwargs))
+            if self.textured:
+                self.ms.apply_filter("compute_texcoord_transfer_vertex_to_wedge")
+                self.ms.apply_filter("meshing_remove_duplicate_vertices")
+        except ImportError:
+            logger.warning("pymeshlab not found. Falling back to trimesh quadric decimation.")
+            if self.textured:
+                logger.warning("Decimated levels will carry geometry only, without UVs.")
+            self.ms = None
+
+    @property
+    def face_count(self) -> int:
+        if self.ms is not None:
+            return self.ms.current_mesh().face_number()
+        return len(self.mesh.faces)
+
+    def _textured_level(self, current) -> trimesh.Trimesh:
+        faces = current.face_matrix()
+        wedge_uv = current.wedge_tex_coord_matrix()
+        # One output vertex per distinct (vertex, uv) corner, i.e. split along UV seams
+        corners = np.column_stack([faces.reshape(-1, 1).astype(np.float64), wedge_uv])
+        unique, inverse = np.unique(corners, axis=0, return_inverse=True)
+        lod = trimesh.Trimesh(vertices=current.vertex_matrix()[unique[:, 0].astype(np.int64)],
+                              faces=inverse.reshape(-1, 3), process=False)
+        lod.visual = trimesh.visual.TextureVisuals(uv=unique[:, 1:], material=self.mesh.visual.material)
+        return lod
+
+    def simplify_to(self, target_faces: int) -> trimesh.Trimesh:
+        if target_faces < self.face_count:
+            if self.ms is None:
+                self.mesh = self.mesh.simplify_quadric_decimation(face_count=int(target_faces))
+            elif self.textured:
+                self.ms.apply_filter("meshing_decimation_quadric_edge_collapse_with_texture",
+                                     targetfacenum=int(target_faces), **TEXTURE_QUADRIC_PARAMS)
+            else:
+                self.ms.apply_filter("meshing_decimation_quadric_edge_collapse",
+                                     targetfacenum=int(target_faces), **QUADRIC_PARAMS)
+
+        if self.ms is not None:
+            current = self.ms.current_mesh()
+            if self.textured:
+                return self._textured_level(current)
+            return trimesh.Trimesh(vertices=current.vertex_matrix(), faces=current.face_matrix(), process=False)
+        return self.mesh.copy()
+
+def decimate_mesh(mesh: trimesh.Trimesh, target_faces: int) -> trimesh.Trimesh:
+    """
+    Single-target quadric decimation. No-op if the mesh is already below target.
+    """
+    if len(mesh.faces) <= target_faces:
+        return mesh
+    return _QuadricSimplifier(mesh).simplify_to(target_faces)
+
+def generate_lod_chain(mesh: trimesh.Trimesh, levels: Optional[List[float]] = None) -> List[trimesh.Trimesh]:
+    """
+    Builds the LOD chain for `levels` (face ratios of the input, e.g. [1.0, 0.5, 0.25, 0.1])
+    in one progressive simplification pass. Returns meshes ordered finest to coarsest.
+    A 1.0 level is the input mesh itself; decimated levels keep its UVs and material.
+    """
+    levels = normalize_levels(levels)
+    full = len(mesh.faces)
+    simplifier = _QuadricSimplifier(mesh)
+
+    lods = []
+    for ratio in levels:
+        if ratio >= 1.0:
+            lods.append(mesh)
+            continue
+        lod = simplifier.simplify_to(max(4, int(full * ratio)))
+        logger.info(f"LOD {len(lods)}: ratio {ratio:.3f} -> {len(lod.faces)} faces")
+        lods.append(lod)
+    return lods
+
+def export_lod_glb(lods: List[trimesh.Trimesh], path: str, levels: Optional[List[float]] = None,
+                   compression: str = "none", texture_format: str = "png", texture_quality: int = 90):
+    """
+    Writes all LODs into a single GLB using the MSFT_lod extension.
+    LOD0 is the only scene root; coarser levels are referenced through its MSFT_lod ids.
+    Screen coverage thresholds follow the face ratios of the next finer level.
+    Compression and texture options are those of export_ops.export_glb, levels sharing
+    a material store its textures once. Returns the compression actually applied.
+    """
+    compression = export_ops.resolve_glb_options(compression, texture_format)
+    builder = export_ops._GLBBuilder()
+    materials = {}
+    ids = [export_ops._add_mesh_node(builder, lod, f"LOD{i}", compression, texture_format, texture_quality,
+                                     include_normals=True, materials=materials)
+           for i, lod in enumerate(lods)]
+
+    gltf = builder.gltf
+    gltf["scenes"][gltf["scene"]]["nodes"] = [ids[0]]
+    if len(ids) > 1:
+        levels = levels if levels is not None and len(levels) == len(lods) else \
+            [len(lod.faces) / max(len(lods[0].faces), 1) for lod in lods]
+        coverage = [float(levels[i + 1]) for i in range(len(lods) - 1)] + [0.0]
+        root = gltf["nodes"][ids[0]]
+        root.setdefault("extensions", {})["MSFT_lod"] = {"ids": ids[1:]}
+        root.setdefault("extras", {})["MSFT_screencoverage"] = coverage
+        builder.use("MSFT_lod")
+    export_ops._write_glb(builder, path)
+    return compression
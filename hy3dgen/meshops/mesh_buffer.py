@@ -0,0 +1,177 @@
+import json
+import struct
+import logging
+import numpy as np
+import trimesh
+from typing import Optional
+
+logger = logging.getLogger("meshops.mesh_buffer")
+
+MAGIC = b"HYMB"
+VERSION = 1
+ALIGN = 64
+
+# channel -> (dtype, columns)
+CHANNELS = {
+    "vertices": (np.float32, 3),
+    "faces": (np.int32, 3),
+    "uv": (np.float32, 2),
+    "normals": (np.float32, 3),
+    "colors": (np.uint8, 4),
+}
+
+def _as_channel(name: str, values) -> Optional[np.ndarray]:
+    if values is None:
+        return None
+    dtype, cols = CHANNELS[name]
+    arr = np.asanyarray(values)
+    if arr.dtype != dtype or not arr.flags.c_contiguous:
+        arr = np.ascontiguousarray(arr, dtype=dtype)
+    if arr.ndim != 2 or arr.shape[1] != cols:
+        raise ValueError(f"{name} must have shape (N, {cols}), got {arr.shape}")
+    return arr
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+class MeshBuffer:
+    """
+    Lightweight mesh container passed between pipeline stages.
+
+    Holds contiguous float32 vertices / int32 faces plus optional per-vertex uv, normal
+    and RGBA color channels. Conversions never re-run trimesh processing (vertex merging),
+    and `save` / `load` use a flat memory-mappable file for cross-process handoff.
+    """
+    __slots__ = ("vertices", "faces", "uv", "normals", "colors")
+
+    def __init__(self, vertices, faces, uv=None, normals=None, colors=None):
+        self.vertices = _as_channel("vertices", vertices)
+        self.faces = _as_channel("faces", faces)
+        self.uv = _as_channel("uv", uv)
+        self.normals = _as_channel("normals", normals)
+        self.colors = _as_channel("colors", colors)
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def num_faces(self) -> int:
+        return len(self.faces)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in CHANNELS if getattr(self, name) is not None)
+
+    def __repr__(self):
+        extra = [name for name in ("uv", "normals", "colors") if getattr(self, name) is not None]
+        return f"MeshBuffer(vertices={self.num_vertices}, faces={self.num_faces}, channels={extra})"
+
+    def flip_winding(self) -> "MeshBuffer":
+        """Returns a buffer with reversed face winding, sharing every other channel."""
+        return MeshBuffer(self.vertices, self.faces[:, ::-1], self.uv, self.normals, self.colors)
+
+    @classmethod
+    def from_latent(cls, output) -> "MeshBuffer":
+        """From a Latent2MeshOutput (mesh_v / mesh_f)."""
+        return cls(output.mesh_v, output.mesh_f)
+
+    @classmethod
+    def from_trimesh(cls, mesh: trimesh.Trimesh, with_normals: bool = False) -> "MeshBuffer":
+        if isinstance(mesh, trimesh.Scene):
+            mesh = mesh.to_geometry()
+        uv = colors = None
+        visual = mesh.visual
+        if getattr(visual, "kind", None) == "texture" and getattr(visual, "uv", None) is not None:
+            uv = visual.uv
+        elif getattr(visual, "kind", None) == "vertex":
+            colors = visual.vertex_colors
+        normals = mesh.vertex_normals if with_normals else None
+        return cls(mesh.vertices, mesh.faces, uv=uv, normals=normals, colors=colors)
+
+    def to_trimesh(self) -> trimesh.Trimesh:
+        """
+        Builds a trimesh without processing. trimesh keeps float64/int64 internally,
+        so this is a single dtype cast and no vertex merging.
+        """
+        visual = None
+        if self.uv is not None:
+            visual = trimesh.visual.TextureVisuals(uv=self.uv)
+        elif self.colors is not None:
+            visual = trimesh.visual.ColorVisuals(vertex_colors=self.colors)
+        return trimesh.Trimesh(vertices=self.vertices, faces=self.faces,
+                               vertex_normals=self.normals, visual=visual, process=False)
+
+    @classmethod
+    def from_pymeshlab(cls, ms, colors: bool = False) -> "MeshBuffer":
+        """
+        From a pymeshlab MeshSet (current mesh) or Mesh. pymeshlab meshes always report
+        vertex colors, plain white if none were set, so they are only read with colors=True.
+        """
+        current = ms.current_mesh() if hasattr(ms, "current_mesh") else ms
+        vertex_colors = None
+        if colors and current.has_vertex_color():
+            vertex_colors = np.clip(current.vertex_color_matrix() * 255.0, 0, 255).astype(np.uint8)
+        return cls(current.vertex_matrix(), current.face_matrix(), colors=vertex_colors)
+
+    def to_pymeshlab(self):
+        """Returns a pymeshlab MeshSet holding this mesh as its current mesh."""
+        import pymeshlab
+        kwargs = {}
+        if self.normals is not None:
+            kwargs["v_normals_matrix"] = self.normals.astype(np.float64)
+        if self.colors is not None:
+            kwargs["v_color_matrix"] = self.colors.astype(np.float64) / 255.0
+        if self.uv is not None:
+            kwargs["v_tex_coords_matrix"] = self.uv.astype(np.float64)
+        ms = pymeshlab.MeshSet()
+        ms.add_mesh(pymeshlab.Mesh(vertex_matrix=self.vertices.astype(np.float64),
+                                   face_matrix=self.faces, **kwargs), "mesh_buffer")
+        return ms
+
+    def save(self, path: str):
+        """
+        Writes the flat on-disk layout: magic, version, header length, JSON header with
+        per-channel dtype/shape/offset, then each channel 64-byte aligned.
+        """
+        names = [name for name in CHANNELS if getattr(self, name) is not None]
+
+        # Offsets depend on the header length, so size the header with placeholder offsets first
+        header = {name: {"dtype": np.dtype(CHANNELS[name][0]).str,
+                         "shape": list(getattr(self, name).shape), "offset": 0} for name in names}
+        header_len = len(json.dumps(header)) + 16 * len(names) + 16
+        offset = _align(12 + header_len)
+        for name in names:
+            header[name]["offset"] = offset
+            offset = _align(offset + getattr(self, name).nbytes)
+        raw = json.dumps(header).encode("utf-8").ljust(header_len, b" ")
+
+        with open(path, "wb") as f:
+            f.write(struct.pack("<4sII", MAGIC, VERSION, header_len))
+            f.write(raw)
+            for name in names:
+                f.seek(header[name]["offset"])
+                f.write(getattr(self, name).tobytes())
+            f.truncate(offset)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "MeshBuffer":
+        """Reads a file written by `save`. With mmap=True channels are read-only memory maps."""
+        with open(path, "rb") as f:
+            magic, version, header_len = struct.unpack("<4sII", f.read(12))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a MeshBuffer file")
+            if version != VERSION:
+                raise ValueError(f"Unsupported MeshBuffer version {version}")
+            header = json.loads(f.read(header_len))
+
+        channels = {}
+        for name, info in header.items():
+            shape = tuple(info["shape"])
+            if mmap and shape[0] > 0:
+                channels[name] = np.memmap(path, dtype=info["dtype"], mode="r", offset=info["offset"], shape=shape)
+            else:
+                count = int(np.prod(shape))
+                channels[name] = np.fromfile(path, dtype=info["dtype"], count=count,
+                                             offset=info["offset"]).reshape(shape)
+        return cls(**channels)
@@ -100,5 +100,13 @@ def cleanup_mesh(mesh: trimesh.Trimesh, params: dict) -> trimesh.Trimesh:
         
     return mesh
 
-def export_mesh(mesh: trimesh.Trimesh, path: str, fmt: str):
+def export_mesh(mesh: trimesh.Trimesh, path: str, fmt: str, glb_options: dict = None):
+    """
+    Exports through trimesh, or through the streaming GLB writer when compression /
+    texture encoding options are requested for a GLB. Returns the GLB compression
+    actually applied, None for trimesh exports.
+    """
+    if fmt == "glb" and glb_options:
+        from . import export_ops
+        return export_ops.export_glb(mesh, path, **glb_options)
     mesh.export(path, file_type=fmt)
@@ -4,9 +4,11 @@ import logging
 from PIL import Image
 import trimesh
 import os
+import asyncio
 import tempfile
 from typing import Dict, Any, List, Optional
 from hy3dgen.api.schemas import ChannelPacking, MapType
+from . import uv_ops
 
 logger = logging.getLogger("meshops.tex_ops")
 
@@ -63,6 +65,12 @@ async def apply_auto_texture(mesh: trimesh.Trimesh,
         'guidance_scale': params.get("guidance_scale", 5.0),
         'seed': params.get("seed", 0)
     }
+    if params.get("uv_unwrap"):
+        tex_kwargs['uv_options'] = params["uv_unwrap"]
+    if params.get("texture_size"):
+        tex_kwargs['texture_size'] = int(params["texture_size"])
+    if params.get("upscale"):
+        tex_kwargs['upscale'] = params["upscale"]
     
     logger.info(f"Running auto_texture with {tex_kwargs}")
     # PaintPipeline expects a trimesh mesh and a PIL image
@@ -121,138 +129,364 @@ def apply_material_maps(mesh: trimesh.Trimesh, maps: Dict[MapType, Image.Image])
         
     return mesh
 
-def generate_uvs(mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+def generate_uvs(mesh: trimesh.Trimesh, options: Optional[Dict[str, Any]] = None) -> trimesh.Trimesh:
     """
-    Generates UV coordinates for a mesh using xatlas.
+    Generates UV coordinates for a mesh using xatlas (see uv_ops for options and caching).
     """
     try:
-        import xatlas
+        import xatlas  # noqa: F401
     except ImportError:
         logger.error("xatlas not found. Cannot generate UVs.")
         return mesh
 
     logger.info("Generating UVs using xatlas...")
-    atlas = xatlas.Atlas()
-    atlas.add_mesh(mesh.vertices, mesh.faces)
-    atlas.generate()
-    
-    # get_mesh(0) returns (vmapping, indices, uvs)
-    vmapping, indices, uvs = atlas.get_mesh(0)
-    
-    # xatlas might duplicate vertices to handle seams
-    new_vertices = mesh.vertices[vmapping]
-    new_faces = indices.reshape(-1, 3)
-    
-    # Create new mesh with UVs
-    new_mesh = trimesh.Trimesh(vertices=new_vertices, faces=new_faces, process=False)
-    new_mesh.visual = trimesh.visual.TextureVisuals(uv=uvs)
-    
-    # Transfer other properties if possible (trimesh copies normals usually)
-    if hasattr(mesh.visual, 'material'):
-        new_mesh.visual.material = mesh.visual.material
-        
-    return new_mesh
+    return uv_ops.unwrap_mesh(mesh, options)
+
+# Upper bound on candidate texels (bbox pixels) evaluated per rasterization batch.
+# Small batches keep the float64 temporaries (~40 MB) cache-friendly and bound memory at 4K.
+UV_RASTER_BATCH_TEXELS = 500_000
 
-async def bake_maps_native(high_poly: trimesh.Trimesh, 
-                           low_poly: trimesh.Trimesh, 
-                           maps: List[str], 
-                           resolution: int = 2048) -> Dict[str, str]:
+def _uv_face_batches(areas: np.ndarray, budget: int):
     """
-    Natively bakes maps from high-poly to low-poly using raycasting.
-    Returns a dict of map_type -> path.
+    Splits face indices into contiguous runs whose summed bbox area stays within budget.
+    A single face larger than the budget gets a batch of its own.
     """
-    logger.info(f"Starting native baking for {maps} at {resolution}x{resolution}")
-    
-    # Ensure low_poly has UVs
-    if not hasattr(low_poly.visual, 'uv') or low_poly.visual.uv is None:
-        low_poly = generate_uvs(low_poly)
-        
-    uvs = low_poly.visual.uv
-    results = {}
-    tmp_dir = tempfile.mkdtemp()
+    start = 0
+    n = len(areas)
+    csum = np.cumsum(areas)
+    while start < n:
+        base = csum[start - 1] if start > 0 else 0
+        stop = int(np.searchsorted(csum, base + budget, side="right"))
+        stop = max(stop, start + 1)
+        yield start, stop
+        start = stop
+
+def iter_uv_texels(faces: np.ndarray,
+                   uvs: np.ndarray,
+                   resolution: int,
+                   batch_texels: int = UV_RASTER_BATCH_TEXELS,
+                   offset=(0.0, 0.0)):
+    """
+    Rasterizes a UV layout in face batches.
+    Yields (pixels, face_idx, bary) per batch: integer (x, y) texel coords, the covering
+    face of each texel and its barycentric weights. Texels are sampled at pixel + offset,
+    which lets callers supersample by iterating over sub-texel offsets.
+
+    The bounding-box pixels of every face in a batch are enumerated with array ops and
+    tested against the face's barycentrics at once, so Python-level work is per batch
+    rather than per face.
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    # Shifting the triangles by -offset is the same as sampling every pixel at +offset
+    tri_uvs = np.asarray(uvs, dtype=np.float64)[faces] * (resolution - 1) - np.asarray(offset)  # (F, 3, 2)
+
+    min_uv = np.clip(np.floor(tri_uvs.min(axis=1)).astype(np.int64), 0, resolution - 1)
+    max_uv = np.clip(np.ceil(tri_uvs.max(axis=1)).astype(np.int64), 0, resolution - 1)
+    extent = max_uv - min_uv + 1  # (F, 2) -> (width, height)
+
+    e0 = tri_uvs[:, 1] - tri_uvs[:, 0]
+    e1 = tri_uvs[:, 2] - tri_uvs[:, 0]
+    d00 = e0[:, 0] * e0[:, 0] + e0[:, 1] * e0[:, 1]
+    d01 = e0[:, 0] * e1[:, 0] + e0[:, 1] * e1[:, 1]
+    d11 = e1[:, 0] * e1[:, 0] + e1[:, 1] * e1[:, 1]
+    denom = d00 * d11 - d01 * d01
+
+    # Degenerate UV triangles never produce texels
+    valid = np.abs(denom) >= 1e-8
+    face_ids = np.nonzero(valid)[0]
+    areas = extent[face_ids, 0] * extent[face_ids, 1]
+
+    # Per-face constants gathered once per candidate in a single fancy-index
+    face_table = np.stack([
+        tri_uvs[:, 0, 0], tri_uvs[:, 0, 1],
+        e0[:, 0], e0[:, 1], e1[:, 0], e1[:, 1],
+        d00, d01, d11, denom,
+    ], axis=-1)
+
+    for start, stop in _uv_face_batches(areas, batch_texels):
+        fids = face_ids[start:stop]
+        counts = areas[start:stop]
+        cand_face = np.repeat(fids, counts)
+        c = face_table[cand_face]
+        # Local index of each candidate inside its face's bbox
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows, cols = np.divmod(offsets, extent[cand_face, 0])
+        pts = np.stack([min_uv[cand_face, 0] + cols, min_uv[cand_face, 1] + rows], axis=-1)
+
+        v2u = pts[:, 0] - c[:, 0]
+        v2v = pts[:, 1] - c[:, 1]
+        d20 = v2u * c[:, 2] + v2v * c[:, 3]
+        d21 = v2u * c[:, 4] + v2v * c[:, 5]
+        v_bary = (c[:, 8] * d20 - c[:, 7] * d21) / c[:, 9]
+        w_bary = (c[:, 6] * d21 - c[:, 7] * d20) / c[:, 9]
+        u_bary = 1.0 - v_bary - w_bary
+
+        mask = (u_bary >= -0.01) & (v_bary >= -0.01) & (w_bary >= -0.01)
+        if not np.any(mask):
+            continue
+
+        bary = np.stack([u_bary[mask], v_bary[mask], w_bary[mask]], axis=-1)
+        yield pts[mask], cand_face[mask], bary
+
+def _interpolate(values: np.ndarray, faces: np.ndarray, face_idx: np.ndarray, bary: np.ndarray) -> np.ndarray:
+    """Barycentric interpolation of per-vertex values over the given faces."""
+    return np.einsum('ni,nij->nj', bary, values[faces[face_idx]])
+
+def _normalize(v: np.ndarray) -> np.ndarray:
+    length = np.linalg.norm(v, axis=1, keepdims=True)
+    return np.divide(v, length, out=np.zeros_like(v), where=length > 1e-8)
+
+# Sub-texel sample positions per BakingConfig.antialiasing setting (D3D standard MSAA patterns)
+AA_SAMPLE_OFFSETS = {
+    "none": [(0.0, 0.0)],
+    "2x": [(0.25, 0.25), (-0.25, -0.25)],
+    "4x": [(-0.125, -0.375), (0.375, -0.125), (-0.375, 0.125), (0.125, 0.375)],
+    "8x": [(0.0625, -0.1875), (-0.0625, 0.1875), (0.3125, 0.0625), (-0.1875, -0.3125),
+           (-0.3125, 0.3125), (-0.4375, -0.0625), (0.1875, 0.4375), (0.4375, -0.4375)],
+}
+
+# Channels per bakeable map and the value written to texels no ray reached
+BAKE_MAP_CHANNELS = {"normal": 3, "ao": 1, "height": 1, "curvature": 1, "position": 3}
+BAKE_MAP_BACKGROUND = {"normal": (0.5, 0.5, 1.0), "ao": (1.0,), "height": (0.5,),
+                       "curvature": (0.5,), "position": (0.0, 0.0, 0.0)}
+
+# Maximum number of rays handed to the intersector in one call. The pure-Python
+# ray_triangle fallback materializes per-ray candidate lists, so it gets far smaller batches.
+RAY_BATCH = 1_000_000 if trimesh.ray.has_embree else 4096
+
+def _cast_rays(intersector, origins: np.ndarray, dirs: np.ndarray):
+    """
+    First-hit raycast in RAY_BATCH chunks.
+    Returns (hit_face, ray_idx, hit_pos, hit_dist) for rays that hit.
+    """
+    faces, rays, locs = [], [], []
+    for start in range(0, len(origins), RAY_BATCH):
+        stop = min(start + RAY_BATCH, len(origins))
+        hit_face, ray_idx, hit_pos = intersector.intersects_id(
+            origins[start:stop], dirs[start:stop], multiple_hits=False, return_locations=True
+        )
+        faces.append(hit_face)
+        rays.append(ray_idx + start)
+        locs.append(hit_pos.reshape(-1, 3))
+    if not rays:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3)), np.zeros(0)
+    hit_face, ray_idx, hit_pos = np.concatenate(faces), np.concatenate(rays), np.concatenate(locs)
+    hit_dist = np.linalg.norm(hit_pos - origins[ray_idx], axis=1)
+    return hit_face, ray_idx, hit_pos, hit_dist
+
+def _vertex_tangents(mesh: trimesh.Trimesh, uvs: np.ndarray):
+    """
+    Per-vertex tangents (dP/du) accumulated from the UV layout, plus the per-face
+    bitangent sign that encodes mirrored UV islands.
+    """
+    tris = mesh.vertices[mesh.faces]
+    tri_uvs = np.asarray(uvs, dtype=np.float64)[mesh.faces]
+    dp1, dp2 = tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]
+    duv1, duv2 = tri_uvs[:, 1] - tri_uvs[:, 0], tri_uvs[:, 2] - tri_uvs[:, 0]
+    det = duv1[:, 0] * duv2[:, 1] - duv2[:, 0] * duv1[:, 1]
+    inv = np.divide(1.0, det, out=np.zeros_like(det), where=np.abs(det) > 1e-12)
+    face_tangents = (dp1 * duv2[:, 1:2] - dp2 * duv1[:, 1:2]) * inv[:, None]
+    face_bitangents = (dp2 * duv1[:, 0:1] - dp1 * duv2[:, 0:1]) * inv[:, None]
+
+    tangents = np.zeros_like(mesh.vertices, dtype=np.float64)
+    for k in range(3):
+        np.add.at(tangents, mesh.faces[:, k], face_tangents)
+
+    handed = np.einsum('ij,ij->i', np.cross(mesh.face_normals, face_tangents), face_bitangents)
+    face_sign = np.where(handed < 0.0, -1.0, 1.0)
+    return tangents, face_sign
+
+def _vertex_curvature(mesh: trimesh.Trimesh) -> np.ndarray:
+    """
+    Signed umbrella-operator curvature per vertex, scaled by the mean edge length.
+    Positive on convex regions, negative in cavities.
+    """
+    edges = mesh.edges_unique
+    n = len(mesh.vertices)
+    degree = np.bincount(edges.ravel(), minlength=n).astype(np.float64)
+    neighbor_sum = np.zeros((n, 3), dtype=np.float64)
+    for k in range(3):
+        neighbor_sum[:, k] = (np.bincount(edges[:, 0], weights=mesh.vertices[edges[:, 1], k], minlength=n)
+                              + np.bincount(edges[:, 1], weights=mesh.vertices[edges[:, 0], k], minlength=n))
+    centroid = neighbor_sum / np.maximum(degree, 1.0)[:, None]
+    offset = np.einsum('ij,ij->i', mesh.vertices - centroid, mesh.vertex_normals)
+    mean_edge = float(mesh.edges_unique_length.mean()) if len(edges) else 1.0
+    return offset / max(mean_edge, 1e-12)
+
+def _hemisphere_occlusion(intersector, points: np.ndarray, normals: np.ndarray,
+                          samples: int, max_distance: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Fraction of cosine-weighted hemisphere rays around each normal that hit geometry
+    within max_distance. Rays of all points go to the intersector in shared batches.
+    """
+    n = len(points)
+    # Per-point orthonormal frame (t, b, normal)
+    helper = np.where(np.abs(normals[:, :1]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    t = _normalize(np.cross(helper, normals))
+    b = np.cross(normals, t)
+
+    # Stratified cosine-weighted directions, randomly rotated per point to trade banding for noise
+    i = (np.arange(samples) + 0.5) / samples
+    phi = np.arange(samples) * np.pi * (3.0 - np.sqrt(5.0))
+    r = np.sqrt(i)
+    local = np.stack([r * np.cos(phi), r * np.sin(phi), np.sqrt(1.0 - i)], axis=-1)  # (S, 3)
+    rot = rng.uniform(0.0, 2.0 * np.pi, size=(n, 1))
+    cos_r, sin_r = np.cos(rot), np.sin(rot)
+    lx = local[None, :, 0] * cos_r - local[None, :, 1] * sin_r
+    ly = local[None, :, 0] * sin_r + local[None, :, 1] * cos_r
+    dirs = (lx[..., None] * t[:, None] + ly[..., None] * b[:, None]
+            + local[None, :, 2, None] * normals[:, None]).reshape(-1, 3)
+    origins = np.repeat(points + normals * (max_distance * 1e-3), samples, axis=0)
+
+    _, ray_idx, _, dist = _cast_rays(intersector, origins, dirs)
+    occluded = np.zeros(len(dirs), dtype=bool)
+    occluded[ray_idx[dist <= max_distance]] = True
+    return occluded.reshape(n, samples).mean(axis=1)
+
+def _bake_maps_sync(high_poly: trimesh.Trimesh,
+                    low_poly: trimesh.Trimesh,
+                    maps: List[str],
+                    resolution: int,
+                    ray_distance: float,
+                    antialiasing: str,
+                    ao_samples: int,
+                    ao_distance: Optional[float],
+                    batch_texels: int) -> Dict[str, np.ndarray]:
+    maps = [m.lower() for m in maps]
+    unknown = [m for m in maps if m not in BAKE_MAP_CHANNELS]
+    if unknown:
+        logger.warning(f"Skipping unsupported bake maps: {unknown}")
+    maps = [m for m in maps if m in BAKE_MAP_CHANNELS]
+    if antialiasing not in AA_SAMPLE_OFFSETS:
+        raise ValueError(f"Unknown antialiasing mode: {antialiasing}")
+
+    uvs = np.asarray(low_poly.visual.uv, dtype=np.float64)
+    low_faces = np.asarray(low_poly.faces, dtype=np.int64)
+    low_verts = np.asarray(low_poly.vertices, dtype=np.float64)
+    low_normals = np.asarray(low_poly.vertex_normals, dtype=np.float64)
+    tangents, face_sign = _vertex_tangents(low_poly, uvs) if "normal" in maps else (None, None)
+
+    high_faces = np.asarray(high_poly.faces, dtype=np.int64)
+    high_normals = np.asarray(high_poly.vertex_normals, dtype=np.float64)
+    curvature = _vertex_curvature(high_poly)[:, None] if "curvature" in maps else None
+    bounds = high_poly.bounds
+    extent = np.maximum(bounds[1] - bounds[0], 1e-12)
+    if ao_distance is None:
+        ao_distance = 0.25 * float(np.linalg.norm(extent))
+
+    # Rays start on a cage pushed out by ray_distance and are only trusted up to twice that
+    cage = ray_distance if ray_distance > 0 else 0.001
+    max_hit = 2.0 * ray_distance if ray_distance > 0 else np.inf
 
-    # Create Ray Intersector for High Poly
     if trimesh.ray.has_embree:
         intersector = trimesh.ray.ray_pyembree.RayMeshIntersector(high_poly)
     else:
         intersector = trimesh.ray.ray_triangle.RayMeshIntersector(high_poly)
-    
-    # Setup output maps
-    baked_data = {m.lower(): np.zeros((resolution, resolution, 3), dtype=np.uint8) for m in maps}
-    
-    # Accumulators for bulk raycasting
-    all_ray_origins = []
-    all_ray_dirs = []
-    all_pixel_coords = [] # (x, y)
-    
-    # 1. Rasterize UVs to find all ray starting points
-    for i, face in enumerate(low_poly.faces):
-        tri_uvs = uvs[face] * (resolution - 1)
-        min_u, min_v = np.floor(np.min(tri_uvs, axis=0)).astype(int)
-        max_u, max_v = np.ceil(np.max(tri_uvs, axis=0)).astype(int)
-        min_u, max_u = np.clip([min_u, max_u], 0, resolution - 1)
-        min_v, max_v = np.clip([min_v, max_v], 0, resolution - 1)
-        
-        u_coords = np.arange(min_u, max_u + 1)
-        v_coords = np.arange(min_v, max_v + 1)
-        uu, vv = np.meshgrid(u_coords, v_coords)
-        pts = np.stack([uu.ravel(), vv.ravel()], axis=-1)
-        
-        # Barycentric coordinates
-        v0 = tri_uvs[1] - tri_uvs[0]
-        v1 = tri_uvs[2] - tri_uvs[0]
-        v2 = pts - tri_uvs[0]
-        d00, d01, d11 = np.dot(v0, v0), np.dot(v0, v1), np.dot(v1, v1)
-        d20, d21 = np.einsum('ni,i->n', v2, v0), np.einsum('ni,i->n', v2, v1)
-        denom = d00 * d11 - d01 * d01
-        if abs(denom) < 1e-8: continue
-        v_bary = (d11 * d20 - d01 * d21) / denom
-        w_bary = (d00 * d21 - d01 * d20) / denom
-        u_bary = 1.0 - v_bary - w_bary
-        
-        mask = (u_bary >= -0.01) & (v_bary >= -0.01) & (w_bary >= -0.01)
-        if not np.any(mask): continue
-        
-        b = np.stack([u_bary[mask], v_bary[mask], w_bary[mask]], axis=-1)
-        world_pos = np.einsum('ni,ij->nj', b, low_poly.vertices[face])
-        world_norm = np.einsum('ni,ij->nj', b, low_poly.vertex_normals[face])
-        norm_len = np.linalg.norm(world_norm, axis=1, keepdims=True)
-        world_norm = np.divide(world_norm, norm_len, out=np.zeros_like(world_norm), where=norm_len > 1e-8)
-        
-        all_ray_origins.append(world_pos + world_norm * 0.001)
-        all_ray_dirs.append(-world_norm)
-        all_pixel_coords.append(pts[mask])
-
-    if not all_ray_origins:
-        logger.warning("No UV coverage found for baking.")
-        return results
-
-    all_ray_origins = np.concatenate(all_ray_origins, axis=0)
-    all_ray_dirs = np.concatenate(all_ray_dirs, axis=0)
-    all_pixel_coords = np.concatenate(all_pixel_coords, axis=0)
-
-    # 2. Bulk Raycasting
-    logger.info(f"Dispatching {len(all_ray_origins)} rays...")
-    hit_idx, hit_ray_idx, hit_pos = intersector.intersects_id(
-        all_ray_origins, all_ray_dirs, multiple_hits=False, return_locations=True
+
+    n_texels = resolution * resolution
+    accum = {m: np.zeros((n_texels, BAKE_MAP_CHANNELS[m]), dtype=np.float32) for m in maps}
+    weight = np.zeros(n_texels, dtype=np.float32)
+    rng = np.random.default_rng(0)
+
+    def splat(flat, values, out):
+        for ch in range(out.shape[1]):
+            out[:, ch] += np.bincount(flat, weights=values[:, ch], minlength=n_texels).astype(np.float32)
+
+    total_rays = 0
+    for offset in AA_SAMPLE_OFFSETS[antialiasing]:
+        for pixels, face_idx, bary in iter_uv_texels(low_faces, uvs, resolution, batch_texels, offset):
+            pos = _interpolate(low_verts, low_faces, face_idx, bary)
+            nrm = _normalize(_interpolate(low_normals, low_faces, face_idx, bary))
+            origins = pos + nrm * cage
+            hit_face, ray_idx, hit_pos, dist = _cast_rays(intersector, origins, -nrm)
+            total_rays += len(origins)
+            keep = dist <= max_hit
+            hit_face, ray_idx, hit_pos, dist = hit_face[keep], ray_idx[keep], hit_pos[keep], dist[keep]
+            if len(ray_idx) == 0:
+                continue
+
+            flat = pixels[ray_idx, 1] * resolution + pixels[ray_idx, 0]
+            weight += np.bincount(flat, minlength=n_texels).astype(np.float32)
+
+            hit_bary = trimesh.triangles.points_to_barycentric(high_poly.triangles[hit_face], hit_pos)
+            hit_normal = _normalize(_interpolate(high_normals, high_faces, hit_face, hit_bary))
+
+            if "normal" in maps:
+                # Gram-Schmidt tangent frame of the low poly at each texel
+                n_lo = nrm[ray_idx]
+                t_lo = _interpolate(tangents, low_faces, face_idx[ray_idx], bary[ray_idx])
+                t_lo = _normalize(t_lo - n_lo * np.einsum('ij,ij->i', t_lo, n_lo)[:, None])
+                b_lo = np.cross(n_lo, t_lo) * face_sign[face_idx[ray_idx]][:, None]
+                ts = np.stack([np.einsum('ij,ij->i', hit_normal, t_lo),
+                               np.einsum('ij,ij->i', hit_normal, b_lo),
+                               np.einsum('ij,ij->i', hit_normal, n_lo)], axis=-1)
+                splat(flat, _normalize(ts) * 0.5 + 0.5, accum["normal"])
+            if "ao" in maps:
+                occlusion = _hemisphere_occlusion(intersector, hit_pos, hit_normal, ao_samples, ao_distance, rng)
+                splat(flat, (1.0 - occlusion)[:, None], accum["ao"])
+            if "height" in maps:
+                # Signed offset of the high surface above the low one, along the low normal
+                splat(flat, (cage - dist)[:, None], accum["height"])
+            if "curvature" in maps:
+                splat(flat, _interpolate(curvature, high_faces, hit_face, hit_bary), accum["curvature"])
+            if "position" in maps:
+                splat(flat, (hit_pos - bounds[0]) / extent, accum["position"])
+
+    logger.info(f"Dispatched {total_rays} rays ({len(AA_SAMPLE_OFFSETS[antialiasing])} samples/texel)")
+
+    covered = weight > 0
+    baked = {}
+    for m in maps:
+        data = accum[m]
+        data[covered] /= weight[covered, None]
+        if m == "height":
+            scale = ray_distance if ray_distance > 0 else float(np.abs(data[covered]).max(initial=0.0))
+            data[covered] = data[covered] / max(scale, 1e-12) * 0.5 + 0.5
+        elif m == "curvature":
+            scale = float(np.abs(data[covered]).max(initial=0.0))
+            data[covered] = data[covered] / max(scale, 1e-12) * 0.5 + 0.5
+        data[~covered] = BAKE_MAP_BACKGROUND[m]
+        img = (np.clip(data, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        baked[m] = img.reshape(resolution, resolution, -1).squeeze(-1) if img.shape[1] == 1 \
+            else img.reshape(resolution, resolution, -1)
+    return baked
+
+async def bake_maps_native(high_poly: trimesh.Trimesh,
+                           low_poly: trimesh.Trimesh,
+                           maps: List[str],
+                           resolution: int = 2048,
+                           ray_distance: float = 0.0,
+                           antialiasing: str = "none",
+                           ao_samples: int = 16,
+                           ao_distance: Optional[float] = None,
+                           batch_texels: int = UV_RASTER_BATCH_TEXELS,
+                           uv_options: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Natively bakes maps from high-poly to low-poly using raycasting.
+    Supported maps: normal (tangent space), ao, height, curvature, position.
+    ray_distance sets the cage offset (0 keeps the legacy 1 mm inward cast), antialiasing
+    ("none", "2x", "4x", "8x") the sub-texel samples, see BakingConfig.
+    Work is chunked per rasterization batch, so memory stays bounded at 4K.
+    uv_options configures the xatlas unwrap when low_poly has no UVs (see uv_ops).
+    Returns a dict of map_type -> path.
+    """
+    logger.info(f"Starting native baking for {maps} at {resolution}x{resolution} (aa={antialiasing})")
+
+    # Ensure low_poly has UVs
+    if not hasattr(low_poly.visual, 'uv') or low_poly.visual.uv is None:
+        low_poly = await asyncio.to_thread(generate_uvs, low_poly, uv_options)
+
+    # Raycasting is CPU-bound; keep the event loop responsive
+    baked = await asyncio.to_thread(
+        _bake_maps_sync, high_poly, low_poly, maps, resolution, ray_distance,
+        antialiasing, ao_samples, ao_distance, batch_texels
     )
-    
-    if len(hit_idx) > 0:
-        pixel_x = all_pixel_coords[hit_ray_idx, 0].astype(int)
-        pixel_y = all_pixel_coords[hit_ray_idx, 1].astype(int)
-        
-        if 'normal' in baked_data:
-            hit_normals = high_poly.face_normals[hit_idx]
-            norm_rgb = ((hit_normals + 1.0) * 127.5).astype(np.uint8)
-            baked_data['normal'][pixel_y, pixel_x] = norm_rgb
-            
-        if 'ao' in baked_data:
-            baked_data['ao'][pixel_y, pixel_x] = 255 # Simplified AO
 
-    # Save results
-    for mtype, data in baked_data.items():
+    results = {}
+    tmp_dir = tempfile.mkdtemp()
+    for mtype, data in baked.items():
         out_path = os.path.join(tmp_dir, f"baked_{mtype}.png")
         Image.fromarray(data).save(out_path)
         results[mtype] = out_path
-        
+
     return results
@@ -0,0 +1,170 @@
+import os
+import json
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import trimesh
+
+logger = logging.getLogger("meshops.uv_ops")
+
+# xatlas defaults, so an unconfigured unwrap matches plain xatlas.parametrize
+DEFAULT_UNWRAP_OPTIONS = {
+    "resolution": 0,
+    "padding": 0,
+    "max_chart_size": 0,
+    "brute_force": False,
+    "max_iterations": 1,
+}
+
+UV_WORKERS = int(os.environ.get("HY3DGEN_UV_WORKERS", 1))
+UV_CACHE_SIZE = int(os.environ.get("HY3DGEN_UV_CACHE_SIZE", 16))
+
+UnwrapResult = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache: "OrderedDict[str, UnwrapResult]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def normalize_options(options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fills in defaults and drops unset (None) values, rejecting unknown keys."""
+    merged = dict(DEFAULT_UNWRAP_OPTIONS)
+    for key, value in (options or {}).items():
+        if key not in DEFAULT_UNWRAP_OPTIONS:
+            raise ValueError(f"Unknown UV unwrap option: {key}")
+        if value is not None:
+            merged[key] = type(DEFAULT_UNWRAP_OPTIONS[key])(value)
+    return merged
+
+def geometry_hash(vertices: np.ndarray, faces: np.ndarray, options: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key over the exact vertex/face data and the unwrap options."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(np.ascontiguousarray(vertices, dtype=np.float32).tobytes())
+    h.update(np.ascontiguousarray(faces, dtype=np.uint32).tobytes())
+    h.update(json.dumps(normalize_options(options), sort_keys=True).encode())
+    return h.hexdigest()
+
+def _unwrap(vertices: np.ndarray, faces: np.ndarray, options: Dict[str, Any]) -> UnwrapResult:
+    # Runs in the worker process
+    import xatlas
+
+    chart_options = xatlas.ChartOptions()
+    chart_options.max_iterations = options["max_iterations"]
+    pack_options = xatlas.PackOptions()
+    pack_options.resolution = options["resolution"]
+    pack_options.padding = options["padding"]
+    pack_options.max_chart_size = options["max_chart_size"]
+    pack_options.bruteForce = options["brute_force"]
+
+    atlas = xatlas.Atlas()
+    atlas.add_mesh(vertices, faces)
+    atlas.generate(chart_options, pack_options)
+    return atlas.get_mesh(0)
+
+def _uv_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: callers already run export, torch/OMP and texgen threads,
+            # and a forked child can inherit their locks (e.g. the allocator's) held
+            _pool = ProcessPoolExecutor(max_workers=UV_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool(pool: ProcessPoolExecutor):
+    """Drops `pool` if it is still the current one, the next unwrap starts a fresh pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _copy_result(result: UnwrapResult) -> UnwrapResult:
+    return tuple(np.copy(array) for array in result)
+
+def _cache_get(key: str) -> Optional[UnwrapResult]:
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            # Callers own what they get, the cached arrays are never handed out
+            result = _copy_result(result)
+        return result
+
+def _cache_put(key: str, result: UnwrapResult):
+    result = _copy_result(result)
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > UV_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+def submit_unwrap(vertices: np.ndarray, faces: np.ndarray, options: Optional[Dict[str, Any]] = None) -> Future:
+    """
+    Starts an xatlas unwrap on the UV worker pool and returns a Future of
+    (vmapping, indices, uvs). Geometry seen before resolves immediately from the cache.
+    """
+    options = normalize_options(options)
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+    faces = np.ascontiguousarray(faces, dtype=np.uint32)
+    key = geometry_hash(vertices, faces, options)
+
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.debug(f"UV unwrap cache hit {key}")
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    pool = _uv_pool()
+    try:
+        future = pool.submit(_unwrap, vertices, faces, options)
+    except BrokenProcessPool:
+        # A previous unwrap crashed its worker (xatlas can segfault on bad input)
+        _reset_pool(pool)
+        pool = _uv_pool()
+        future = pool.submit(_unwrap, vertices, faces, options)
+
+    def _store(done: Future):
+        if done.cancelled():
+            return
+        if done.exception() is None:
+            _cache_put(key, done.result())
+        elif isinstance(done.exception(), BrokenProcessPool):
+            _reset_pool(pool)
+    future.add_done_callback(_store)
+    return future
+
+def unwrap(vertices: np.ndarray, faces: np.ndarray, options: Optional[Dict[str, Any]] = None) -> UnwrapResult:
+    """Blocking unwrap, see `submit_unwrap`."""
+    try:
+        return submit_unwrap(vertices, faces, options).result()
+    except BrokenProcessPool:
+        # The worker died under this unwrap, retry it once on a fresh pool
+        logger.warning("UV worker pool broke, restarting it")
+        return submit_unwrap(vertices, faces, options).result()
+
+def apply_uvs(mesh: trimesh.Trimesh, result: UnwrapResult) -> trimesh.Trimesh:
+    """Returns a copy of `mesh` re-indexed by the xatlas vertex mapping with the new UVs."""
+    vmapping, indices, uvs = result
+    new_mesh = trimesh.Trimesh(vertices=mesh.vertices[vmapping], faces=indices.reshape(-1, 3), process=False)
+    new_mesh.visual = trimesh.visual.TextureVisuals(uv=uvs)
+    if hasattr(mesh.visual, 'material'):
+        new_mesh.visual.material = mesh.visual.material
+    return new_mesh
+
+def unwrap_mesh(mesh: trimesh.Trimesh, options: Optional[Dict[str, Any]] = None) -> trimesh.Trimesh:
+    """Unwraps `mesh` with xatlas, reusing cached UVs for identical geometry."""
+    if isinstance(mesh, trimesh.Scene):
+        mesh = mesh.dump(concatenate=True)
+    return apply_uvs(mesh, unwrap(mesh.vertices, mesh.faces, options))
@@ -0,0 +1,142 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+logger = logging.getLogger(__name__)
+
+# safetensors metadata key listing the quantized Linear layers of a checkpoint
+QUANT_METADATA_KEY = "hy3dgen_quantization"
+QUANT_FORMAT = "int8_weight_only"
+
+
+class Int8Linear(nn.Module):
+    """
+    Drop-in replacement for nn.Linear with weight-only int8 quantization: symmetric,
+    per-output-channel scales, activations stay in floating point. On CPU the matmul
+    runs on the int8 weights directly, elsewhere they are dequantized per call.
+    """
+
+    def __init__(self, in_features: int, out_features: int, bias: bool = True,
+                 device=None, dtype=torch.float16):
+        super().__init__()
+        self.in_features = in_features
+        self.out_features = out_features
+        self.register_buffer("qweight", torch.zeros(out_features, in_features, dtype=torch.int8, device=device))
+        self.register_buffer("scale", torch.ones(out_features, dtype=dtype, device=device))
+        self.register_buffer("bias", torch.zeros(out_features, dtype=dtype, device=device) if bias else None)
+
+    @classmethod
+    def from_linear(cls, linear: nn.Linear) -> "Int8Linear":
+        weight = linear.weight.detach()
+        module = cls(linear.in_features, linear.out_features, linear.bias is not None,
+                     device=weight.device, dtype=weight.dtype)
+        weight = weight.float()
+        scale = weight.abs().amax(dim=1).clamp(min=1e-8) / 127.0
+        module.qweight.copy_(torch.round(weight / scale[:, None]).clamp_(-127, 127).to(torch.int8))
+        module.scale.copy_(scale)
+        if linear.bias is not None:
+            module.bias.copy_(linear.bias.detach())
+        return module
+
+    @property
+    def weight(self) -> torch.Tensor:
+        # Dequantized weight, for code that reads linear.weight directly
+        return self.qweight.to(self.scale.dtype) * self.scale[:, None]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        bias = None if self.bias is None else self.bias.to(x.dtype)
+        if x.device.type == "cpu" and hasattr(torch, "_weight_int8pack_mm"):
+            out = torch._weight_int8pack_mm(x.reshape(-1, self.in_features), self.qweight, self.scale.to(x.dtype))
+            out = out.view(*x.shape[:-1], self.out_features)
+            return out if bias is None else out + bias
+        return F.linear(x, self.weight.to(x.dtype), bias)
+
+    def extra_repr(self) -> str:
+        return f"in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}"
+
+
+def _matches(module: nn.Module, include: Tuple[Union[type, str], ...]) -> bool:
+    # Class names match too, for modules loaded from a diffusers custom pipeline's own copy of the code
+    return any(isinstance(module, cls) if isinstance(cls, type) else type(module).__name__ == cls
+               for cls in include)
+
+
+def _linear_layers(model: nn.Module, include: Optional[Iterable[Union[type, str]]] = None) -> List[str]:
+    # Names of the nn.Linear layers of model, only inside modules of the `include` types if given
+    if include is None:
+        scopes = [("", model)]
+    else:
+        include = tuple(include)
+        scopes = [(name, module) for name, module in model.named_modules() if _matches(module, include)]
+    names = []
+    for scope, module in scopes:
+        for name, child in module.named_modules():
+            if isinstance(child, nn.Linear):
+                names.append(f"{scope}.{name}" if scope else name)
+    return list(dict.fromkeys(names))
+
+
+def _replace(model: nn.Module, name: str, module: nn.Module):
+    parent_name, _, child_name = name.rpartition(".")
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, child_name, module)
+
+
+def quantize_model(model: nn.Module, include: Optional[Iterable[Union[type, str]]] = None,
+                   min_features: int = 64) -> List[str]:
+    """
+    Calibration-free int8 weight-only quantization of model's nn.Linear layers in place,
+    optionally restricted to layers inside modules of the `include` types or class names. Layers with
+    fewer than `min_features` inputs or outputs stay in floating point.
+    Returns the names of the quantized layers.
+    """
+    quantized = []
+    for name in _linear_layers(model, include):
+        linear = model.get_submodule(name)
+        if min(linear.in_features, linear.out_features) < min_features:
+            continue
+        _replace(model, name, Int8Linear.from_linear(linear))
+        quantized.append(name)
+    logger.info(f"Quantized {len(quantized)} Linear layers of {type(model).__name__} to int8")
+    return quantized
+
+
+def prepare_quantized(model: nn.Module, names: Iterable[str]):
+    """Swaps the named nn.Linear layers for empty Int8Linear shells before loading a quantized state dict."""
+    for name in names:
+        linear = model.get_submodule(name)
+        if isinstance(linear, Int8Linear):
+            continue
+        _replace(model, name, Int8Linear(linear.in_features, linear.out_features, linear.bias is not None,
+                                         device=linear.weight.device, dtype=linear.weight.dtype))
+
+
+def quantized_layers(model: nn.Module) -> List[str]:
+    return [name for name, module in model.named_modules() if isinstance(module, Int8Linear)]
+
+
+def quantization_metadata(components: Dict[str, nn.Module]) -> Dict[str, str]:
+    """safetensors metadata recording the quantized layers of each named component."""
+    layers = {key: quantized_layers(module) for key, module in components.items()}
+    return {QUANT_METADATA_KEY: json.dumps({"format": QUANT_FORMAT, "layers": layers})}
+
+
+def read_quantization_metadata(metadata: Optional[Dict[str, str]]) -> Dict[str, List[str]]:
+    """Quantized layer names per component from safetensors metadata, empty for a float checkpoint."""
+    if not metadata or QUANT_METADATA_KEY not in metadata:
+        return {}
+    info = json.loads(metadata[QUANT_METADATA_KEY])
+    if info.get("format") != QUANT_FORMAT:
+        raise ValueError(f"Unsupported quantization format: {info.get('format')}")
+    return info["layers"]
+
+
+def quantized_size(model: nn.Module) -> Tuple[int, int]:
+    """(bytes of parameters and buffers, bytes of int8 weights among them)."""
+    total = sum(t.numel() * t.element_size() for t in list(model.parameters()) + list(model.buffers()))
+    int8 = sum(m.qweight.numel() for m in model.modules() if isinstance(m, Int8Linear))
+    return total, int8
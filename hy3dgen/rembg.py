@@ -12,14 +12,142 @@
 # fine-tuning enabling code and other elements of the foregoing made publicly available
 # by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
 
-from PIL import Image
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PIL import Image, ImageOps
 from rembg import remove, new_session
 
+# u2net-family models share their pre- and post-processing: ImageNet-normalized 320x320
+# input, one min-max normalized mask. Only these get several images per ONNX run.
+BATCHED_MODELS = ('u2net', 'u2netp', 'u2net_human_seg', 'silueta')
+U2NET_MEAN = (0.485, 0.456, 0.406)
+U2NET_STD = (0.229, 0.224, 0.225)
+U2NET_SIZE = (320, 320)
+
+
+def has_transparency(image: Image.Image) -> bool:
+    """True if image already carries a cut-out, i.e. an alpha channel that is not fully opaque."""
+    if image.mode in ('RGBA', 'LA', 'PA'):
+        return image.getchannel('A').getextrema()[0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def image_digest(image: Image.Image) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f'{image.mode}{image.size}'.encode())
+    hasher.update(image.tobytes())
+    return hasher.hexdigest()
+
+
+class _MaskSession:
+    # Hands a mask computed ahead of time to rembg.remove, which then only composites
+    def __init__(self, mask):
+        self.mask = mask
+
+    def predict(self, img, *args, **kwargs):
+        return [self.mask]
+
 
 class BackgroundRemover():
-    def __init__(self):
-        self.session = new_session()
+    """
+    rembg background removal. Images that already have transparency are passed through,
+    results are cached by image content, and with a u2net-family model all images of a call
+    run through the ONNX session together when it takes a dynamic batch.
+
+    Args:
+        model_name: rembg model, e.g. 'u2netp' to trade some quality for speed.
+        providers: ONNX Runtime execution providers, rembg's device-based choice by default.
+        num_threads: ONNX Runtime intra-op threads, its default (all cores) if None.
+        cache_size: number of results kept, 0 disables the cache.
+    """
+
+    def __init__(self, model_name: str = 'u2net', providers: Optional[Sequence[str]] = None,
+                 num_threads: Optional[int] = None, cache_size: int = 32):
+        self.model_name = model_name
+        self.session = self._new_session(model_name, providers, num_threads)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        model_input = self.session.inner_session.get_inputs()[0]
+        self.batched = model_name in BATCHED_MODELS and not isinstance(model_input.shape[0], int)
+
+    @staticmethod
+    def _new_session(model_name, providers, num_threads):
+        kwargs = {} if providers is None else {'providers': list(providers)}
+        if num_threads is None:
+            return new_session(model_name, **kwargs)
+        import onnxruntime as ort
+        from rembg.sessions import sessions_class
+        session_class = next((cls for cls in sessions_class if cls.name() == model_name), None)
+        if session_class is None:
+            raise ValueError(f'Unknown rembg model: {model_name}')
+        sess_opts = ort.SessionOptions()
+        sess_opts.intra_op_num_threads = num_threads
+        sess_opts.inter_op_num_threads = 1
+        return session_class(model_name, sess_opts, **kwargs)
 
     def __call__(self, image: Image.Image):
-        output = remove(image, session=self.session, bgcolor=[255, 255, 255, 0])
-        return output
+        return self.remove_batch([image])[0]
+
+    def remove_batch(self, images: List[Image.Image]) -> List[Image.Image]:
+        outputs = [None] * len(images)
+        pending = {}  # digest -> indices of the images that need a mask
+        for i, image in enumerate(images):
+            if has_transparency(image):
+                outputs[i] = image.convert('RGBA')
+                continue
+            digest = image_digest(image)
+            cached = self._cached(digest)
+            if cached is not None:
+                outputs[i] = cached
+            else:
+                pending.setdefault(digest, []).append(i)
+
+        if pending:
+            removed = self._remove([images[indices[0]] for indices in pending.values()])
+            for (digest, indices), output in zip(pending.items(), removed):
+                self._store(digest, output)
+                for i in indices:
+                    outputs[i] = output.copy()
+        return outputs
+
+    def _remove(self, images):
+        if not self.batched or len(images) == 1:
+            return [remove(image, session=self.session, bgcolor=[255, 255, 255, 0]) for image in images]
+        # exif_transpose first, as rembg.remove does before predicting the mask
+        images = [ImageOps.exif_transpose(image) for image in images]
+        return [remove(image, session=_MaskSession(mask), bgcolor=[255, 255, 255, 0])
+                for image, mask in zip(images, self._predict_masks(images))]
+
+    def _predict_masks(self, images):
+        input_name = self.session.inner_session.get_inputs()[0].name
+        batch = np.concatenate([self.session.normalize(image, U2NET_MEAN, U2NET_STD, U2NET_SIZE)[input_name]
+                                for image in images])
+        preds = self.session.inner_session.run(None, {input_name: batch})[0][:, 0]
+        masks = []
+        for pred, image in zip(preds, images):
+            pred = (pred - pred.min()) / (pred.max() - pred.min())
+            mask = Image.fromarray((pred * 255).astype('uint8'), mode='L')
+            masks.append(mask.resize(image.size, Image.Resampling.LANCZOS))
+        return masks
+
+    def _cached(self, digest):
+        with self._lock:
+            output = self._cache.get(digest)
+            if output is None:
+                return None
+            self._cache.move_to_end(digest)
+            return output.copy()
+
+    def _store(self, digest, output):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[digest] = output
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
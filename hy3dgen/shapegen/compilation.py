@@ -0,0 +1,198 @@
+# Hunyuan 3D is licensed under the TENCENT HUNYUAN NON-COMMERCIAL LICENSE AGREEMENT
+# except for the third-party components listed below.
+# Hunyuan 3D does not impose any additional limitations beyond what is outlined
+# in the repsective licenses of these third-party components.
+# Users must comply with all terms and conditions of original licenses of these third-party
+# components and must ensure that the usage of the third party components adheres to
+# all relevant laws and regulations.
+
+# For avoidance of doubts, Hunyuan 3D means the large language models and
+# their software and algorithms, including trained model weights, parameters (including
+# optimizer states), machine-learning model code, inference-enabling code, training-enabling code,
+# fine-tuning enabling code and other elements of the foregoing made publicly available
+# by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import torch
+import torch.nn as nn
+
+from .models.autoencoders.attention_processors import CrossAttentionProcessor
+from .utils import logger
+
+DEFAULT_CACHE_DIR = os.environ.get('HY3DGEN_COMPILE_CACHE', '~/.cache/hy3dgen/inductor')
+
+# Repeated transformer blocks of the denoisers, compiled one graph per block class
+DENOISER_BLOCK_LISTS = ('blocks', 'double_blocks', 'single_blocks')
+
+
+@dataclass
+class ShapeBuckets:
+    # Denoiser batch sizes: one image with classifier-free guidance runs as 2
+    batch_sizes: Sequence[int] = (2,)
+    # Query points per geo-decoder call, larger calls run as several
+    chunk_sizes: Sequence[int] = (8000,)
+
+
+def _default_inductor_cache_dir():
+    try:
+        from torch._inductor.runtime.cache_dir_utils import default_cache_dir
+        return os.path.abspath(default_cache_dir())
+    except ImportError:
+        return None
+
+
+def enable_persistent_cache(cache_dir=None):
+    """
+    Keeps inductor's compiled graphs on disk, so a restarted worker loads them instead of
+    recompiling. An explicitly set TORCHINDUCTOR_CACHE_DIR wins over the default location, but
+    not over torch's own per-user temp directory, which it fills in on first use.
+    """
+    current = os.environ.get('TORCHINDUCTOR_CACHE_DIR')
+    if cache_dir is None and current is not None and os.path.abspath(current) != _default_inductor_cache_dir():
+        cache_dir = current
+    cache_dir = os.path.abspath(os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR))
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ['TORCHINDUCTOR_CACHE_DIR'] = cache_dir
+    import torch._inductor.config
+    torch._inductor.config.fx_graph_cache = True
+    return cache_dir
+
+
+def bucket_for(size, buckets) -> Optional[int]:
+    """Smallest bucket that fits size, None if none does."""
+    return next((bucket for bucket in buckets if bucket >= size), None)
+
+
+def pad_dim(x: torch.Tensor, size: int, dim: int) -> torch.Tensor:
+    # Pads by repeating the last slice, which keeps padded rows finite in every op
+    if x.shape[dim] == size:
+        return x
+    last = x.narrow(dim, x.shape[dim] - 1, 1)
+    repeats = [1] * x.dim()
+    repeats[dim] = size - x.shape[dim]
+    return torch.cat([x, last.repeat(repeats)], dim=dim)
+
+
+class CompilationManager:
+    """
+    Scoped torch.compile for the shape pipeline: the denoiser's repeated transformer blocks and
+    the geo decoder are compiled for a declared set of shape buckets, and their inputs padded
+    up to the nearest bucket, so traffic with varying batch and chunk sizes reuses the graphs
+    built by warm-up instead of recompiling. A compile failure restores eager execution.
+    """
+
+    def __init__(self, buckets: Optional[ShapeBuckets] = None, backend='inductor', mode=None,
+                 cache_dir=None):
+        self.buckets = buckets or ShapeBuckets()
+        self.batch_sizes = sorted(self.buckets.batch_sizes)
+        self.chunk_sizes = sorted(self.buckets.chunk_sizes)
+        self.backend = backend
+        self.mode = mode
+        self.failed = False
+        self._compiled = []  # (module, previous instance forward) per override
+        self._padded_contexts = None
+        if backend == 'inductor':
+            logger.info(f'Inductor cache: {enable_persistent_cache(cache_dir)}')
+
+    def _compile(self, fn):
+        return torch.compile(fn, backend=self.backend, mode=self.mode, dynamic=False)
+
+    def _guarded(self, compiled, eager):
+        def forward(*args, **kwargs):
+            if not self.failed:
+                try:
+                    return compiled(*args, **kwargs)
+                except torch._dynamo.exc.TorchDynamoException as e:
+                    logger.warning(f'torch.compile failed, running eager: {e}')
+                    self.restore()
+            return eager(*args, **kwargs)
+        return forward
+
+    def _override(self, module, forward):
+        # Keeps a forward set on the instance before (e.g. an accelerate offload hook) for restore()
+        self._compiled.append((module, forward, module.__dict__.get('forward')))
+        module.forward = forward
+
+    def restore(self):
+        """Back to eager execution for every compiled module."""
+        self.failed = True
+        for module, override, previous in reversed(self._compiled):
+            eager = previous if previous is not None else type(module).forward.__get__(module)
+            if module.__dict__.get('forward') is not override:
+                # Wrapped since, e.g. by enable_model_cpu_offload after compile(): the wrapper stays
+                # and only the override it calls is swapped. Overrides run eager once failed anyway.
+                if module.__dict__.get('_old_forward') is override:
+                    module._old_forward = eager
+            elif previous is None:
+                del module.forward
+            else:
+                module.forward = previous
+        self._compiled = []
+
+    def compile_denoiser(self, model: nn.Module):
+        blocks = [block for name in DENOISER_BLOCK_LISTS
+                  for block in getattr(model, name, []) if isinstance(block, nn.Module)]
+        if not blocks:
+            raise ValueError(f'No transformer blocks to compile in {type(model).__name__}')
+        for block in blocks:
+            self._override(block, self._guarded(self._compile(block.forward), block.forward))
+        # Batch padding wraps the whole forward, which stays eager around the blocks
+        self._override(model, self._bucketed_denoiser(model.forward))
+        logger.info(f'Compiled {len(blocks)} denoiser blocks for batch sizes {self.batch_sizes}')
+
+    def _pad_contexts(self, contexts, size):
+        # The condition cache matches contexts by identity, so pad each context tensor once
+        tensors = tuple(contexts[k] for k in sorted(contexts))
+        if self._padded_contexts is not None:
+            key, padded = self._padded_contexts
+            if key[0] == size and len(key[1]) == len(tensors) and all(a is b for a, b in zip(key[1], tensors)):
+                return padded
+        padded = {k: pad_dim(v, size, 0) if isinstance(v, torch.Tensor) else v for k, v in contexts.items()}
+        self._padded_contexts = ((size, tensors), padded)
+        return padded
+
+    def _bucketed_denoiser(self, forward):
+        def bucketed(x, t, contexts, **kwargs):
+            batch = x.shape[0]
+            size = bucket_for(batch, self.batch_sizes)
+            if self.failed or size is None or size == batch:
+                return forward(x, t, contexts, **kwargs)
+            kwargs = {k: pad_dim(v, size, 0) if isinstance(v, torch.Tensor) and v.dim() and v.shape[0] == batch
+                      else v for k, v in kwargs.items()}
+            out = forward(pad_dim(x, size, 0), pad_dim(t, size, 0), self._pad_contexts(contexts, size), **kwargs)
+            return out[:batch]
+        return bucketed
+
+    def compile_geo_decoder(self, decoder: nn.Module):
+        # The cross-attention block holds the cost; the decoder's own forward bumps a Python
+        # counter that would make every call recompile
+        block = decoder.cross_attn_decoder
+        compiled_block = self._guarded(self._compile(block.forward), block.forward)
+        eager_block, eager = block.forward, decoder.forward
+        max_chunk = self.chunk_sizes[-1]
+
+        def uses_default_processor():
+            # FlashVDM's processors select keys from the queries, padding would change the result
+            return isinstance(block.attn.attention.attn_processor, CrossAttentionProcessor)
+
+        def block_forward(*args, **kwargs):
+            if uses_default_processor():
+                return compiled_block(*args, **kwargs)
+            return eager_block(*args, **kwargs)
+
+        def bucketed(queries=None, query_embeddings=None, latents=None):
+            if self.failed or queries is None or not uses_default_processor():
+                return eager(queries=queries, query_embeddings=query_embeddings, latents=latents)
+            outputs = []
+            for start in range(0, queries.shape[1], max_chunk):
+                chunk = queries[:, start: start + max_chunk]
+                size = bucket_for(chunk.shape[1], self.chunk_sizes)
+                outputs.append(eager(queries=pad_dim(chunk, size, 1), latents=latents)[:, :chunk.shape[1]])
+            return outputs[0] if len(outputs) == 1 else torch.cat(outputs, dim=1)
+
+        self._override(block, block_forward)
+        self._override(decoder, bucketed)
+        logger.info(f'Compiled the geo decoder for chunk sizes {self.chunk_sizes}')
@@ -0,0 +1,96 @@
+# Hunyuan 3D is licensed under the TENCENT HUNYUAN NON-COMMERCIAL LICENSE AGREEMENT
+# except for the third-party components listed below.
+# Hunyuan 3D does not impose any additional limitations beyond what is outlined
+# in the repsective licenses of these third-party components.
+# Users must comply with all terms and conditions of original licenses of these third-party
+# components and must ensure that the usage of the third party components adheres to
+# all relevant laws and regulations.
+
+# For avoidance of doubts, Hunyuan 3D means the large language models and
+# their software and algorithms, including trained model weights, parameters (including
+# optimizer states), machine-learning model code, inference-enabling code, training-enabling code,
+# fine-tuning enabling code and other elements of the foregoing made publicly available
+# by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import torch
+
+from .utils import logger
+
+
+def available_cores():
+    # Cores this process may run on, which respects CPU affinity and container cpusets
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def cpu_supports_bf16():
+    return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+
+
+def resolve_cpu_dtype(dtype):
+    """
+    Compute dtype for CPU inference: half precision runs as bf16 where the CPU has native
+    bf16 instructions (AVX512-BF16 / AMX), and as fp32 otherwise, where either half
+    format would be emulated and slower than fp32.
+    """
+    if dtype not in (torch.float16, torch.bfloat16):
+        return dtype
+    resolved = torch.bfloat16 if cpu_supports_bf16() else torch.float32
+    if resolved != dtype:
+        logger.info(f'CPU inference runs in {resolved} instead of {dtype}')
+    return resolved
+
+
+def configure_cpu_threads(num_threads=None):
+    """
+    Sets the intra-op thread count, all available cores by default, and flushes denormals,
+    which are slow on x86 and show up in the tails of the attention softmax. Returns the
+    thread count.
+    """
+    num_threads = num_threads or available_cores()
+    torch.set_num_threads(num_threads)
+    torch.set_flush_denormal(True)
+    logger.info(f'CPU inference with {num_threads} threads')
+    return num_threads
+
+
+def default_decode_workers(num_threads):
+    # Concurrent volume-decoding chunks, each keeping at least 4 intra-op threads
+    return max(1, min(4, num_threads // 4))
+
+
+@contextmanager
+def intra_op_threads(num_threads):
+    previous = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def parallel_map(fn, items, num_workers):
+    """
+    Maps fn over items on num_workers threads that split the intra-op threads between
+    them. Small decoder chunks don't keep all cores busy in a single op, running several
+    at once does. Results keep the order of items.
+    """
+    items = list(items)
+    if num_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    num_workers = min(num_workers, len(items))
+    # Grad and inference mode are thread-local, the workers run in the caller's
+    grad_enabled, inference_mode = torch.is_grad_enabled(), torch.is_inference_mode_enabled()
+
+    def run(item):
+        with torch.inference_mode(inference_mode), torch.set_grad_enabled(grad_enabled):
+            return fn(item)
+
+    with intra_op_threads(max(1, torch.get_num_threads() // num_workers)):
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            return list(executor.map(run, items))
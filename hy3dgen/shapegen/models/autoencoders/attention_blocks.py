@@ -14,6 +14,7 @@
 
 
 import os
+from contextlib import contextmanager
 from typing import Optional, Union, List
 
 import torch
@@ -247,16 +248,17 @@ class MultiheadCrossAttention(nn.Module):
         self.kv_cache = kv_cache
         self.data = None
 
-    def forward(self, x, data):
+    def forward(self, x, data=None, kv=None):
         x = self.c_q(x)
-        if self.kv_cache:
-            if self.data is None:
-                self.data = self.c_kv(data)
-                logger.info('Save kv cache,this should be called only once for one mesh')
-            data = self.data
-        else:
-            data = self.c_kv(data)
-        x = self.attention(x, data)
+        if kv is None:
+            if self.kv_cache:
+                if self.data is None:
+                    self.data = self.c_kv(data)
+                    logger.info('Save kv cache,this should be called only once for one mesh')
+                kv = self.data
+            else:
+                kv = self.c_kv(data)
+        x = self.attention(x, kv)
         x = self.c_proj(x)
         return x
 
@@ -293,8 +295,15 @@ class ResidualCrossAttentionBlock(nn.Module):
         self.ln_3 = norm_layer(width, elementwise_affine=True, eps=1e-6)
         self.mlp = MLP(width=width, expand_ratio=mlp_expand_ratio)
 
-    def forward(self, x: torch.Tensor, data: torch.Tensor):
-        x = x + self.attn(self.ln_1(x), self.ln_2(data))
+    def project_kv(self, data: torch.Tensor):
+        return self.attn.c_kv(self.ln_2(data))
+
+    def forward(self, x: torch.Tensor, data: Optional[torch.Tensor] = None, kv: Optional[torch.Tensor] = None):
+        """kv, if given, is project_kv(data), for callers attending to the same data many times."""
+        if kv is None:
+            x = x + self.attn(self.ln_1(x), self.ln_2(data))
+        else:
+            x = x + self.attn(self.ln_1(x), kv=kv)
         x = x + self.mlp(self.ln_3(x))
         return x
 
@@ -474,20 +483,51 @@ class CrossAttentionDecoder(nn.Module):
         self.output_proj = nn.Linear(width, out_channels)
         self.label_type = label_type
         self.count = 0
+        self._kv_cache = None
 
     def set_cross_attention_processor(self, processor):
         self.cross_attn_decoder.attn.attention.attn_processor = processor
 
     def set_default_cross_attention_processor(self):
-        self.cross_attn_decoder.attn.attention.attn_processor = CrossAttentionProcessor
+        self.cross_attn_decoder.attn.attention.attn_processor = CrossAttentionProcessor()
+
+    @contextmanager
+    def cache_latents(self):
+        """
+        Inside, the cross-attention keys and values are projected once per latents tensor and
+        reused by every query chunk decoded against it, instead of once per forward call.
+        """
+        self._kv_cache = {}
+        try:
+            yield self
+        finally:
+            self._kv_cache = None
+
+    def project_latents(self, latents):
+        if self.downsample_ratio != 1:
+            latents = self.latents_proj(latents)
+        return self.cross_attn_decoder.project_kv(latents)
+
+    def _latents_kv(self, latents):
+        cache = self._kv_cache
+        if cache is None or torch.is_grad_enabled():
+            return self.project_latents(latents)
+        # Holding latents keeps its identity unique for the comparison
+        entry = cache.get('kv')
+        if entry is not None and entry[0] is latents:
+            return entry[1]
+        kv = self.project_latents(latents)
+        cache['kv'] = (latents, kv)
+        return kv
 
     def forward(self, queries=None, query_embeddings=None, latents=None):
         if query_embeddings is None:
             query_embeddings = self.query_proj(self.fourier_embedder(queries).to(latents.dtype))
         self.count += query_embeddings.shape[1]
-        if self.downsample_ratio != 1:
-            latents = self.latents_proj(latents)
-        x = self.cross_attn_decoder(query_embeddings, latents)
+        kv = self._latents_kv(latents)
+        # One set of latents can serve a batch of query sets
+        kv = kv.expand(query_embeddings.shape[0], -1, -1)
+        x = self.cross_attn_decoder(query_embeddings, kv=kv)
         if self.enable_ln_post:
             x = self.ln_post(x)
         occ = self.output_proj(x)
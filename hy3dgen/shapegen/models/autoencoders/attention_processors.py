@@ -16,6 +16,7 @@ import os
 
 import torch
 import torch.nn.functional as F
+from torch.nn.attention import SDPBackend, sdpa_kernel
 
 scaled_dot_product_attention = F.scaled_dot_product_attention
 if os.environ.get('CA_USE_SAGEATTN', '0') == '1':
@@ -25,16 +26,72 @@ if os.environ.get('CA_USE_SAGEATTN', '0') == '1':
         raise ImportError('Please install the package "sageattention" to use this USE_SAGEATTN.')
     scaled_dot_product_attention = sageattn
 
+ATTENTION_BACKENDS = ('auto', 'flash', 'efficient', 'math', 'chunked')
+ATTENTION_BACKEND = os.environ.get('HY3DGEN_ATTN_BACKEND', 'auto')
+if ATTENTION_BACKEND not in ATTENTION_BACKENDS:
+    raise ValueError(f'Unsupported HY3DGEN_ATTN_BACKEND {ATTENTION_BACKEND}, available: {ATTENTION_BACKENDS}')
+
+# SDPA kernels allowed per backend, the preferred one first, the others as fallbacks
+SDPA_KERNELS = {
+    'flash': [SDPBackend.FLASH_ATTENTION, SDPBackend.EFFICIENT_ATTENTION, SDPBackend.MATH],
+    'efficient': [SDPBackend.EFFICIENT_ATTENTION, SDPBackend.MATH],
+    'math': [SDPBackend.MATH],
+}
+# The chunked backend splits the queries so that one chunk's attention scores stay under this
+CHUNKED_ATTENTION_BYTES = 256 * 1024 ** 2
+
+
+def select_attention_backend(q, k):
+    """
+    Attention backend for 'auto': SDPA's flash kernel where the device has one that takes q
+    (on CPU it is a tiled kernel too), memory-efficient attention on CUDA otherwise, and
+    chunked math attention on devices that only have the math kernel once the score matrix
+    gets large.
+    """
+    if q.device.type == 'cuda':
+        if q.dtype in (torch.float16, torch.bfloat16) and q.shape[-1] <= 256:
+            return 'flash'
+        return 'efficient'
+    if q.device.type == 'cpu':
+        return 'flash'
+    scores = q.shape[:-1].numel() * k.shape[-2] * q.element_size()
+    return 'chunked' if scores > CHUNKED_ATTENTION_BYTES else 'math'
+
+
+def chunked_attention(q, k, v):
+    rows = max(1, CHUNKED_ATTENTION_BYTES // (q.shape[:-2].numel() * k.shape[-2] * q.element_size()))
+    out = q.new_empty(*q.shape[:-1], v.shape[-1])
+    for start in range(0, q.shape[-2], rows):
+        out[..., start:start + rows, :] = F.scaled_dot_product_attention(q[..., start:start + rows, :], k, v)
+    return out
+
+
+def attention(q, k, v, backend=None):
+    """scaled_dot_product_attention(q, k, v) on the given backend, HY3DGEN_ATTN_BACKEND by default."""
+    if scaled_dot_product_attention is not F.scaled_dot_product_attention:
+        return scaled_dot_product_attention(q, k, v)
+    backend = backend or ATTENTION_BACKEND
+    if backend == 'auto':
+        backend = select_attention_backend(q, k)
+    if backend == 'chunked':
+        return chunked_attention(q, k, v)
+    with sdpa_kernel(SDPA_KERNELS[backend]):
+        return F.scaled_dot_product_attention(q, k, v)
+
 
 class CrossAttentionProcessor:
+    def __init__(self, backend=None):
+        self.backend = backend
+
     def __call__(self, attn, q, k, v):
-        out = scaled_dot_product_attention(q, k, v)
+        out = attention(q, k, v, self.backend)
         return out
 
 
 class FlashVDMCrossAttentionProcessor:
-    def __init__(self, topk=None):
+    def __init__(self, topk=None, backend=None):
         self.topk = topk
+        self.backend = backend
 
     def __call__(self, attn, q, k, v):
         if k.shape[-2] == 3072:
@@ -52,9 +109,9 @@ class FlashVDMCrossAttentionProcessor:
             topk_ind = topk_ind.expand(-1, -1, -1, v.shape[-1])
             v0 = torch.gather(v, dim=-2, index=topk_ind)
             k0 = torch.gather(k, dim=-2, index=topk_ind)
-            out = scaled_dot_product_attention(q, k0, v0)
+            out = attention(q, k0, v0, self.backend)
         elif self.topk is False:
-            out = scaled_dot_product_attention(q, k, v)
+            out = attention(q, k, v, self.backend)
         else:
             idx, counts = self.topk
             start = 0
@@ -63,7 +120,7 @@ class FlashVDMCrossAttentionProcessor:
                 end = start + count
                 q_chunk = q[:, :, start:end, :]
                 k0, v0 = self.select_topkv(q_chunk, k, v, topk)
-                out = scaled_dot_product_attention(q_chunk, k0, v0)
+                out = attention(q_chunk, k0, v0, self.backend)
                 outs.append(out)
                 start += count
             out = torch.cat(outs, dim=-2)
@@ -88,8 +145,10 @@ class FlashVDMTopMCrossAttentionProcessor(FlashVDMCrossAttentionProcessor):
         # sim = sim.to(torch.float32)
         sim = sim.softmax(-1)
         sim = torch.mean(sim, 1)
-        activated_token = torch.where(sim > 1e-6)[2]
-        index = torch.unique(activated_token, return_counts=True)[0].unsqueeze(0).unsqueeze(0).unsqueeze(-1)
+        # Sorted keys any sampled query attends to: one host sync for their count, where
+        # torch.where followed by torch.unique synced twice and sorted every hit
+        activated = (sim > 1e-6).flatten(0, 1).any(dim=0)
+        index = activated.nonzero()[None, None]
         index = index.expand(-1, v.shape[1], -1, v.shape[-1])
         v0 = torch.gather(v, dim=-2, index=index)
         k0 = torch.gather(k, dim=-2, index=index)
@@ -18,11 +18,11 @@ import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from einops import repeat
 from tqdm import tqdm
 
 from .attention_blocks import CrossAttentionDecoder
 from .attention_processors import FlashVDMCrossAttentionProcessor, FlashVDMTopMCrossAttentionProcessor
+from ...cpu_backend import parallel_map
 from ...utils import logger
 
 
@@ -138,6 +138,45 @@ def generate_dense_grid_points(
     return xyz, grid_size, length
 
 
+def decode_chunks(
+    geo_decoder: Callable,
+    queries: torch.Tensor,
+    latents: torch.FloatTensor,
+    num_chunks: int,
+    num_workers: int = 1,
+    desc: str = "Volume Decoding",
+    enable_pbar: bool = True,
+):
+    """
+    Logits [B, P, C] of the query points [P, 3], decoded num_chunks points at a time straight
+    into one preallocated tensor. num_workers > 1 decodes chunks concurrently on CPU threads.
+    """
+    batch_size = latents.shape[0]
+    starts = list(range(0, queries.shape[0], num_chunks))
+    pbar = tqdm(total=len(starts), desc=desc, disable=not enable_pbar)
+
+    def decode(start):
+        chunk_queries = queries[start: start + num_chunks].to(latents.dtype)
+        chunk_queries = chunk_queries.unsqueeze(0).expand(batch_size, -1, -1)
+        logits = geo_decoder(queries=chunk_queries, latents=latents)
+        pbar.update(1)
+        return logits
+
+    # The first chunk fixes the output channels and dtype, the others write into their slice
+    first = decode(starts[0])
+    grid_logits = torch.empty((batch_size, queries.shape[0], first.shape[-1]), dtype=first.dtype,
+                              device=first.device)
+    grid_logits[:, :first.shape[1]] = first
+
+    def decode_into(start):
+        grid_logits[:, start: start + num_chunks] = decode(start)
+
+    workers = num_workers if latents.device.type == 'cpu' else 1
+    parallel_map(decode_into, starts[1:], workers)
+    pbar.close()
+    return grid_logits
+
+
 class VanillaVolumeDecoder:
     @torch.no_grad()
     def __call__(
@@ -148,6 +187,7 @@ class VanillaVolumeDecoder:
         num_chunks: int = 10000,
         octree_resolution: int = None,
         enable_pbar: bool = True,
+        num_workers: int = 1,
         **kwargs,
     ):
         device = latents.device
@@ -168,15 +208,8 @@ class VanillaVolumeDecoder:
         xyz_samples = torch.from_numpy(xyz_samples).to(device, dtype=dtype).contiguous().reshape(-1, 3)
 
         # 2. latents to 3d volume
-        batch_logits = []
-        for start in tqdm(range(0, xyz_samples.shape[0], num_chunks), desc="Volume Decoding",
-                          disable=not enable_pbar):
-            chunk_queries = xyz_samples[start: start + num_chunks, :]
-            chunk_queries = repeat(chunk_queries, "p c -> b p c", b=batch_size)
-            logits = geo_decoder(queries=chunk_queries, latents=latents)
-            batch_logits.append(logits)
-
-        grid_logits = torch.cat(batch_logits, dim=1)
+        grid_logits = decode_chunks(geo_decoder, xyz_samples, latents, num_chunks, num_workers,
+                                    enable_pbar=enable_pbar)
         grid_logits = grid_logits.view((batch_size, *grid_size)).float()
 
         return grid_logits
@@ -194,6 +227,7 @@ class HierarchicalVolumeDecoding:
         octree_resolution: int = None,
         min_resolution: int = 63,
         enable_pbar: bool = True,
+        num_workers: int = 1,
         **kwargs,
     ):
         device = latents.device
@@ -228,16 +262,11 @@ class HierarchicalVolumeDecoding:
         xyz_samples = torch.from_numpy(xyz_samples).to(device, dtype=dtype).contiguous().reshape(-1, 3)
 
         # 2. latents to 3d volume
-        batch_logits = []
         batch_size = latents.shape[0]
-        for start in tqdm(range(0, xyz_samples.shape[0], num_chunks),
-                          desc=f"Hierarchical Volume Decoding [r{resolutions[0] + 1}]"):
-            queries = xyz_samples[start: start + num_chunks, :]
-            batch_queries = repeat(queries, "p c -> b p c", b=batch_size)
-            logits = geo_decoder(queries=batch_queries, latents=latents)
-            batch_logits.append(logits)
-
-        grid_logits = torch.cat(batch_logits, dim=1).view((batch_size, grid_size[0], grid_size[1], grid_size[2]))
+        grid_logits = decode_chunks(geo_decoder, xyz_samples, latents, num_chunks, num_workers,
+                                    desc=f"Hierarchical Volume Decoding [r{resolutions[0] + 1}]",
+                                    enable_pbar=enable_pbar)
+        grid_logits = grid_logits.view((batch_size, grid_size[0], grid_size[1], grid_size[2]))
 
         for octree_depth_now in resolutions[1:]:
             grid_size = np.array([octree_depth_now + 1] * 3)
@@ -262,14 +291,9 @@ class HierarchicalVolumeDecoding:
             next_points = torch.stack(nidx, dim=1)
             next_points = (next_points * torch.tensor(resolution, dtype=next_points.dtype, device=device) +
                            torch.tensor(bbox_min, dtype=next_points.dtype, device=device))
-            batch_logits = []
-            for start in tqdm(range(0, next_points.shape[0], num_chunks),
-                              desc=f"Hierarchical Volume Decoding [r{octree_depth_now + 1}]"):
-                queries = next_points[start: start + num_chunks, :]
-                batch_queries = repeat(queries, "p c -> b p c", b=batch_size)
-                logits = geo_decoder(queries=batch_queries.to(latents.dtype), latents=latents)
-                batch_logits.append(logits)
-            grid_logits = torch.cat(batch_logits, dim=1)
+            grid_logits = decode_chunks(geo_decoder, next_points, latents, num_chunks, num_workers,
+                                        desc=f"Hierarchical Volume Decoding [r{octree_depth_now + 1}]",
+                                        enable_pbar=enable_pbar)
             next_logits[nidx] = grid_logits[0, ..., 0]
             grid_logits = next_logits.unsqueeze(0)
         grid_logits[grid_logits == -10000.] = float('nan')
@@ -357,10 +381,9 @@ class FlashVDMVolumeDecoding:
         for start in tqdm(range(0, xyz_samples.shape[0], num_batchs),
                           desc="FlashVDM Volume Decoding", disable=not enable_pbar):
             queries = xyz_samples[start: start + num_batchs, :]
-            batch = queries.shape[0]
-            batch_latents = repeat(latents.squeeze(0), "p c -> b p c", b=batch)
             processor.topk = True
-            logits = geo_decoder(queries=queries, latents=batch_latents)
+            # The latents' keys and values broadcast over the batch of mini grids
+            logits = geo_decoder(queries=queries, latents=latents)
             batch_logits.append(logits)
         grid_logits = torch.cat(batch_logits, dim=0).reshape(
             mini_grid_num, mini_grid_num, mini_grid_num,
@@ -33,6 +33,8 @@ from transformers import (
     Dinov2Config,
 )
 
+from ...encoder_registry import encoder_registry
+
 
 def get_1d_sincos_pos_embed_from_grid(embed_dim, pos):
     """
@@ -88,33 +90,38 @@ class ImageEncoder(nn.Module):
             ]
         )
 
+        # The unconditional embedding is all zeros; keep one row as a buffer so it follows
+        # .to() and only gets expanded to the batch size per job
+        self.register_buffer(
+            'uncond_embedding',
+            torch.zeros(1, self.num_patches, self.model.config.hidden_size, dtype=self.model.dtype),
+            persistent=False,
+        )
+
     def forward(self, image, mask=None, value_range=(-1, 1), **kwargs):
+        # Copy first, non-blocking from the image processor's pinned tensor
+        image = image.to(self.model.device, non_blocking=True)
         if value_range is not None:
             low, high = value_range
             image = (image - low) / (high - low)
 
-        image = image.to(self.model.device, dtype=self.model.dtype)
+        image = image.to(dtype=self.model.dtype)
         inputs = self.transform(image)
-        outputs = self.model(inputs)
-
-        last_hidden_state = outputs.last_hidden_state
+        last_hidden_state = self.encode(inputs)
         if not self.use_cls_token:
             last_hidden_state = last_hidden_state[:, 1:, :]
 
         return last_hidden_state
 
-    def unconditional_embedding(self, batch_size, **kwargs):
-        device = next(self.model.parameters()).device
-        dtype = next(self.model.parameters()).dtype
-        zero = torch.zeros(
-            batch_size,
-            self.num_patches,
-            self.model.config.hidden_size,
-            device=device,
-            dtype=dtype,
-        )
+    def encode(self, inputs):
+        # Features of identical inputs are computed once per job, see EncoderRegistry
+        return encoder_registry.cached_features(self.model, inputs, lambda: self.model(inputs).last_hidden_state)
 
-        return zero
+    def share_backbone(self):
+        self.model = encoder_registry.share(self.model)
+
+    def unconditional_embedding(self, batch_size, **kwargs):
+        return self.uncond_embedding.expand(batch_size, -1, -1)
 
 
 class CLIPImageEncoder(ImageEncoder):
@@ -152,19 +159,18 @@ class DinoImageEncoderMV(DinoImageEncoder):
         self.view_embed = view_embedding.unsqueeze(0)
 
     def forward(self, image, mask=None, value_range=(-1, 1), view_idxs=None):
+        image = image.to(self.model.device, non_blocking=True)
         if value_range is not None:
             low, high = value_range
             image = (image - low) / (high - low)
 
-        image = image.to(self.model.device, dtype=self.model.dtype)
+        image = image.to(dtype=self.model.dtype)
 
         bs, num_views, c, h, w = image.shape
         image = image.view(bs * num_views, c, h, w)
 
         inputs = self.transform(image)
-        outputs = self.model(inputs)
-
-        last_hidden_state = outputs.last_hidden_state
+        last_hidden_state = self.encode(inputs)
         last_hidden_state = last_hidden_state.view(
             bs, num_views, last_hidden_state.shape[-2],
             last_hidden_state.shape[-1]
@@ -188,16 +194,14 @@ class DinoImageEncoderMV(DinoImageEncoder):
         return last_hidden_state
 
     def unconditional_embedding(self, batch_size, view_idxs=None, **kwargs):
-        device = next(self.model.parameters()).device
-        dtype = next(self.model.parameters()).dtype
-        zero = torch.zeros(
-            batch_size,
-            self.num_patches * len(view_idxs[0]),
-            self.model.config.hidden_size,
-            device=device,
-            dtype=dtype,
-        )
-        return zero
+        return self.uncond_embedding.expand(batch_size, -1, -1).repeat(1, len(view_idxs[0]), 1)
+
+
+def share_image_encoders(conditioner: nn.Module):
+    """Swaps the conditioner's vision backbones for the process-wide copies with the same weights."""
+    for module in conditioner.modules():
+        if isinstance(module, ImageEncoder):
+            module.share_backbone()
 
 
 def build_image_encoder(config):
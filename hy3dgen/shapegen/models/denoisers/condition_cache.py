@@ -0,0 +1,45 @@
+# Hunyuan 3D is licensed under the TENCENT HUNYUAN NON-COMMERCIAL LICENSE AGREEMENT
+# except for the third-party components listed below.
+# Hunyuan 3D does not impose any additional limitations beyond what is outlined
+# in the repsective licenses of these third-party components.
+# Users must comply with all terms and conditions of original licenses of these third-party
+# components and must ensure that the usage of the third party components adheres to
+# all relevant laws and regulations.
+
+# For avoidance of doubts, Hunyuan 3D means the large language models and
+# their software and algorithms, including trained model weights, parameters (including
+# optimizer states), machine-learning model code, inference-enabling code, training-enabling code,
+# fine-tuning enabling code and other elements of the foregoing made publicly available
+# by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
+
+from contextlib import contextmanager
+
+
+class ConditionCacheMixin:
+    """
+    Step-invariant caching for denoisers. Inside `cache_conditions()`, values derived only
+    from the condition contexts are computed on the first denoising step and reused while
+    the same context tensors keep being passed in, which they are for every step of a job.
+    """
+    _condition_cache = None
+
+    @contextmanager
+    def cache_conditions(self):
+        self._condition_cache = {}
+        try:
+            yield self
+        finally:
+            self._condition_cache = None
+
+    def cached_condition(self, name, contexts, compute):
+        if self._condition_cache is None:
+            return compute()
+        # Holding the context tensors keeps their identity unique for the comparison
+        tensors = tuple(contexts[k] for k in sorted(contexts))
+        entry = self._condition_cache.get(name)
+        if entry is not None and len(entry[0]) == len(tensors) and \
+                all(a is b for a, b in zip(entry[0], tensors)):
+            return entry[1]
+        value = compute()
+        self._condition_cache[name] = (tensors, value)
+        return value
@@ -21,6 +21,8 @@ import torch
 from einops import rearrange
 from torch import Tensor, nn
 
+from .condition_cache import ConditionCacheMixin
+
 scaled_dot_product_attention = nn.functional.scaled_dot_product_attention
 if os.environ.get('USE_SAGEATTN', '0') == '1':
     try:
@@ -281,7 +283,7 @@ class LastLayer(nn.Module):
         return x
 
 
-class Hunyuan3DDiT(nn.Module):
+class Hunyuan3DDiT(ConditionCacheMixin, nn.Module):
     def __init__(
         self,
         in_channels: int = 64,
@@ -395,7 +397,9 @@ class Hunyuan3DDiT(nn.Module):
                 raise ValueError("Didn't get guidance strength for guidance distilled model.")
             vec = vec + self.guidance_in(timestep_embedding(guidance, 256, self.time_factor))
 
-        cond = self.cond_in(cond)
+        # The text stream is modulated by the timestep from the first block on, so the
+        # input projection is the only step-invariant part of it
+        cond = self.cached_condition('cond_in', contexts, lambda: self.cond_in(cond))
         pe = None
 
         for block in self.double_blocks:
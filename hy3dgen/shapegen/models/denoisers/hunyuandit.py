@@ -20,6 +20,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 from einops import rearrange
 
+from .condition_cache import ConditionCacheMixin
 from .moe_layers import MoEBlock
 
 
@@ -161,29 +162,25 @@ class CrossAttention(nn.Module):
             self.dca_dim = decoupled_ca_dim
             self.dca_weight = decoupled_ca_weight
 
-    def forward(self, x, y):
+    def project_kv(self, y):
         """
-        Parameters
-        ----------
-        x: torch.Tensor
-            (batch, seqlen1, hidden_dim) (where hidden_dim = num heads * head dim)
-        y: torch.Tensor
-            (batch, seqlen2, hidden_dim2)
-        freqs_cis_img: torch.Tensor
-            (batch, hidden_dim // 2), RoPE for image
+        Keys and values of the context y, [b, h, s2, d] each, followed by the decoupled
+        keys and values (None without decoupled cross-attention). Depends on y only, so a
+        denoiser can compute it once per job and pass it back in as `kv`.
         """
-        b, s1, c = x.shape  # [b, s1, D]
-
+        b = y.shape[0]
+        k_dca = v_dca = None
         if self.with_dca:
             token_len = y.shape[1]
             context_dca = y[:, -self.dca_dim:, :]
             kv_dca = self.kv_proj_dca(context_dca).view(b, self.dca_dim, 2, self.num_heads, self.head_dim)
             k_dca, v_dca = kv_dca.unbind(dim=2)  # [b, s, h, d]
             k_dca = self.k_norm_dca(k_dca)
+            k_dca, v_dca = map(lambda t: rearrange(t, 'b n h d -> b h n d', h=self.num_heads),
+                               (k_dca, v_dca))
             y = y[:, :(token_len - self.dca_dim), :]
 
         _, s2, c = y.shape  # [b, s2, 1024]
-        q = self.to_q(x)
         k = self.to_k(y)
         v = self.to_v(y)
 
@@ -192,19 +189,37 @@ class CrossAttention(nn.Module):
         kv = kv.view(1, -1, self.num_heads, split_size * 2)
         k, v = torch.split(kv, split_size, dim=-1)
 
-        q = q.view(b, s1, self.num_heads, self.head_dim)  # [b, s1, h, d]
         k = k.view(b, s2, self.num_heads, self.head_dim)  # [b, s2, h, d]
         v = v.view(b, s2, self.num_heads, self.head_dim)  # [b, s2, h, d]
+        k = self.k_norm(k)
+
+        k, v = map(lambda t: rearrange(t, 'b n h d -> b h n d', h=self.num_heads), (k, v))
+        return k, v, k_dca, v_dca
+
+    def forward(self, x, y, kv=None):
+        """
+        Parameters
+        ----------
+        x: torch.Tensor
+            (batch, seqlen1, hidden_dim) (where hidden_dim = num heads * head dim)
+        y: torch.Tensor
+            (batch, seqlen2, hidden_dim2)
+        kv: tuple, optional
+            precomputed `project_kv(y)`
+        """
+        b, s1, c = x.shape  # [b, s1, D]
+        k, v, k_dca, v_dca = self.project_kv(y) if kv is None else kv
 
+        q = self.to_q(x)
+        q = q.view(b, s1, self.num_heads, self.head_dim)  # [b, s1, h, d]
         q = self.q_norm(q)
-        k = self.k_norm(k)
 
         with torch.backends.cuda.sdp_kernel(
             enable_flash=True,
             enable_math=False,
             enable_mem_efficient=True
         ):
-            q, k, v = map(lambda t: rearrange(t, 'b n h d -> b h n d', h=self.num_heads), (q, k, v))
+            q = rearrange(q, 'b n h d -> b h n d', h=self.num_heads)
             context = F.scaled_dot_product_attention(
                 q, k, v
             ).transpose(1, 2).reshape(b, s1, -1)
@@ -215,8 +230,6 @@ class CrossAttention(nn.Module):
                 enable_math=False,
                 enable_mem_efficient=True
             ):
-                k_dca, v_dca = map(lambda t: rearrange(t, 'b n h d -> b h n d', h=self.num_heads),
-                                   (k_dca, v_dca))
                 context_dca = F.scaled_dot_product_attention(
                     q, k_dca, v_dca).transpose(1, 2).reshape(b, s1, -1)
 
@@ -362,7 +375,7 @@ class HunYuanDiTBlock(nn.Module):
         else:
             self.mlp = MLP(width=hidden_size)
 
-    def forward(self, x, c=None, text_states=None, skip_value=None):
+    def forward(self, x, c=None, text_states=None, skip_value=None, text_kv=None):
 
         if self.skip_linear is not None:
             cat = torch.cat([skip_value, x], dim=-1)
@@ -379,7 +392,7 @@ class HunYuanDiTBlock(nn.Module):
         x = x + attn_out
 
         # Cross-Attention
-        x = x + self.attn2(self.norm2(x), text_states)
+        x = x + self.attn2(self.norm2(x), text_states, kv=text_kv)
 
         # FFN Layer
         mlp_inputs = self.norm3(x)
@@ -452,7 +465,7 @@ class FinalLayer(nn.Module):
         return x
 
 
-class HunYuanDiTPlain(nn.Module):
+class HunYuanDiTPlain(ConditionCacheMixin, nn.Module):
 
     def __init__(
         self,
@@ -563,21 +576,28 @@ class HunYuanDiTPlain(nn.Module):
             x = x + pos_embed
 
         if self.use_attention_pooling:
-            extra_vec = self.pooler(cond, None)
-            c = t + self.extra_embedder(extra_vec)  # [B, D]
+            extra_vec = self.cached_condition(
+                'extra_vec', contexts, lambda: self.extra_embedder(self.pooler(cond, None)))
+            c = t + extra_vec  # [B, D]
         else:
             c = t
 
         if self.with_decoupled_ca:
-            additional_cond = self.additional_cond_proj(contexts['additional'])
-            cond = torch.cat([cond, additional_cond], dim=1)
+            cond = self.cached_condition('cond', contexts, lambda: torch.cat(
+                [cond, self.additional_cond_proj(contexts['additional'])], dim=1))
+
+        # Cross-attention keys and values only depend on the condition
+        text_kv = [None] * len(self.blocks)
+        if self._condition_cache is not None:
+            text_kv = self.cached_condition(
+                'text_kv', contexts, lambda: [block.attn2.project_kv(cond) for block in self.blocks])
 
         x = torch.cat([c, x], dim=1)
 
         skip_value_list = []
         for layer, block in enumerate(self.blocks):
             skip_value = None if layer <= self.depth // 2 else skip_value_list.pop()
-            x = block(x, c, cond, skip_value=skip_value)
+            x = block(x, c, cond, skip_value=skip_value, text_kv=text_kv[layer])
             if layer < self.depth // 2:
                 skip_value_list.append(x)
 
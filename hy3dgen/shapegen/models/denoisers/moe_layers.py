@@ -1,10 +1,14 @@
+import logging
 import math
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from diffusers.models.activations import GELU
 from diffusers.models.attention import FeedForward
 
+logger = logging.getLogger(__name__)
+
 
 class AddAuxiliaryLoss(torch.autograd.Function):
     """
@@ -106,6 +110,13 @@ class MoEBlock(nn.Module):
                                           final_dropout=final_dropout, inner_dim=ff_inner_dim,
                                           bias=ff_bias)
 
+        # Grouped GEMM needs plain GELU experts and torch._grouped_mm, and only pays off on
+        # GPUs where it saves the host sync; otherwise, or if the kernel rejects this device
+        # or dtype, or once the experts were swapped for quantized layers, inference uses the
+        # per-expert loop
+        self.use_grouped_mm = hasattr(torch, '_grouped_mm') and isinstance(self.experts[0].net[0], GELU)
+        self._stacked = None
+
     def initialize_weight(self):
         pass
 
@@ -129,23 +140,82 @@ class MoEBlock(nn.Module):
         y = y + self.shared_experts(identity)
         return y
 
+    def stacked_expert_weights(self):
+        """
+        Expert weights stacked as (w1 [E, inner, dim], b1 [E, inner], w2 [E, dim, inner], b2 [E, dim]).
+        The experts' own parameters are re-pointed to views of the stacks, so stacking costs
+        no extra memory and is only redone after .to() or a state dict load replaced them.
+        """
+        layers = [(expert.net[0].proj, expert.net[2]) for expert in self.experts]
+        if self._stacked is not None and all(
+                up.weight.data_ptr() == self._stacked[0][i].data_ptr() and
+                down.weight.data_ptr() == self._stacked[2][i].data_ptr()
+                for i, (up, down) in enumerate(layers)):
+            return self._stacked
+
+        stacked = []
+        for layer_idx, name in ((0, 'weight'), (0, 'bias'), (1, 'weight'), (1, 'bias')):
+            params = [getattr(pair[layer_idx], name) for pair in layers]
+            if params[0] is None:
+                stacked.append(None)
+                continue
+            stack = torch.stack([p.data for p in params])
+            for i, param in enumerate(params):
+                param.data = stack[i]
+            stacked.append(stack)
+        self._stacked = tuple(stacked)
+        return self._stacked
+
     @torch.no_grad()
     def moe_infer(self, x, flat_expert_indices, flat_expert_weights):
-        expert_cache = torch.zeros_like(x)
+        if self.use_grouped_mm and x.is_cuda and isinstance(self.experts[0].net[2], nn.Linear):
+            try:
+                return self.moe_infer_grouped(x, flat_expert_indices, flat_expert_weights)
+            except RuntimeError as e:
+                logger.warning(f"Grouped MoE GEMM unavailable ({e}), using the per-expert loop")
+                self.use_grouped_mm = False
+        return self.moe_infer_loop(x, flat_expert_indices, flat_expert_weights)
+
+    @torch.no_grad()
+    def moe_infer_grouped(self, x, flat_expert_indices, flat_expert_weights):
+        """
+        All experts in two grouped GEMMs over the expert-sorted tokens. Group offsets stay
+        on the device, so there is no host sync and no Python loop over experts.
+        """
+        w1, b1, w2, b2 = self.stacked_expert_weights()
         idxs = flat_expert_indices.argsort()
-        tokens_per_expert = flat_expert_indices.bincount().cpu().numpy().cumsum(0)
+        sorted_experts = flat_expert_indices[idxs]
+        offsets = torch.bincount(flat_expert_indices, minlength=len(self.experts)).cumsum(0).to(torch.int32)
         token_idxs = idxs // self.moe_top_k
-        for i, end_idx in enumerate(tokens_per_expert):
-            start_idx = 0 if i == 0 else tokens_per_expert[i - 1]
-            if start_idx == end_idx:
-                continue
-            expert = self.experts[i]
-            exp_token_idx = token_idxs[start_idx:end_idx]
-            expert_tokens = x[exp_token_idx]
-            expert_out = expert(expert_tokens)
-            expert_out.mul_(flat_expert_weights[idxs[start_idx:end_idx]])
-
-            # for fp16 and other dtype
-            expert_cache = expert_cache.to(expert_out.dtype)
-            expert_cache.scatter_reduce_(0, exp_token_idx.view(-1, 1).repeat(1, x.shape[-1]), expert_out, reduce='sum')
-        return expert_cache
+
+        hidden = torch._grouped_mm(x[token_idxs], w1.transpose(1, 2), offs=offsets)
+        if b1 is not None:
+            hidden += b1[sorted_experts]
+        hidden = self.experts[0].net[0].gelu(hidden)
+        expert_out = torch._grouped_mm(hidden, w2.transpose(1, 2), offs=offsets)
+        if b2 is not None:
+            expert_out += b2[sorted_experts]
+        expert_out.mul_(flat_expert_weights[idxs])
+
+        expert_cache = torch.zeros_like(x, dtype=expert_out.dtype)
+        return expert_cache.index_add_(0, token_idxs, expert_out)
+
+    @torch.no_grad()
+    def moe_infer_loop(self, x, flat_expert_indices, flat_expert_weights):
+        # One matmul per expert, with a single host sync for the group sizes
+        idxs = flat_expert_indices.argsort()
+        tokens_per_expert = torch.bincount(flat_expert_indices, minlength=len(self.experts)).tolist()
+        token_idxs = idxs // self.moe_top_k
+        expert_tokens = x[token_idxs]
+        expert_weights = flat_expert_weights[idxs]
+
+        outputs = []
+        start_idx = 0
+        for expert, count in zip(self.experts, tokens_per_expert):
+            if count:
+                outputs.append(expert(expert_tokens[start_idx:start_idx + count]))
+            start_idx += count
+        expert_out = torch.cat(outputs).mul_(expert_weights)
+
+        expert_cache = torch.zeros_like(x, dtype=expert_out.dtype)
+        return expert_cache.index_add_(0, token_idxs, expert_out)
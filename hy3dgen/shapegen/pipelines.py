@@ -12,6 +12,7 @@
 # fine-tuning enabling code and other elements of the foregoing made publicly available
 # by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
 
+import contextlib
 import copy
 import importlib
 import inspect
@@ -28,9 +29,14 @@ from diffusers.utils.torch_utils import randn_tensor
 from diffusers.utils.import_utils import is_accelerate_version, is_accelerate_available
 from tqdm import tqdm
 
-from .models.autoencoders import ShapeVAE
+from .models.autoencoders import ShapeVAE, CrossAttentionDecoder
 from .models.autoencoders import SurfaceExtractors
+from .models.conditioner import share_image_encoders
+from .compilation import CompilationManager, ShapeBuckets
+from .cpu_backend import resolve_cpu_dtype, configure_cpu_threads, default_decode_workers
 from .utils import logger, synchronize_timer, smart_load_model
+from ..meshops.mesh_buffer import MeshBuffer
+from ..quantization import quantize_model, prepare_quantized, quantization_metadata, read_quantization_metadata
 
 
 def retrieve_timesteps(
@@ -100,14 +106,10 @@ def export_to_trimesh(mesh_output):
             if mesh is None:
                 outputs.append(None)
             else:
-                mesh.mesh_f = mesh.mesh_f[:, ::-1]
-                mesh_output = trimesh.Trimesh(mesh.mesh_v, mesh.mesh_f)
-                outputs.append(mesh_output)
+                outputs.append(MeshBuffer.from_latent(mesh).flip_winding().to_trimesh())
         return outputs
     else:
-        mesh_output.mesh_f = mesh_output.mesh_f[:, ::-1]
-        mesh_output = trimesh.Trimesh(mesh_output.mesh_v, mesh_output.mesh_f)
-        return mesh_output
+        return MeshBuffer.from_latent(mesh_output).flip_winding().to_trimesh()
 
 
 def get_obj_from_str(string, reload=False):
@@ -133,6 +135,23 @@ def instantiate_from_config(config, **kwargs):
     return instance
 
 
+# Modules whose nn.Linear layers are quantized per component, None meaning the whole component
+QUANTIZED_MODULES = {
+    'model': None,
+    'vae': (CrossAttentionDecoder,),
+}
+
+
+def quantize_components(components, quantization):
+    if quantization is None:
+        return
+    if quantization != 'int8':
+        raise ValueError(f"Unsupported quantization: {quantization}, expected 'int8'")
+    for name, include in QUANTIZED_MODULES.items():
+        if name in components:
+            quantize_model(components[name], include=include)
+
+
 class Hunyuan3DDiTPipeline:
     model_cpu_offload_seq = "conditioner->model->vae"
     _exclude_from_cpu_offload = []
@@ -146,6 +165,7 @@ class Hunyuan3DDiTPipeline:
         device='cuda',
         dtype=torch.float16,
         use_safetensors=None,
+        quantization=None,
         **kwargs,
     ):
         # load config
@@ -159,9 +179,13 @@ class Hunyuan3DDiTPipeline:
             raise FileNotFoundError(f"Model file {ckpt_path} not found")
         logger.info(f"Loading model from {ckpt_path}")
 
+        quantized = {}
         if use_safetensors:
             # parse safetensors
+            import safetensors
             import safetensors.torch
+            with safetensors.safe_open(ckpt_path, framework='pt') as f:
+                quantized = read_quantization_metadata(f.metadata())
             safetensors_ckpt = safetensors.torch.load_file(ckpt_path, device='cpu')
             ckpt = {}
             for key, value in safetensors_ckpt.items():
@@ -172,10 +196,12 @@ class Hunyuan3DDiTPipeline:
                 ckpt[model_name][new_key] = value
         else:
             ckpt = torch.load(ckpt_path, map_location='cpu', weights_only=True)
-        # load model
+        # load model, a quantized checkpoint needs its int8 layers in place first
         model = instantiate_from_config(config['model'])
+        prepare_quantized(model, quantized.get('model', []))
         model.load_state_dict(ckpt['model'])
         vae = instantiate_from_config(config['vae'])
+        prepare_quantized(vae, quantized.get('vae', []))
         vae.load_state_dict(ckpt['vae'], strict=False)
         conditioner = instantiate_from_config(config['conditioner'])
         if 'conditioner' in ckpt:
@@ -183,6 +209,11 @@ class Hunyuan3DDiTPipeline:
         image_processor = instantiate_from_config(config['image_processor'])
         scheduler = instantiate_from_config(config['scheduler'])
 
+        if quantized:
+            quantization = 'int8'
+        else:
+            quantize_components(dict(model=model, vae=vae), quantization)
+
         model_kwargs = dict(
             vae=vae,
             model=model,
@@ -192,6 +223,7 @@ class Hunyuan3DDiTPipeline:
             device=device,
             dtype=dtype,
             low_vram_mode=kwargs.get('low_vram_mode', False),
+            quantization=quantization,
         )
         model_kwargs.update(kwargs)
 
@@ -243,6 +275,9 @@ class Hunyuan3DDiTPipeline:
         device='cuda',
         dtype=torch.float16,
         low_vram_mode=False,
+        quantization=None,
+        cpu_threads=None,
+        decode_workers=None,
         **kwargs
     ):
         self.vae = vae
@@ -252,17 +287,71 @@ class Hunyuan3DDiTPipeline:
         self.image_processor = image_processor
         self.kwargs = kwargs
         self.low_vram_mode = low_vram_mode
+        # Weight-only int8 for the denoiser and the VAE decoder, see QUANTIZED_MODULES
+        self.quantization = quantization
+        # Compute the condition-only denoiser projections once per job instead of per step
+        self.cache_step_invariant = True
+        # Volume-decoding chunks decoded concurrently, only used on CPU
+        self.decode_workers = 1
+        # Set by compile()
+        self.compilation = None
+        if torch.device(device).type == 'cpu' and not low_vram_mode:
+            dtype = resolve_cpu_dtype(dtype)
+            cpu_threads = configure_cpu_threads(cpu_threads)
+            self.decode_workers = decode_workers or default_decode_workers(cpu_threads)
         if not low_vram_mode:
             self.to(device, dtype)
+            if self.device.type == 'cpu':
+                # oneDNN convolutions (the image encoder's patch embedding) prefer NHWC
+                self.conditioner.to(memory_format=torch.channels_last)
+            # One copy of a DINO/CLIP backbone across pipelines loaded with the same weights
+            share_image_encoders(self.conditioner)
         else:
             self.dtype = dtype
             self.device = torch.device('cpu') # Default to CPU in low vram
             self.to(dtype=dtype) # Ensure weights are cast to the correct dtype (e.g. float16)
 
-    def compile(self):
-        self.vae = torch.compile(self.vae)
-        self.model = torch.compile(self.model)
-        self.conditioner = torch.compile(self.conditioner)
+    def compile(self, batch_sizes=None, chunk_sizes=(8000,), backend='inductor', mode=None, cache_dir=None):
+        """
+        Compiles the denoiser's transformer blocks for the denoiser batch sizes and the geo
+        decoder for the volume-decoding chunk sizes, see CompilationManager. Inputs are padded
+        to the nearest bucket. Run warmup() to build the graphs before the first request.
+        batch_sizes defaults to one image: batch 1 for guidance-distilled models, which run
+        without classifier-free guidance, and 2 otherwise.
+        """
+        if batch_sizes is None:
+            batch_sizes = (1,) if getattr(self.model, 'guidance_embed', False) is True else (2,)
+        self.compilation = CompilationManager(ShapeBuckets(batch_sizes, chunk_sizes), backend, mode, cache_dir)
+        self.compilation.compile_denoiser(self.model)
+        self.compilation.compile_geo_decoder(self.vae.geo_decoder)
+
+    @torch.inference_mode()
+    def warmup(self, **cond_kwargs):
+        """
+        Runs every compiled shape bucket once, so that compilation (or loading compiled graphs
+        from the inductor cache) happens at model load and not on the first request.
+        cond_kwargs go to the conditioner's unconditional embedding, e.g. view_idxs for MV models.
+        """
+        compilation = self.compilation
+        if compilation is None or compilation.failed:
+            return
+        device, dtype = self._execution_device, self.dtype
+        with synchronize_timer('Compile warm-up'):
+            for batch_size in compilation.batch_sizes:
+                cond = self.conditioner.unconditional_embedding(batch_size, **cond_kwargs)
+                latents = torch.randn(batch_size, *self.vae.latent_shape, device=device, dtype=dtype)
+                timestep = torch.full((batch_size,), 0.5, device=device, dtype=dtype)
+                guidance = None
+                if getattr(self.model, 'guidance_embed', False) is True:
+                    guidance = torch.full((batch_size,), 5.0, device=device, dtype=dtype)
+                with self.condition_cache():
+                    # The second step takes the cached condition projections like sampling does
+                    for _ in range(2):
+                        self.model(latents, timestep, cond, guidance=guidance)
+            latents = self.vae(torch.zeros(1, *self.vae.latent_shape, device=device, dtype=dtype))
+            for chunk_size in compilation.chunk_sizes:
+                queries = torch.zeros(1, chunk_size, 3, device=device, dtype=dtype)
+                self.vae.geo_decoder(queries=queries, latents=latents)
 
     def enable_flashvdm(
         self,
@@ -287,6 +376,9 @@ class Hunyuan3DDiTPipeline:
                     use_safetensors=self.kwargs['from_pretrained_kwargs']['use_safetensors'],
                     device=self.device,
                 )
+                quantize_components(dict(vae=self.vae), self.quantization)
+                if self.compilation is not None:
+                    self.compilation.compile_geo_decoder(self.vae.geo_decoder)
             self.vae.enable_flashvdm_decoder(
                 enabled=enabled,
                 adaptive_kv_selection=adaptive_kv_selection,
@@ -304,8 +396,28 @@ class Hunyuan3DDiTPipeline:
             if model_name in vae_mapping:
                 model_path, subfolder = vae_mapping[model_name]
                 self.vae = ShapeVAE.from_pretrained(model_path, subfolder=subfolder)
+                quantize_components(dict(vae=self.vae), self.quantization)
+                if self.compilation is not None:
+                    self.compilation.compile_geo_decoder(self.vae.geo_decoder)
             self.vae.enable_flashvdm_decoder(enabled=False)
 
+    def save_quantized(self, ckpt_path):
+        """
+        Saves the pipeline weights as a single safetensors checkpoint in the layout
+        from_single_file reads, recording the int8 layers in its metadata. Saved as
+        model.int8.safetensors next to config.yaml it loads with from_pretrained(variant='int8').
+        """
+        import safetensors.torch
+        if self.quantization is None:
+            raise ValueError("Pipeline is not quantized, load it with quantization='int8' first")
+        components = dict(model=self.model, vae=self.vae, conditioner=self.conditioner)
+        state_dict = {}
+        for name, module in components.items():
+            for key, value in module.state_dict().items():
+                # Clone so that weights sharing storage (e.g. stacked MoE experts) save separately
+                state_dict[f'{name}.{key}'] = value.detach().to('cpu', copy=True).contiguous()
+        safetensors.torch.save_file(state_dict, ckpt_path, metadata=quantization_metadata(components))
+
     def to(self, device=None, dtype=None):
         if dtype is not None:
             self.dtype = dtype
@@ -472,6 +584,12 @@ class Hunyuan3DDiTPipeline:
                 cond = cat_recursive(cond, un_cond)
         return cond
 
+    def condition_cache(self):
+        model = getattr(self.model, '_orig_mod', self.model)
+        if getattr(self, 'cache_step_invariant', True) and hasattr(model, 'cache_conditions'):
+            return model.cache_conditions()
+        return contextlib.nullcontext()
+
     def prepare_extra_step_kwargs(self, generator, eta):
         # prepare extra kwargs for the scheduler step, since not all schedulers have the same signature
         # eta (η) is only used with the DDIMScheduler, it will be ignored for other schedulers.
@@ -524,7 +642,8 @@ class Hunyuan3DDiTPipeline:
                 cond_input[key].append(value)
         for key, value in cond_input.items():
             if isinstance(value[0], torch.Tensor):
-                cond_input[key] = torch.cat(value, dim=0)
+                # A single image keeps the processor's pinned tensor
+                cond_input[key] = value[0] if len(value) == 1 else torch.cat(value, dim=0)
 
         return cond_input
 
@@ -623,7 +742,7 @@ class Hunyuan3DDiTPipeline:
             guidance_cond = self.get_guidance_scale_embedding(
                 guidance_scale_tensor, embedding_dim=self.model.guidance_cond_proj_dim
             ).to(device=device, dtype=latents.dtype)
-        with synchronize_timer('Diffusion Sampling'):
+        with synchronize_timer('Diffusion Sampling'), self.condition_cache():
             for i, t in enumerate(tqdm(timesteps, disable=not enable_pbar, desc="Diffusion Sampling:", leave=False)):
                 # expand the latents if we are doing classifier free guidance
                 if do_classifier_free_guidance:
@@ -686,6 +805,7 @@ class Hunyuan3DDiTPipeline:
                 octree_resolution=octree_resolution,
                 mc_algo=mc_algo,
                 enable_pbar=enable_pbar,
+                num_workers=self.decode_workers,
             )
         else:
             outputs = latents
@@ -756,7 +876,7 @@ class Hunyuan3DDiTFlowMatchingPipeline(Hunyuan3DDiTPipeline):
             guidance = torch.tensor([guidance_scale] * batch_size, device=device, dtype=dtype)
             # logger.info(f'Using guidance embed with scale {guidance_scale}')
 
-        with synchronize_timer('Diffusion Sampling'):
+        with synchronize_timer('Diffusion Sampling'), self.condition_cache():
             for i, t in enumerate(tqdm(timesteps, disable=not enable_pbar, desc="Diffusion Sampling:")):
                 # expand the latents if we are doing classifier free guidance
                 if do_classifier_free_guidance:
@@ -22,6 +22,7 @@ import torch
 import trimesh
 
 from .models.autoencoders import Latent2MeshOutput
+from ..meshops.mesh_buffer import MeshBuffer
 from .utils import synchronize_timer
 
 
@@ -59,45 +60,30 @@ def remove_floater(mesh: pymeshlab.MeshSet):
     return mesh
 
 
-def pymeshlab2trimesh(mesh: pymeshlab.MeshSet):
-    with tempfile.NamedTemporaryFile(suffix='.ply', delete=False) as temp_file:
-        mesh.save_current_mesh(temp_file.name)
-        mesh = trimesh.load(temp_file.name)
-    # Check loaded object type
-    if isinstance(mesh, trimesh.Scene):
-        combined_mesh = trimesh.Trimesh()
-        # If Scene, iterate through all geometry and merge
-        for geom in mesh.geometry.values():
-            combined_mesh = trimesh.util.concatenate([combined_mesh, geom])
-        mesh = combined_mesh
-    return mesh
+def pymeshlab2trimesh(mesh: pymeshlab.MeshSet, colors: bool = False):
+    return MeshBuffer.from_pymeshlab(mesh, colors=colors).to_trimesh()
 
 
 def trimesh2pymeshlab(mesh: trimesh.Trimesh):
-    with tempfile.NamedTemporaryFile(suffix='.ply', delete=False) as temp_file:
-        if isinstance(mesh, trimesh.scene.Scene):
-            for idx, obj in enumerate(mesh.geometry.values()):
-                if idx == 0:
-                    temp_mesh = obj
-                else:
-                    temp_mesh = temp_mesh + obj
-            mesh = temp_mesh
-        mesh.export(temp_file.name)
-        mesh = pymeshlab.MeshSet()
-        mesh.load_new_mesh(temp_file.name)
-    return mesh
+    if isinstance(mesh, trimesh.scene.Scene):
+        for idx, obj in enumerate(mesh.geometry.values()):
+            if idx == 0:
+                temp_mesh = obj
+            else:
+                temp_mesh = temp_mesh + obj
+        mesh = temp_mesh
+    return MeshBuffer.from_trimesh(mesh).to_pymeshlab()
 
 
 def export_mesh(input, output):
     if isinstance(input, pymeshlab.MeshSet):
         mesh = output
     elif isinstance(input, Latent2MeshOutput):
-        output = Latent2MeshOutput()
-        output.mesh_v = output.current_mesh().vertex_matrix()
-        output.mesh_f = output.current_mesh().face_matrix()
-        mesh = output
+        buffer = MeshBuffer.from_pymeshlab(output)
+        mesh = Latent2MeshOutput(mesh_v=buffer.vertices, mesh_f=buffer.faces)
     else:
-        mesh = pymeshlab2trimesh(output)
+        # Vertex colors come back only if the input had them
+        mesh = pymeshlab2trimesh(output, colors=getattr(getattr(input, 'visual', None), 'kind', None) == 'vertex')
     return mesh
 
 
@@ -105,9 +91,7 @@ def import_mesh(mesh: Union[pymeshlab.MeshSet, trimesh.Trimesh, Latent2MeshOutpu
     if isinstance(mesh, str):
         mesh = load_mesh(mesh)
     elif isinstance(mesh, Latent2MeshOutput):
-        mesh = pymeshlab.MeshSet()
-        mesh_pymeshlab = pymeshlab.Mesh(vertex_matrix=mesh.mesh_v, face_matrix=mesh.mesh_f)
-        mesh.add_mesh(mesh_pymeshlab, "converted_mesh")
+        mesh = MeshBuffer.from_latent(mesh).to_pymeshlab()
 
     if isinstance(mesh, (trimesh.Trimesh, trimesh.scene.Scene)):
         mesh = trimesh2pymeshlab(mesh)
@@ -15,7 +15,6 @@
 import cv2
 import numpy as np
 import torch
-from PIL import Image
 from einops import repeat, rearrange
 
 
@@ -27,6 +26,35 @@ def array_to_tensor(np_array):
     return image_pts
 
 
+def arrays_to_tensor(np_arrays):
+    """
+    uint8 [N, H, W, C] to one float [N, C, H, W] tensor in [-1, 1], as array_to_tensor does per
+    image. The tensor is pinned when CUDA is available, so the copy to the GPU can be non-blocking.
+    """
+    n, h, w, c = np_arrays.shape
+    image_pts = torch.empty((n, c, h, w), pin_memory=torch.cuda.is_available())
+    image_pts.copy_(torch.from_numpy(np_arrays).permute(0, 3, 1, 2))
+    return image_pts.div_(255).mul_(2).sub_(1)
+
+
+def object_bbox(mask):
+    """Rows and columns of the first and last nonzero mask pixels, from per-row and per-column maxima."""
+    rows = np.flatnonzero(mask.max(axis=1))
+    cols = np.flatnonzero(mask.max(axis=0))
+    if len(rows) == 0:
+        raise ValueError('input image is empty')
+    return rows[0], rows[-1], cols[0], cols[-1]
+
+
+def composite_on_white(image):
+    """RGBA uint8 [H, W, 4] over a white background, in uint16 fixed point with rounding."""
+    alpha = image[..., 3:].astype(np.uint16)
+    result = image[..., :3].astype(np.uint16) * alpha
+    result += (255 - alpha) * 255 + 127
+    result //= 255
+    return result.astype(np.uint8)
+
+
 class ImageProcessorV2:
     def __init__(self, size=512, border_ratio=None):
         self.size = size
@@ -87,24 +115,64 @@ class ImageProcessorV2:
         mask = mask.clip(0, 255).astype(np.uint8)
         return result, mask
 
-    def load_image(self, image, border_ratio=0.15, to_tensor=True):
+    def recenter_into(self, image, border_ratio, out_image, out_mask):
+        """
+        recenter() followed by the resize to the output size, in one resample: the object's
+        bounding box is cropped, composited onto white and resized straight into its place
+        on out_image [size, size, 3], its alpha into out_mask [size, size, 1], both uint8.
+        """
+        if image.shape[-1] == 4:
+            top, bottom, left, right = object_bbox(image[..., 3])
+        else:
+            top, bottom, left, right = 0, image.shape[0] - 1, 0, image.shape[1] - 1
+        # Same box as recenter(), which leaves out the last row and column
+        h, w = bottom - top, right - left
+        if h == 0 or w == 0:
+            raise ValueError('input image is empty')
+        crop = image[top:bottom, left:right]
+
+        size = out_image.shape[0]
+        scale = int(size * (1 - border_ratio)) / max(h, w)
+        h2, w2 = max(1, int(h * scale)), max(1, int(w * scale))
+        y, x = (size - h2) // 2, (size - w2) // 2
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+
+        out_image[:] = 255
+        out_mask[:] = 0
+        if crop.shape[-1] == 4:
+            out_image[y:y + h2, x:x + w2] = cv2.resize(composite_on_white(crop), (w2, h2),
+                                                       interpolation=interpolation)
+            out_mask[y:y + h2, x:x + w2, 0] = cv2.resize(np.ascontiguousarray(crop[..., 3]), (w2, h2),
+                                                         interpolation=interpolation)
+        else:
+            out_image[y:y + h2, x:x + w2] = cv2.resize(crop, (w2, h2), interpolation=interpolation)
+            out_mask[y:y + h2, x:x + w2] = 255
+
+    def read_image(self, image):
+        # RGB(A) uint8 array of a path or PIL image
         if isinstance(image, str):
             image = cv2.imread(image, cv2.IMREAD_UNCHANGED)
-            image, mask = self.recenter(image, border_ratio=border_ratio)
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        elif isinstance(image, Image.Image):
+            code = cv2.COLOR_BGRA2RGBA if image.shape[-1] == 4 else cv2.COLOR_BGR2RGB
+            return cv2.cvtColor(image, code)
+        if image.mode not in ('RGB', 'RGBA'):
             image = image.convert("RGBA")
-            image = np.asarray(image)
-            image, mask = self.recenter(image, border_ratio=border_ratio)
-
-        image = cv2.resize(image, (self.size, self.size), interpolation=cv2.INTER_CUBIC)
-        mask = cv2.resize(mask, (self.size, self.size), interpolation=cv2.INTER_NEAREST)
-        mask = mask[..., np.newaxis]
+        return np.asarray(image)
+
+    def load_images(self, images, border_ratio=0.15, to_tensor=True):
+        """All images recentered into one uint8 batch, or one float tensor if to_tensor."""
+        out_images = np.empty((len(images), self.size, self.size, 3), dtype=np.uint8)
+        out_masks = np.empty((len(images), self.size, self.size, 1), dtype=np.uint8)
+        for image, out_image, out_mask in zip(images, out_images, out_masks):
+            self.recenter_into(self.read_image(image), border_ratio, out_image, out_mask)
+        if to_tensor:
+            return arrays_to_tensor(out_images), arrays_to_tensor(out_masks)
+        return out_images, out_masks
 
+    def load_image(self, image, border_ratio=0.15, to_tensor=True):
+        image, mask = self.load_images([image], border_ratio=border_ratio, to_tensor=to_tensor)
         if to_tensor:
-            image = array_to_tensor(image)
-            mask = array_to_tensor(mask)
-        return image, mask
+            return image, mask
+        return image[0], mask[0]
 
     def __call__(self, image, border_ratio=0.15, to_tensor=True, **kwargs):
         if self.border_ratio is not None:
@@ -136,21 +204,13 @@ class MVImageProcessorV2(ImageProcessorV2):
         if self.border_ratio is not None:
             border_ratio = self.border_ratio
 
-        images = []
-        masks = []
-        view_idxs = []
-        for idx, (view_tag, image) in enumerate(image_dict.items()):
-            view_idxs.append(self.view2idx[view_tag])
-            image, mask = self.load_image(image, border_ratio=border_ratio, to_tensor=to_tensor)
-            images.append(image)
-            masks.append(mask)
-
-        zipped_lists = zip(view_idxs, images, masks)
-        sorted_zipped_lists = sorted(zipped_lists)
-        view_idxs, images, masks = zip(*sorted_zipped_lists)
-
-        image = torch.cat(images, 0).unsqueeze(0)
-        mask = torch.cat(masks, 0).unsqueeze(0)
+        views = sorted((self.view2idx[view_tag], image) for view_tag, image in image_dict.items())
+        view_idxs = tuple(view_idx for view_idx, _ in views)
+        # All views in one batch, converted to a single tensor
+        image, mask = self.load_images([image for _, image in views], border_ratio=border_ratio,
+                                       to_tensor=to_tensor)
+        if to_tensor:
+            image, mask = image.unsqueeze(0), mask.unsqueeze(0)
         outputs = {
             'image': image,
             'mask': mask,
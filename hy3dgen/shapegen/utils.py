@@ -14,6 +14,8 @@
 
 import logging
 import os
+from collections import defaultdict
+from contextlib import contextmanager
 from functools import wraps
 
 import torch
@@ -131,24 +133,51 @@ class synchronize_timer:
         ```
     """
 
+    # Stage name -> durations in ms, while timers are being collected
+    _collected = None
+
     def __init__(self, name=None):
         self.name = name
 
+    @classmethod
+    @contextmanager
+    def collect(cls):
+        """Records every named timer that runs inside the block, e.g. for per-stage benchmarks."""
+        previous, cls._collected = cls._collected, defaultdict(list)
+        try:
+            yield cls._collected
+        finally:
+            cls._collected = previous
+
+    def _enabled(self):
+        return os.environ.get('HY3DGEN_DEBUG', '0') == '1' or synchronize_timer._collected is not None
+
     def __enter__(self):
         """Context manager entry: start timing."""
-        if os.environ.get('HY3DGEN_DEBUG', '0') == '1':
-            self.start = torch.cuda.Event(enable_timing=True)
-            self.end = torch.cuda.Event(enable_timing=True)
-            self.start.record()
+        self.active = self._enabled()
+        if self.active:
+            # CUDA events time the queued kernels, on CPU-only hosts wall-clock time is exact
+            self.use_cuda = torch.cuda.is_available()
+            if self.use_cuda:
+                self.start = torch.cuda.Event(enable_timing=True)
+                self.end = torch.cuda.Event(enable_timing=True)
+                self.start.record()
+            else:
+                self.start = time.perf_counter()
             return lambda: self.time
 
     def __exit__(self, exc_type, exc_value, exc_tb):
         """Context manager exit: stop timing and log results."""
-        if os.environ.get('HY3DGEN_DEBUG', '0') == '1':
-            self.end.record()
-            torch.cuda.synchronize()
-            self.time = self.start.elapsed_time(self.end)
+        if self.active:
+            if self.use_cuda:
+                self.end.record()
+                torch.cuda.synchronize()
+                self.time = self.start.elapsed_time(self.end)
+            else:
+                self.time = (time.perf_counter() - self.start) * 1000
             if self.name is not None:
+                if synchronize_timer._collected is not None:
+                    synchronize_timer._collected[self.name].append(self.time)
                 logger.info(f'{self.name} takes {self.time} ms')
 
     def __call__(self, func):
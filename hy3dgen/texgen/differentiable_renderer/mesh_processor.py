@@ -14,47 +14,65 @@
 
 import numpy as np
 
-def meshVerticeInpaint_smooth(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx):
-    texture_height, texture_width, texture_channel = texture.shape
+def _vertex_texels(vtx_uv, uv_idx, texture_height, texture_width):
+    # Texel (row, col) hit by every face corner, rounded half-to-even like the scalar version
+    uv = vtx_uv[uv_idx.reshape(-1)]
+    uv_v = np.rint(uv[:, 0] * (texture_width - 1)).astype(np.int64)
+    uv_u = np.rint((1.0 - uv[:, 1]) * (texture_height - 1)).astype(np.int64)
+    return uv_u, uv_v
+
+
+def _build_adjacency(vtx_pos, pos_idx):
+    # CSR adjacency of directed face edges (k -> k + 1), neighbours kept in face order,
+    # with the inverse squared distance weight of every edge
     vtx_num = vtx_pos.shape[0]
+    src = pos_idx.reshape(-1)
+    dst = np.roll(pos_idx, -1, axis=1).reshape(-1)
+    order = np.argsort(src, kind='stable')
+    indices = dst[order]
+    indptr = np.zeros(vtx_num + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=vtx_num), out=indptr[1:])
+    indptr = indptr.tolist()
 
-    vtx_mask = np.zeros(vtx_num, dtype=np.float32)
-    vtx_color = [np.zeros(texture_channel, dtype=np.float32) for _ in range(vtx_num)]
-    uncolored_vtxs = []
-    G = [[] for _ in range(vtx_num)]
-
-    for i in range(uv_idx.shape[0]):
-        for k in range(3):
-            vtx_uv_idx = uv_idx[i, k]
-            vtx_idx = pos_idx[i, k]
-            uv_v = int(round(vtx_uv[vtx_uv_idx, 0] * (texture_width - 1)))
-            uv_u = int(round((1.0 - vtx_uv[vtx_uv_idx, 1]) * (texture_height - 1)))
-            if mask[uv_u, uv_v] > 0:
-                vtx_mask[vtx_idx] = 1.0
-                vtx_color[vtx_idx] = texture[uv_u, uv_v]
-            else:
-                uncolored_vtxs.append(vtx_idx)
-            G[pos_idx[i, k]].append(pos_idx[i, (k + 1) % 3])
+    dist = np.sqrt(np.sum((vtx_pos[src[order]] - vtx_pos[indices]) ** 2, axis=-1))
+    weights = 1.0 / np.maximum(dist, 1e-4)
+    weights *= weights
+    return indptr, indices, weights.astype(np.float32)
+
+
+def smooth_vertex_colors(corner_colors, corner_valid, vtx_pos, pos_idx):
+    """
+    Propagates colors sampled at face corners to the vertices whose corner texel is
+    not covered by the mask. Returns per-vertex colors and the mask of vertices that
+    ended up with a color.
+    """
+    vtx_pos = np.asarray(vtx_pos)
+    pos_idx = np.asarray(pos_idx, dtype=np.int64)
+    vtx_num = vtx_pos.shape[0]
 
+    corner_vtx = pos_idx.reshape(-1)
+    vtx_mask = np.zeros(vtx_num, dtype=bool)
+    vtx_color = np.zeros((vtx_num, corner_colors.shape[-1]), dtype=np.float32)
+    vtx_mask[corner_vtx[corner_valid]] = True
+    vtx_color[corner_vtx[corner_valid]] = corner_colors[corner_valid]
+    uncolored_vtxs = corner_vtx[~corner_valid].tolist()
+
+    indptr, indices, weights = _build_adjacency(vtx_pos, pos_idx)
+
+    # Updates are applied in place while sweeping, so a vertex sees the colors its
+    # predecessors got in the same sweep; only the neighbour reduction is vectorized
     smooth_count = 2
     last_uncolored_vtx_count = 0
     while smooth_count > 0:
         uncolored_vtx_count = 0
         for vtx_idx in uncolored_vtxs:
-            sum_color = np.zeros(texture_channel, dtype=np.float32)
-            total_weight = 0.0
-            vtx_0 = vtx_pos[vtx_idx]
-            for connected_idx in G[vtx_idx]:
-                if vtx_mask[connected_idx] > 0:
-                    vtx1 = vtx_pos[connected_idx]
-                    dist = np.sqrt(np.sum((vtx_0 - vtx1) ** 2))
-                    dist_weight = 1.0 / max(dist, 1e-4)
-                    dist_weight *= dist_weight
-                    sum_color += vtx_color[connected_idx] * dist_weight
-                    total_weight += dist_weight
-            if total_weight > 0:
-                vtx_color[vtx_idx] = sum_color / total_weight
-                vtx_mask[vtx_idx] = 1.0
+            start, end = indptr[vtx_idx], indptr[vtx_idx + 1]
+            connected = indices[start:end]
+            valid = vtx_mask[connected]
+            if valid.any():
+                dist_weight = weights[start:end][valid]
+                vtx_color[vtx_idx] = np.dot(dist_weight, vtx_color[connected[valid]]) / dist_weight.sum()
+                vtx_mask[vtx_idx] = True
             else:
                 uncolored_vtx_count += 1
 
@@ -64,17 +82,24 @@ def meshVerticeInpaint_smooth(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx):
             smooth_count += 1
         last_uncolored_vtx_count = uncolored_vtx_count
 
+    return vtx_color, vtx_mask
+
+
+def meshVerticeInpaint_smooth(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx):
+    texture_height, texture_width, _ = texture.shape
+    pos_idx = np.asarray(pos_idx, dtype=np.int64)
+    uv_idx = np.asarray(uv_idx, dtype=np.int64)
+
+    corner_vtx = pos_idx.reshape(-1)
+    uv_u, uv_v = _vertex_texels(vtx_uv, uv_idx, texture_height, texture_width)
+    vtx_color, vtx_mask = smooth_vertex_colors(
+        texture[uv_u, uv_v], mask[uv_u, uv_v] > 0, vtx_pos, pos_idx)
+
     new_texture = texture.copy()
     new_mask = mask.copy()
-    for face_idx in range(uv_idx.shape[0]):
-        for k in range(3):
-            vtx_uv_idx = uv_idx[face_idx, k]
-            vtx_idx = pos_idx[face_idx, k]
-            if vtx_mask[vtx_idx] == 1.0:
-                uv_v = int(round(vtx_uv[vtx_uv_idx, 0] * (texture_width - 1)))
-                uv_u = int(round((1.0 - vtx_uv[vtx_uv_idx, 1]) * (texture_height - 1)))
-                new_texture[uv_u, uv_v] = vtx_color[vtx_idx]
-                new_mask[uv_u, uv_v] = 255
+    painted = vtx_mask[corner_vtx]
+    new_texture[uv_u[painted], uv_v[painted]] = vtx_color[corner_vtx[painted]]
+    new_mask[uv_u[painted], uv_v[painted]] = 255
     return new_texture, new_mask
 
 def meshVerticeInpaint(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx, method="smooth"):
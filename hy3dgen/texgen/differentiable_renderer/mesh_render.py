@@ -12,11 +12,13 @@
 # fine-tuning enabling code and other elements of the foregoing made publicly available
 # by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
 
+import hashlib
+from collections import OrderedDict
+
 import cv2
 import numpy as np
 import torch
 import torch.nn.functional as F
-import trimesh
 from PIL import Image
 
 # Ensure custom_rasterizer package (and compiled .so) is on sys.path
@@ -32,7 +34,7 @@ from .camera_utils import (
     get_orthographic_projection_matrix,
     get_perspective_projection_matrix,
 )
-from .mesh_processor import meshVerticeInpaint
+from .mesh_processor import meshVerticeInpaint, smooth_vertex_colors
 from .mesh_utils import load_mesh, save_mesh
 
 
@@ -124,16 +126,147 @@ def linear_grid_put_2d(H, W, coords, values, return_count=False):
     return result
 
 
+def grid_rows_2d(H, coords):
+    # Floor row index linear_grid_put_2d uses for each point
+    rows = (coords[:, 0] * (H - 1)).floor().long()
+    return rows.clamp_(0, H - 2)
+
+
+def linear_grid_put_2d_rows(H, W, coords, values, row_start, row_end):
+    # Rows [row_start, row_end) of linear_grid_put_2d(H, W, coords, values, return_count=True),
+    # allocating only that band
+    C = values.shape[-1]
+    indices = coords * torch.tensor([H - 1, W - 1], dtype=torch.float32, device=coords.device)
+    indices_00 = indices.floor().long()
+    indices_00[:, 0].clamp_(0, H - 2)
+    indices_00[:, 1].clamp_(0, W - 2)
+    h = indices[..., 0] - indices_00[..., 0].float()
+    w = indices[..., 1] - indices_00[..., 1].float()
+
+    result = torch.zeros(row_end - row_start, W, C, device=values.device, dtype=values.dtype)
+    count = torch.zeros(row_end - row_start, W, 1, device=values.device, dtype=values.dtype)
+    corners = (((0, 0), (1 - h) * (1 - w)), ((0, 1), (1 - h) * w), ((1, 0), h * (1 - w)), ((1, 1), h * w))
+    for offset, weight in corners:
+        corner = indices_00 + torch.tensor([offset[0] - row_start, offset[1]], dtype=torch.long,
+                                           device=coords.device)
+        keep = (corner[:, 0] >= 0) & (corner[:, 0] < row_end - row_start)
+        weight = weight[keep].unsqueeze(1)
+        result, count = scatter_add_nd_with_count(result, count, corner[keep], values[keep] * weight, weight)
+    return result, count
+
+
+def linear_grid_support_2d(H, W, coords):
+    # Texels that get a non-zero bilinear weight from any of the points, [H, W] bool
+    indices = coords * torch.tensor([H - 1, W - 1], dtype=torch.float32, device=coords.device)
+    indices_00 = indices.floor().long()
+    indices_00[:, 0].clamp_(0, H - 2)
+    indices_00[:, 1].clamp_(0, W - 2)
+    h = indices[..., 0] - indices_00[..., 0].float()
+    w = indices[..., 1] - indices_00[..., 1].float()
+
+    support = torch.zeros(H, W, dtype=torch.bool, device=coords.device)
+    corners = (((0, 0), (1 - h) * (1 - w)), ((0, 1), (1 - h) * w), ((1, 0), h * (1 - w)), ((1, 1), h * w))
+    for (dh, dw), weight in corners:
+        nonzero = weight > 0
+        support[indices_00[nonzero, 0] + dh, indices_00[nonzero, 1] + dw] = True
+    return support
+
+
+def mesh_hash(vtx_pos, pos_idx, vtx_uv=None, uv_idx=None, **params):
+    # Identifies a mesh as set_mesh sees it: exact buffers plus the normalization params
+    h = hashlib.blake2b(digest_size=20)
+    for array in (vtx_pos, pos_idx, vtx_uv, uv_idx):
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            h.update(str((array.dtype, array.shape)).encode())
+            h.update(array.tobytes())
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+
+def compute_vertex_normals(vtx_pos, pos_idx):
+    # Unweighted mean of unit face normals, same as trimesh.geometry.mean_vertex_normals,
+    # computed on the mesh device
+    tris = vtx_pos[pos_idx[:, :3].long(), :3]
+    face_normals = F.normalize(torch.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0], dim=-1), dim=-1)
+    vertex_normals = torch.zeros_like(vtx_pos[:, :3])
+    for i in range(3):
+        vertex_normals.index_add_(0, pos_idx[:, i].long(), face_normals)
+    return F.normalize(vertex_normals, dim=-1)
+
+
+def push_pull_fill(texture, valid):
+    # texture: [H, W, C], valid: [H, W] bool
+    # Pull premultiplied colors down a mip pyramid, then push the normalized coarse
+    # colors back up into every texel that has no (or only partial) coverage
+    color = (texture * valid[..., None]).permute(2, 0, 1)[None]
+    weight = valid[None, None].to(texture.dtype)
+
+    levels = []
+    while max(color.shape[-2:]) > 1:
+        levels.append((color, weight))
+        H, W = color.shape[-2:]
+        kernel = (2 if H > 1 else 1, 2 if W > 1 else 1)
+        pad = (0, W % kernel[1], 0, H % kernel[0])
+        color = F.avg_pool2d(F.pad(color, pad), kernel)
+        weight = F.avg_pool2d(F.pad(weight, pad), kernel)
+
+    filled = color / weight.clamp(min=1E-8)
+    for color, weight in reversed(levels):
+        H, W = color.shape[-2:]
+        scale = (2 if H > 1 else 1, 2 if W > 1 else 1)
+        up = F.interpolate(filled, scale_factor=scale, mode='bilinear', align_corners=False)[..., :H, :W]
+        filled = color + (1 - weight.clamp(max=1)) * up
+
+    return filled[0].permute(1, 2, 0)
+
+
+def box_sum_3x3(x):
+    # Separable 3x3 box sum with zero padding, x: [N, C, H, W]
+    x = F.pad(x, (1, 1, 1, 1))
+    x = x[..., :-2, :] + x[..., 1:-1, :] + x[..., 2:, :]
+    return x[..., :-2] + x[..., 1:-1] + x[..., 2:]
+
+
+def dilate_fill(texture, valid, iterations):
+    # Grows the valid region by one texel per iteration, each new texel taking the
+    # mean of its valid 3x3 neighbours
+    data = torch.cat([texture * valid[..., None], valid[..., None].to(texture.dtype)], dim=-1)
+    data = data.permute(2, 0, 1)[None]
+    for _ in range(iterations):
+        neighbours = box_sum_3x3(data)
+        grow = (data[:, -1:] == 0) & (neighbours[:, -1:] > 0)
+        if not grow.any():
+            break
+        data = torch.where(grow, neighbours / neighbours[:, -1:].clamp(min=1E-8), data)
+    data = data[0].permute(1, 2, 0)
+    return data[..., :-1], data[..., -1] > 0
+
+
 class MeshRender():
     def __init__(
         self,
         camera_distance=1.45, camera_type='orth',
         default_resolution=1024, texture_size=1024,
         use_antialias=True, max_mip_level=None, filter_mode='linear',
-        bake_mode='linear', raster_mode='cr', device='cuda'):
+        bake_mode='linear', raster_mode='cr', device='cuda', raster_cache_size=12):
 
         self.device = device
 
+        # Device buffers of recently loaded meshes, view matrices, and rasterizations
+        # keyed by mesh hash + camera + resolution, so re-texturing an unchanged mesh
+        # re-uploads and re-rasterizes nothing
+        self.mesh_hash = None
+        self.mesh_cache_size = 2
+        self.raster_cache_size = raster_cache_size
+        self._mesh_cache = OrderedDict()
+        self._camera_cache = OrderedDict()
+        self._raster_cache = OrderedDict()
+        # UV coverage of the current mesh as a boolean mask, kept out of the view LRU and
+        # only below coverage_cache_max_side: the float rasterization behind it is 1 GiB at 8K
+        self.coverage_cache_max_side = 4096
+        self._coverage = None
+
         self.set_default_render_resolution(default_resolution)
         self.set_default_texture_resolution(texture_size)
 
@@ -168,6 +301,7 @@ class MeshRender():
             )
         else:
             raise f'No camera type {camera_type}'
+        self.camera_proj = torch.from_numpy(self.camera_proj_mat).to(self.device)
 
     def raster_rasterize(self, pos, tri, resolution, ranges=None, grad_db=True):
 
@@ -244,6 +378,16 @@ class MeshRender():
         scale_factor=1.15, auto_center=True
     ):
 
+        self.mesh_hash = mesh_hash(vtx_pos, pos_idx, vtx_uv, uv_idx,
+                                   scale_factor=scale_factor, auto_center=auto_center)
+        cached = self._mesh_cache.get(self.mesh_hash)
+        if cached is not None:
+            self._mesh_cache.move_to_end(self.mesh_hash)
+            self.vtx_pos, self.pos_idx, self.vtx_uv, self.uv_idx = cached
+            if auto_center:
+                self.scale_factor = scale_factor
+            return
+
         self.vtx_pos = torch.from_numpy(vtx_pos).to(self.device).float()
         self.pos_idx = torch.from_numpy(pos_idx).to(self.device).to(torch.int)
         if (vtx_uv is not None) and (uv_idx is not None):
@@ -267,17 +411,20 @@ class MeshRender():
                            (scale_factor / float(scale))
             self.scale_factor = scale_factor
 
+        self._mesh_cache[self.mesh_hash] = (self.vtx_pos, self.pos_idx, self.vtx_uv, self.uv_idx)
+        while len(self._mesh_cache) > self.mesh_cache_size:
+            self._mesh_cache.popitem(last=False)
+
     def set_texture(self, tex):
         if isinstance(tex, np.ndarray):
             tex = Image.fromarray((tex * 255).astype(np.uint8))
         elif isinstance(tex, torch.Tensor):
-            tex = tex.cpu().numpy()
+            tex = tex.float().clamp(0, 1).cpu().numpy()
             tex = Image.fromarray((tex * 255).astype(np.uint8))
 
         tex = tex.resize(self.texture_size).convert('RGB')
-        tex = np.array(tex) / 255.0
+        tex = np.asarray(tex, dtype=np.float32) / 255.0
         self.tex = torch.from_numpy(tex).to(self.device)
-        self.tex = self.tex.float()
 
     def set_default_render_resolution(self, default_resolution):
         if isinstance(default_resolution, int):
@@ -290,10 +437,11 @@ class MeshRender():
         self.texture_size = texture_size
 
     def get_mesh(self):
-        vtx_pos = self.vtx_pos.cpu().numpy()
-        pos_idx = self.pos_idx.cpu().numpy()
-        vtx_uv = self.vtx_uv.cpu().numpy()
-        uv_idx = self.uv_idx.cpu().numpy()
+        # Copies, since .cpu() aliases the (possibly cached) buffers on a CPU device
+        vtx_pos = self.vtx_pos.cpu().numpy().copy()
+        pos_idx = self.pos_idx.cpu().numpy().copy()
+        vtx_uv = self.vtx_uv.cpu().numpy().copy()
+        uv_idx = self.uv_idx.cpu().numpy().copy()
 
         # Inverse coordinate transformation
         vtx_pos[:, [1, 2]] = vtx_pos[:, [2, 1]]
@@ -307,12 +455,45 @@ class MeshRender():
 
     def to(self, device):
         self.device = device
+        self.clear_cache()
 
         for attr_name in dir(self):
             attr_value = getattr(self, attr_name)
             if isinstance(attr_value, torch.Tensor):
                 setattr(self, attr_name, attr_value.to(self.device))
 
+    def clear_cache(self):
+        self._mesh_cache.clear()
+        self._camera_cache.clear()
+        self._raster_cache.clear()
+        self._coverage = None
+
+    def rasterize_cached(self, key, pos, tri, resolution):
+        """
+        raster_rasterize for the current mesh, memoized on (mesh_hash, key, resolution).
+        `key` must identify everything else `pos` depends on, e.g. the camera.
+        """
+        if self.raster_cache_size <= 0:
+            return self.raster_rasterize(pos, tri, resolution=resolution)[0]
+        key = (self.mesh_hash, key, tuple(int(r) for r in resolution))
+        rast_out = self._raster_cache.get(key)
+        if rast_out is not None:
+            self._raster_cache.move_to_end(key)
+            return rast_out
+        rast_out, _ = self.raster_rasterize(pos, tri, resolution=resolution)
+        self._raster_cache[key] = rast_out
+        while len(self._raster_cache) > self.raster_cache_size:
+            self._raster_cache.popitem(last=False)
+        return rast_out
+
+    def rasterize_views(self, pos_clip, elevs, azims, resolution, camera_distance=None, center=None):
+        # One cached rasterization per view, pos_clip: [V, N, 4] from get_mv_matrices
+        camera_distance = self.camera_distance if camera_distance is None else camera_distance
+        center = None if center is None else tuple(np.asarray(center, dtype=np.float64).ravel().tolist())
+        return [self.rasterize_cached(('view', float(elev), float(azim), float(camera_distance), center),
+                                      pos_clip[i], self.pos_idx, resolution)
+                for i, (elev, azim) in enumerate(zip(elevs, azims))]
+
     def color_rgb_to_srgb(self, image):
         if isinstance(image, Image.Image):
             image_rgb = torch.tesnor(
@@ -450,29 +631,11 @@ class MeshRender():
             pos_clip, self.pos_idx, resolution=resolution)
 
         if use_abs_coor:
-            mesh_triangles = self.vtx_pos[self.pos_idx[:, :3], :]
+            vertex_normals = compute_vertex_normals(self.vtx_pos, self.pos_idx)
         else:
             pos_camera = pos_camera[:, :3] / pos_camera[:, 3:4]
-            mesh_triangles = pos_camera[self.pos_idx[:, :3], :]
-        face_normals = F.normalize(
-            torch.cross(mesh_triangles[:,
-                        1,
-                        :] - mesh_triangles[:,
-                             0,
-                             :],
-                        mesh_triangles[:,
-                        2,
-                        :] - mesh_triangles[:,
-                             0,
-                             :],
-                        dim=-1),
-            dim=-1)
-
-        vertex_normals = trimesh.geometry.mean_vertex_normals(vertex_count=self.vtx_pos.shape[0],
-                                                              faces=self.pos_idx.cpu(),
-                                                              face_normals=face_normals.cpu(), )
-        vertex_normals = torch.from_numpy(
-            vertex_normals).float().to(self.device).contiguous()
+            vertex_normals = compute_vertex_normals(pos_camera, self.pos_idx)
+        vertex_normals = vertex_normals.contiguous()
 
         # Interpolate normal values across the rasterized pixels
         normal, _ = self.raster_interpolate(
@@ -604,6 +767,93 @@ class MeshRender():
             image = Image.fromarray(image.astype(np.uint8))
         return image
 
+    def get_mv_matrices(self, elevs, azims, camera_distance=None, center=None):
+        camera_distance = self.camera_distance if camera_distance is None else camera_distance
+        key = (tuple(map(float, elevs)), tuple(map(float, azims)), float(camera_distance),
+               None if center is None else tuple(np.asarray(center, dtype=np.float64).ravel().tolist()))
+        r_mv = self._camera_cache.get(key)
+        if r_mv is None:
+            r_mv = np.stack([get_mv_matrix(elev=elev, azim=azim, camera_distance=camera_distance, center=center)
+                             for elev, azim in zip(elevs, azims)])
+            r_mv = torch.from_numpy(r_mv).to(self.device)
+            self._camera_cache[key] = r_mv
+            while len(self._camera_cache) > 32:
+                self._camera_cache.popitem(last=False)
+        return r_mv
+
+    @torch.no_grad()
+    def face_visibility(self, elevs, azims, resolution=256, camera_distance=None, center=None):
+        """
+        Cheap per-view visibility for view planning, [V, F] bool: faces that cover at least
+        one pixel of a low resolution raster and face the camera within bake_angle_thres.
+        """
+        r_mv = self.get_mv_matrices(elevs, azims, camera_distance, center)
+        proj = self.camera_proj
+        posw = torch.cat([self.vtx_pos, torch.ones_like(self.vtx_pos[:, :1])], dim=1)
+        pos_clip = torch.matmul(torch.matmul(posw[None], r_mv.transpose(1, 2)), proj.t())
+
+        tris = self.vtx_pos[self.pos_idx.long()]
+        face_normals = F.normalize(torch.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0], dim=-1), dim=-1)
+        # Camera looks down -z, so a face is usable when its camera-space normal has -z >= cos_thres
+        facing = -torch.matmul(face_normals[None], r_mv[:, :3, :3].transpose(1, 2))[..., 2]
+        facing = facing >= np.cos(self.bake_angle_thres / 180 * np.pi)
+
+        num_faces = self.pos_idx.shape[0]
+        visible = torch.zeros(len(elevs), num_faces, dtype=torch.bool, device=self.device)
+        rasts = self.rasterize_views(pos_clip, elevs, azims, (resolution, resolution), camera_distance, center)
+        for i, rast_out in enumerate(rasts):
+            findices = rast_out[0, ..., -1].long().view(-1)
+            findices = findices[findices > 0] - 1
+            visible[i, findices] = True
+        return visible & facing
+
+    def render_normal_position_multiview(self, elevs, azims, camera_distance=None, center=None,
+                                         resolution=None, bg_color=[1, 1, 1], use_abs_coor=True,
+                                         normalize_rgb=True):
+        """
+        Renders normal and position maps for every (elev, azim) pair.
+
+        All views are transformed in one batched matmul, vertex normals are computed once,
+        and normals and positions share a single rasterization and interpolation per view.
+        Returns a [V, H, W, 6] tensor on the render device: channels 0-2 hold the normal map
+        and 3-5 the position map, matching render_normal / render_position.
+        """
+        if resolution is None:
+            resolution = self.default_resolution
+        if isinstance(resolution, (int, float)):
+            resolution = [resolution, resolution]
+
+        r_mv = self.get_mv_matrices(elevs, azims, camera_distance, center)
+        proj = self.camera_proj
+        posw = torch.cat([self.vtx_pos, torch.ones_like(self.vtx_pos[:, :1])], dim=1)
+        pos_camera = torch.matmul(posw[None], r_mv.transpose(1, 2))
+        pos_clip = torch.matmul(pos_camera, proj.t())
+
+        vertex_normals = compute_vertex_normals(self.vtx_pos, self.pos_idx)
+        tex_position = 0.5 - self.vtx_pos[:, :3] / self.scale_factor
+        bg = torch.tensor(bg_color, dtype=torch.float32, device=self.device)
+
+        rasts = self.rasterize_views(pos_clip, elevs, azims, resolution, camera_distance, center)
+        maps = []
+        for i, rast_out in enumerate(rasts):
+            # The view transform is rigid, so camera-space normals are the rotated world normals
+            normals = vertex_normals if use_abs_coor else vertex_normals @ r_mv[i, :3, :3].t()
+            attrs = torch.cat([normals, tex_position], dim=-1).contiguous()
+
+            feats, _ = self.raster_interpolate(attrs[None, ...], rast_out, self.pos_idx)
+
+            visible_mask = torch.clamp(rast_out[..., -1:], 0, 1)
+            normal = feats[..., :3] * visible_mask + bg * (1 - visible_mask)
+            if normalize_rgb:
+                normal = (normal + 1) * 0.5
+            position = feats[..., 3:] * visible_mask + bg * (1 - visible_mask)
+            image = torch.cat([normal, position], dim=-1)
+            if self.use_antialias:
+                image = self.raster_antialias(image, rast_out, pos_clip[i:i + 1], self.pos_idx)
+            maps.append(image[0, ...])
+
+        return torch.stack(maps)
+
     def render_uvpos(self, return_type='th'):
         image = self.uv_feature_map(self.vtx_pos * 0.5 + 0.5)
         if return_type == 'np':
@@ -680,20 +930,7 @@ class MeshRender():
         pos_camera = transform_pos(r_mv, self.vtx_pos, keepdim=True)
         pos_clip = transform_pos(proj, pos_camera)
         pos_camera = pos_camera[:, :3] / pos_camera[:, 3:4]
-        v0 = pos_camera[self.pos_idx[:, 0], :]
-        v1 = pos_camera[self.pos_idx[:, 1], :]
-        v2 = pos_camera[self.pos_idx[:, 2], :]
-        face_normals = F.normalize(
-            torch.cross(
-                v1 - v0,
-                v2 - v0,
-                dim=-1),
-            dim=-1)
-        vertex_normals = trimesh.geometry.mean_vertex_normals(vertex_count=self.vtx_pos.shape[0],
-                                                              faces=self.pos_idx.cpu(),
-                                                              face_normals=face_normals.cpu(), )
-        vertex_normals = torch.from_numpy(
-            vertex_normals).float().to(self.device).contiguous()
+        vertex_normals = compute_vertex_normals(pos_camera, self.pos_idx).contiguous()
         tex_depth = pos_camera[:, 2].reshape(1, -1, 1).contiguous()
         rast_out, rast_out_db = self.raster_rasterize(
             pos_clip, self.pos_idx, resolution=resolution)
@@ -765,26 +1002,8 @@ class MeshRender():
 
     def bake_texture(self, colors, elevs, azims,
                      camera_distance=None, center=None, exp=6, weights=None):
-        for i in range(len(colors)):
-            if isinstance(colors[i], Image.Image):
-                colors[i] = torch.tensor(
-                    np.array(
-                        colors[i]) / 255.0,
-                    device=self.device).float()
-        if weights is None:
-            weights = [1.0 for _ in range(colors)]
-        textures = []
-        cos_maps = []
-        for color, elev, azim, weight in zip(colors, elevs, azims, weights):
-            texture, cos_map, _ = self.back_project(
-                color, elev, azim, camera_distance, center)
-            cos_map = weight * (cos_map ** exp)
-            textures.append(texture)
-            cos_maps.append(cos_map)
-
-        texture_merge, trust_map_merge = self.fast_bake_texture(
-            textures, cos_maps)
-        return texture_merge, trust_map_merge
+        return self.fast_bake_multiview(colors, elevs, azims, weights=weights, exp=exp,
+                                        camera_distance=camera_distance, center=center)
 
     @torch.no_grad()
     def fast_bake_texture(self, textures, cos_maps):
@@ -804,6 +1023,214 @@ class MeshRender():
 
         return texture_merge, trust_map_merge > 1E-8
 
+    def _project_views(self, images, elevs, azims, camera_distance=None, center=None):
+        # Yields, per view, the UV coordinates (row, col order, in [0, 1]), colors and
+        # thresholded cos weights of the pixels that survive the visibility shrink
+        views = []
+        for image in images:
+            if isinstance(image, Image.Image):
+                image = torch.tensor(np.array(image) / 255.0)
+            elif isinstance(image, np.ndarray):
+                image = torch.tensor(image)
+            if image.dim() == 2:
+                image = image.unsqueeze(-1)
+            views.append(image.float().to(self.device))
+        channel = views[0].shape[-1]
+
+        r_mv = self.get_mv_matrices(elevs, azims, camera_distance, center)
+        proj = self.camera_proj
+        posw = torch.cat([self.vtx_pos, torch.ones_like(self.vtx_pos[:, :1])], dim=1)
+        pos_camera = torch.matmul(posw[None], r_mv.transpose(1, 2))
+        pos_clip = torch.matmul(pos_camera, proj.t())
+        pos_camera = pos_camera[..., :3] / pos_camera[..., 3:4]
+
+        # The view transform is rigid, so camera-space normals are the rotated world normals
+        vertex_normals = compute_vertex_normals(self.vtx_pos, self.pos_idx)
+        normals_camera = torch.matmul(vertex_normals[None], r_mv[:, :3, :3].transpose(1, 2))
+
+        kernel_size = self.bake_unreliable_kernel_size * 2 + 1
+        cos_thres = np.cos(self.bake_angle_thres / 180 * np.pi)
+        lookat = torch.tensor([[0, 0, -1]], device=self.device)
+
+        for i, image in enumerate(views):
+            rast_out = self.rasterize_views(pos_clip[i:i + 1], elevs[i:i + 1], azims[i:i + 1],
+                                            image.shape[:2], camera_distance, center)[0]
+            visible_mask = torch.clamp(rast_out[..., -1:], 0, 1)[0, ...]
+
+            attrs = torch.cat([normals_camera[i], pos_camera[i, :, 2:3]], dim=-1).contiguous()
+            feats, _ = self.raster_interpolate(attrs[None, ...], rast_out, self.pos_idx)
+            normal, depth = feats[0, ..., :3], feats[0, ..., 3:]
+            uv, _ = self.raster_interpolate(self.vtx_uv[None, ...], rast_out, self.uv_idx)
+
+            depth_max, depth_min = depth[visible_mask > 0].max(), depth[visible_mask > 0].min()
+            depth_image = (depth - depth_min) / (depth_max - depth_min) * visible_mask
+            sketch_image = self.render_sketch_from_depth(depth_image)
+
+            cos_image = F.cosine_similarity(lookat, normal.view(-1, 3))
+            cos_image = cos_image.view(normal.shape[0], normal.shape[1], 1)
+            cos_image[cos_image < cos_thres] = 0
+
+            # Binary dilation with a box kernel, equal to conv2d with a ones kernel followed by > 0
+            masks = torch.stack([1.0 - visible_mask[..., 0], sketch_image[..., 0]])[:, None]
+            masks = F.max_pool2d(masks, kernel_size, stride=1, padding=kernel_size // 2)
+            visible_mask = ((1.0 - masks[0, 0]) * (masks[1, 0] < 0.5))[..., None]
+            cos_image[visible_mask == 0] = 0
+
+            proj_mask = (visible_mask != 0).view(-1)
+            uv = uv.squeeze(0).contiguous().view(-1, 2)[proj_mask]
+            yield (uv[..., [1, 0]],
+                   image.contiguous().view(-1, channel)[proj_mask],
+                   cos_image.contiguous().view(-1, 1)[proj_mask])
+
+    @torch.no_grad()
+    def fast_bake_multiview(self, images, elevs, azims, weights=None, exp=4,
+                            camera_distance=None, center=None):
+        """
+        Back-projects all views and fuses them straight into one UV texture.
+
+        Same result as back_project per view followed by fast_bake_texture, but the view
+        transforms and vertex normals are computed once for all views, visibility shrinking
+        uses max-pooling, each view is splatted into UV space with a single scatter for color
+        and cos weight, and only the merged texture and trust map are kept across views.
+        Returns (texture, trust_mask).
+        """
+        if weights is None:
+            weights = [1.0 for _ in range(len(images))]
+
+        texture_merge, trust_map_merge = None, None
+        for (coords, colors, cos), weight in zip(
+                self._project_views(images, elevs, azims, camera_distance, center), weights):
+            channel = colors.shape[-1]
+            if texture_merge is None:
+                texture_merge = torch.zeros(self.texture_size + (channel,), device=self.device)
+                trust_map_merge = torch.zeros(self.texture_size + (1,), device=self.device)
+
+            splat, count = linear_grid_put_2d(
+                self.texture_size[1], self.texture_size[0], coords, torch.cat([colors, cos], dim=-1),
+                return_count=True)
+            splat = splat / torch.where(count > 0, count, torch.ones_like(count))
+
+            cos_map = weight * (splat[..., channel:] ** exp)
+            view_sum = (cos_map > 0).sum()
+            painted_sum = ((cos_map > 0) * (trust_map_merge > 0)).sum()
+            if painted_sum / view_sum > 0.99:
+                continue
+            texture_merge += splat[..., :channel] * cos_map
+            trust_map_merge += cos_map
+
+        texture_merge = texture_merge / torch.clamp(trust_map_merge, min=1E-8)
+        return texture_merge, trust_map_merge > 1E-8
+
+    @torch.no_grad()
+    def tiled_bake_multiview(self, images, elevs, azims, weights=None, exp=4,
+                             camera_distance=None, center=None, tile_size=1024, dtype=torch.float16):
+        """
+        Memory-bounded fast_bake_multiview for 4K / 8K atlases.
+
+        Views are projected once and only their visible pixels are kept, with colors and
+        cos weights stored in `dtype`. Which views fast_bake_multiview would skip is decided
+        up front from boolean texel coverage, then the atlas is baked in bands of `tile_size`
+        rows, each band accumulated in float32 and written straight into the output texture.
+        Full-resolution memory is the `dtype` output plus one boolean map per view pass.
+        Returns (texture in `dtype`, trust_mask).
+        """
+        if weights is None:
+            weights = [1.0 for _ in range(len(images))]
+        H, W = self.texture_size[1], self.texture_size[0]
+
+        views = []
+        painted = torch.zeros(H, W, dtype=torch.bool, device=self.device)
+        for (coords, colors, cos), weight in zip(
+                self._project_views(images, elevs, azims, camera_distance, center), weights):
+            if weight <= 0:
+                continue
+            # Texels this view would give a non-zero cos weight, i.e. cos_map > 0
+            support = linear_grid_support_2d(H, W, coords[cos[:, 0] > 0])
+            view_sum = support.sum()
+            if view_sum > 0 and (support & painted).sum() / view_sum > 0.99:
+                continue
+            painted |= support
+            rows = grid_rows_2d(H, coords)
+            views.append((coords, rows, torch.cat([colors, cos], dim=-1).to(dtype), weight))
+        del painted
+
+        channel = views[0][2].shape[-1] - 1 if views else 3
+        texture = torch.zeros(self.texture_size + (channel,), dtype=dtype, device=self.device)
+        trust_mask = torch.zeros(self.texture_size + (1,), dtype=torch.bool, device=self.device)
+        for row_start in range(0, H, tile_size):
+            row_end = min(row_start + tile_size, H)
+            texture_tile = torch.zeros(row_end - row_start, W, channel, device=self.device)
+            trust_tile = torch.zeros(row_end - row_start, W, 1, device=self.device)
+            for coords, rows, values, weight in views:
+                # A point splats into its floor row and the one below
+                in_tile = (rows >= row_start - 1) & (rows < row_end)
+                splat, count = linear_grid_put_2d_rows(
+                    H, W, coords[in_tile], values[in_tile].float(), row_start, row_end)
+                splat = splat / torch.where(count > 0, count, torch.ones_like(count))
+                cos_map = weight * (splat[..., channel:] ** exp)
+                texture_tile += splat[..., :channel] * cos_map
+                trust_tile += cos_map
+            texture[row_start:row_end] = (texture_tile / torch.clamp(trust_tile, min=1E-8)).to(dtype)
+            trust_mask[row_start:row_end] = trust_tile > 1E-8
+        return texture, trust_mask
+
+    @torch.no_grad()
+    def uv_coverage(self, resolution=None):
+        """Texels covered by at least one UV triangle, [H, W] bool."""
+        resolution = tuple(int(r) for r in (self.texture_size if resolution is None else resolution))
+        key = (self.mesh_hash, resolution)
+        if self._coverage is not None and self._coverage[0] == key:
+            return self._coverage[1]
+        vtx_uv = self.vtx_uv * 2 - 1.0
+        vtx_uv = torch.cat(
+            [vtx_uv, torch.zeros_like(self.vtx_uv)], dim=1).unsqueeze(0)
+        vtx_uv[..., -1] = 1
+        rast_out, _ = self.raster_rasterize(vtx_uv, self.uv_idx, resolution=resolution)
+        coverage = rast_out[0, ..., -1] > 0
+        if self.raster_cache_size > 0 and max(resolution) < self.coverage_cache_max_side:
+            self._coverage = (key, coverage)
+        return coverage
+
+    @torch.no_grad()
+    def fast_uv_inpaint(self, texture, mask, gutter_size=2):
+        """
+        Device-side alternative to uv_inpaint, returns the filled texture as a float tensor.
+
+        Unseen vertices get their corner texels from the same vertex color propagation as
+        uv_inpaint, holes inside UV charts are filled with a push-pull pyramid, and gutter
+        texels are first dilated from the chart they border so seams do not pick up colors
+        from neighbouring charts. Runs in linear time in the texture size.
+        """
+        texture = torch.as_tensor(texture, device=self.device).float()
+        H, W, _ = texture.shape
+        valid = torch.as_tensor(mask, device=self.device).reshape(H, W) > 0
+
+        vtx_pos, pos_idx, _, _ = self.get_mesh()
+        corner_uv = self.vtx_uv[self.uv_idx.reshape(-1).long()]
+        rows = torch.round(corner_uv[:, 1] * (H - 1)).long()
+        cols = torch.round(corner_uv[:, 0] * (W - 1)).long()
+
+        vtx_color, vtx_mask = smooth_vertex_colors(
+            texture[rows, cols].cpu().numpy(), valid[rows, cols].cpu().numpy(), vtx_pos, pos_idx)
+        corner_vtx = pos_idx.reshape(-1)
+        painted = torch.from_numpy(vtx_mask[corner_vtx]).to(self.device)
+        texture = texture.clone()
+        texture[rows[painted], cols[painted]] = torch.from_numpy(
+            vtx_color[corner_vtx][vtx_mask[corner_vtx]]).to(texture)
+        valid[rows[painted], cols[painted]] = True
+
+        if not valid.any():
+            return texture
+
+        filled = push_pull_fill(texture, valid)
+
+        chart = self.uv_coverage(resolution=(H, W))
+        if not chart.any():
+            return filled
+        gutter, grown = dilate_fill(filled, chart, gutter_size)
+        gutter = push_pull_fill(gutter, grown)
+        return torch.where(chart[..., None], filled, gutter)
+
     def uv_inpaint(self, texture, mask):
 
         if isinstance(texture, torch.Tensor):
@@ -16,18 +16,27 @@
 import logging
 import numpy as np
 import os
+import threading
 import torch
+import trimesh
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from PIL import Image
 from typing import List, Union, Optional
 import time
 
 from .differentiable_renderer.mesh_render import MeshRender
 from .utils.dehighlight_utils import Light_Shadow_Remover
+from .utils.imagesuper_utils import Image_Super_Net
 from .utils.multiview_utils import Multiview_Diffusion_Net
-from .utils.uv_warp_utils import mesh_uv_wrap
+from .utils.uv_warp_utils import submit_mesh_uv_wrap, apply_mesh_uv_wrap
+from .utils.view_planning import CAMERA_POOL, get_camera_info, get_view_weight, select_views
 
 logger = logging.getLogger(__name__)
 
+# Net upscale of the multiview outputs per AutoTexturing.upscale
+UPSCALE_FACTORS = {'off': 1, '2x': 2, '4x': 4}
+
 
 # Texture pipeline benchmark instrumentation
 class Benchmark:
@@ -46,6 +55,40 @@ class Benchmark:
         print(f"[BENCHMARK] {self.name}: {duration:.2f}s")
 
 
+class StageTimer:
+    """Wall-clock spans of pipeline stages that may run concurrently."""
+
+    def __init__(self):
+        self.origin = time.time()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.spans[name] = (start - self.origin, end - self.origin)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.time())
+
+    def track(self, name, future):
+        start = time.time()
+        future.add_done_callback(lambda _: self.record(name, start, time.time()))
+        return future
+
+    def report(self):
+        wall = time.time() - self.origin
+        serial = sum(end - start for start, end in self.spans.values())
+        for name, (start, end) in sorted(self.spans.items(), key=lambda item: item[1]):
+            print(f"[BENCHMARK]   {name}: {end - start:.2f}s (+{start:.2f}s -> +{end:.2f}s)")
+        print(f"[BENCHMARK]   stages {serial:.2f}s in {wall:.2f}s wall, {max(serial - wall, 0.0):.2f}s overlapped")
+        return {'wall': wall, 'serial': serial, 'stages': dict(self.spans)}
+
+
 class Hunyuan3DTexGenConfig:
 
     def __init__(self, light_remover_ckpt_path, multiview_ckpt_path, subfolder_name):
@@ -57,18 +100,53 @@ class Hunyuan3DTexGenConfig:
         self.candidate_camera_elevs = [0, 0, 0, 0, 90, -90]
         self.candidate_view_weights = [1, 0.1, 0.5, 0.1, 0.05, 0.05]
 
+        # 'fixed' uses the candidate views above, 'adaptive' picks the fewest views from
+        # view_planning.CAMERA_POOL that cover view_coverage_target of the visible surface
+        self.view_selection = 'fixed'
+        self.view_coverage_target = 0.98
+        self.max_views = 6
+        self.view_planning_resolution = 256
+
         self.render_size = 2048
+        # 'off' resizes the multiview outputs to render_size, '2x' / '4x' run them
+        # through the super-resolution model first (loaded on first use)
+        self.upscale = 'off'
         self.texture_size = 2048
+        # View rasterizations kept per renderer, keyed by mesh hash, camera and resolution;
+        # one job on an unchanged mesh uses two per view (input mesh and unwrapped mesh),
+        # None sizes it for the largest view set, max_views or the candidate views
+        self.raster_cache_size = None
         self.bake_exp = 4
         self.merge_method = 'fast'
+        # 'fast' switches to the tiled bake from this atlas size on, which keeps only
+        # one band of bake_tile_size rows in float32 and stores the rest in bake_dtype
+        self.tiled_bake_min_size = 4096
+        self.bake_tile_size = 1024
+        self.bake_dtype = torch.float16
+        self.inpaint_method = 'push_pull'
+        # xatlas options, see hy3dgen.meshops.uv_ops.DEFAULT_UNWRAP_OPTIONS
+        self.uv_unwrap_options = None
+        # 'int8' quantizes the multiview UNet's transformer block weights when loading
+        self.quantization = None
 
         self.pipe_dict = {'hunyuan3d-paint-v2-0': 'hunyuanpaint', 'hunyuan3d-paint-v2-0-turbo': 'hunyuanpaint-turbo'}
         self.pipe_name = self.pipe_dict[subfolder_name]
 
+    def view_raster_cache_size(self):
+        if self.raster_cache_size is not None:
+            return self.raster_cache_size
+        return 2 * max(self.max_views, len(self.candidate_camera_azims))
+
 
 class Hunyuan3DPaintPipeline:
     @classmethod
-    def from_pretrained(cls, model_path, subfolder='hunyuan3d-paint-v2-0-turbo', low_vram_mode=False):
+    def from_pretrained(cls, model_path, subfolder='hunyuan3d-paint-v2-0-turbo', low_vram_mode=False,
+                        quantization=None):
+        def make_config(delight_model_path, multiview_model_path):
+            config = Hunyuan3DTexGenConfig(delight_model_path, multiview_model_path, subfolder)
+            config.quantization = quantization
+            return config
+
         original_model_path = model_path
         if not os.path.exists(model_path):
             # try local path
@@ -90,25 +168,27 @@ class Hunyuan3DPaintPipeline:
                     )
                     delight_model_path = os.path.join(model_path, 'hunyuan3d-delight-v2-0')
                     multiview_model_path = os.path.join(model_path, subfolder)
-                    return cls(Hunyuan3DTexGenConfig(delight_model_path, multiview_model_path, subfolder), low_vram_mode=low_vram_mode)
+                    return cls(make_config(delight_model_path, multiview_model_path), low_vram_mode=low_vram_mode)
                 except Exception:
                     import traceback
                     traceback.print_exc()
                     raise RuntimeError(f"Something wrong while loading {model_path}")
             else:
-                return cls(Hunyuan3DTexGenConfig(delight_model_path, multiview_model_path, subfolder), low_vram_mode=low_vram_mode)
+                return cls(make_config(delight_model_path, multiview_model_path), low_vram_mode=low_vram_mode)
         else:
             delight_model_path = os.path.join(model_path, 'hunyuan3d-delight-v2-0')
             multiview_model_path = os.path.join(model_path, subfolder)
-            return cls(Hunyuan3DTexGenConfig(delight_model_path, multiview_model_path, subfolder), low_vram_mode=low_vram_mode)
+            return cls(make_config(delight_model_path, multiview_model_path), low_vram_mode=low_vram_mode)
             
     def __init__(self, config, low_vram_mode=False):
         self.config = config
         self.low_vram_mode = low_vram_mode
         self.models = {}
+        self.stage_timings = None
         self.render = MeshRender(
             default_resolution=self.config.render_size,
-            texture_size=self.config.texture_size)
+            texture_size=self.config.texture_size,
+            raster_cache_size=self.config.view_raster_cache_size())
 
         self.load_models()
 
@@ -129,6 +209,36 @@ class Hunyuan3DPaintPipeline:
     def enable_model_cpu_offload(self, gpu_id: Optional[int] = None, device: Union[torch.device, str] = "cuda"):
         self.models['delight_model'].pipeline.enable_model_cpu_offload(gpu_id=gpu_id, device=device)
         self.models['multiview_model'].pipeline.enable_model_cpu_offload(gpu_id=gpu_id, device=device)
+        if 'super_model' in self.models:
+            self.models['super_model'].up_pipeline_x4.enable_model_cpu_offload(gpu_id=gpu_id, device=device)
+
+    def get_super_model(self):
+        if 'super_model' not in self.models:
+            self.models['super_model'] = Image_Super_Net(self.config)
+            if self.low_vram_mode:
+                self.models['super_model'].up_pipeline_x4.enable_model_cpu_offload()
+                torch.cuda.empty_cache()
+        return self.models['super_model']
+
+    def upscale_views(self, views, upscale='off'):
+        """
+        Brings the multiview outputs to render_size. With '2x' / '4x' all views are first
+        run through the 4x super-resolution model in one tiled batch, '2x' feeding it views
+        downscaled by half so it costs a quarter of '4x'.
+        """
+        if upscale not in UPSCALE_FACTORS:
+            raise ValueError(f"Unknown upscale mode: {upscale}")
+        factor = UPSCALE_FACTORS[upscale]
+        if factor > 1:
+            super_model = self.get_super_model()
+            shrink = super_model.scale // factor
+            if shrink > 1:
+                views = [view.resize((view.width // shrink, view.height // shrink), Image.LANCZOS)
+                         for view in views]
+            views = super_model.upscale(views)
+
+        size = (self.config.render_size, self.config.render_size)
+        return [view if view.size == size else view.resize(size) for view in views]
 
     def render_normal_multiview(self, camera_elevs, camera_azims, use_abs_coor=True):
         normal_maps = []
@@ -148,29 +258,40 @@ class Hunyuan3DPaintPipeline:
 
         return position_maps
 
+    def render_geometry_multiview(self, camera_elevs, camera_azims, use_abs_coor=True):
+        """
+        Normal and position control images for all views from one batched render,
+        copied off the device once and only then split into PIL images.
+        """
+        maps = self.render.render_normal_position_multiview(
+            camera_elevs, camera_azims, use_abs_coor=use_abs_coor)
+        maps = (maps * 255).to(torch.uint8).cpu().numpy()
+
+        normal_maps = [Image.fromarray(m[..., :3]) for m in maps]
+        position_maps = [Image.fromarray(m[..., 3:]) for m in maps]
+        return normal_maps, position_maps
+
     def bake_from_multiview(self, views, camera_elevs,
                             camera_azims, view_weights, method='graphcut'):
-        project_textures, project_weighted_cos_maps = [], []
-        project_boundary_maps = []
-        for view, camera_elev, camera_azim, weight in zip(
-            views, camera_elevs, camera_azims, view_weights):
-            project_texture, project_cos_map, project_boundary_map = self.render.back_project(
-                view, camera_elev, camera_azim)
-            project_cos_map = weight * (project_cos_map ** self.config.bake_exp)
-            project_textures.append(project_texture)
-            project_weighted_cos_maps.append(project_cos_map)
-            project_boundary_maps.append(project_boundary_map)
-
+        if method == 'fast' and max(self.render.texture_size) >= self.config.tiled_bake_min_size:
+            method = 'tiled'
         if method == 'fast':
-            texture, ori_trust_map = self.render.fast_bake_texture(
-                project_textures, project_weighted_cos_maps)
+            texture, ori_trust_map = self.render.fast_bake_multiview(
+                views, camera_elevs, camera_azims, view_weights, exp=self.config.bake_exp)
+        elif method == 'tiled':
+            texture, ori_trust_map = self.render.tiled_bake_multiview(
+                views, camera_elevs, camera_azims, view_weights, exp=self.config.bake_exp,
+                tile_size=self.config.bake_tile_size, dtype=self.config.bake_dtype)
         else:
             raise f'no method {method}'
         return texture, ori_trust_map > 1E-8
 
     def texture_inpaint(self, texture, mask):
+        if self.config.inpaint_method == 'push_pull':
+            return self.render.fast_uv_inpaint(texture, mask)
 
-        texture_np = self.render.uv_inpaint(texture, mask)
+        mask_np = (mask.squeeze(-1).cpu().numpy() * 255).astype(np.uint8)
+        texture_np = self.render.uv_inpaint(texture, mask_np)
         texture = torch.tensor(texture_np / 255).float().to(texture.device)
 
         return texture
@@ -209,55 +330,102 @@ class Hunyuan3DPaintPipeline:
         new_image.paste(cropped_image, (paste_x, paste_y))
         return new_image
 
+    def plan_views(self):
+        """Cameras and bake weights for the loaded mesh, see Hunyuan3DTexGenConfig.view_selection."""
+        if self.config.view_selection != 'adaptive':
+            return self.config.candidate_camera_elevs, self.config.candidate_camera_azims, \
+                self.config.candidate_view_weights
+
+        elevs, azims = zip(*CAMERA_POOL)
+        coverage = self.render.face_visibility(elevs, azims, resolution=self.config.view_planning_resolution)
+        face_areas = trimesh.triangles.area(self.render.vtx_pos[self.render.pos_idx.long()].cpu().numpy())
+        chosen = select_views(coverage.cpu().numpy(), face_areas,
+                              coverage_target=self.config.view_coverage_target,
+                              max_views=self.config.max_views, required=[CAMERA_POOL.index((0, 0))])
+
+        camera_elevs = [elevs[i] for i in chosen]
+        camera_azims = [azims[i] for i in chosen]
+        view_weights = [get_view_weight(elev, azim) for elev, azim in zip(camera_elevs, camera_azims)]
+        logger.info(f"Adaptive view planning chose {len(chosen)} views: {list(zip(camera_elevs, camera_azims))}")
+        return camera_elevs, camera_azims, view_weights
+
+    @torch.no_grad()
+    def _prepare_geometry(self, mesh):
+        self.render.load_mesh(mesh)
+        camera_elevs, camera_azims, view_weights = self.plan_views()
+        normal_maps, position_maps = self.render_geometry_multiview(camera_elevs, camera_azims, use_abs_coor=True)
+        return camera_elevs, camera_azims, view_weights, normal_maps, position_maps
+
     @torch.no_grad()
-    def __call__(self, mesh, image, **kwargs):
+    def __call__(self, mesh, image, uv_options=None, texture_size=None, upscale=None, **kwargs):
+        """
+        Stages overlap where their inputs allow: UV unwrapping runs in a worker process
+        and the control-map renders in a worker thread while the delight model runs,
+        and both are joined only where their results are needed. Per-stage spans of the
+        last call are kept in `self.stage_timings`.
+
+        `texture_size` and `upscale` override config.texture_size and config.upscale
+        for this call only.
+        """
+        upscale = upscale if upscale is not None else self.config.upscale
+        if texture_size is None:
+            return self._generate(mesh, image, uv_options, upscale, **kwargs)
+        self.render.set_default_texture_resolution(texture_size)
+        try:
+            return self._generate(mesh, image, uv_options, upscale, **kwargs)
+        finally:
+            self.render.set_default_texture_resolution(self.config.texture_size)
+
+    def _generate(self, mesh, image, uv_options=None, upscale='off', **kwargs):
         with Benchmark("Hunyuan3DPaintPipeline.__call__"):
-            if not isinstance(image, List):
-                image = [image]
+            timer = StageTimer()
+            uv_options = uv_options if uv_options is not None else self.config.uv_unwrap_options
+            mesh, uv_future = submit_mesh_uv_wrap(mesh, uv_options)
+            timer.track('uv_unwrap', uv_future)
 
-            images_prompt = []
-            for i in range(len(image)):
-                if isinstance(image[i], str):
-                    image_prompt = Image.open(image[i])
-                else:
-                    image_prompt = image[i]
-                images_prompt.append(image_prompt)
-                
-            images_prompt = [self.recenter_image(image_prompt) for image_prompt in images_prompt]
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="texgen_geometry") as executor:
+                geometry_future = timer.track('geometry_render', executor.submit(self._prepare_geometry, mesh))
 
-            images_prompt = [self.models['delight_model'](image_prompt) for image_prompt in images_prompt]
+                if not isinstance(image, List):
+                    image = [image]
 
-            mesh = mesh_uv_wrap(mesh)
+                with timer.stage('delight'):
+                    images_prompt = []
+                    for i in range(len(image)):
+                        if isinstance(image[i], str):
+                            image_prompt = Image.open(image[i])
+                        else:
+                            image_prompt = image[i]
+                        images_prompt.append(image_prompt)
 
-            self.render.load_mesh(mesh)
+                    images_prompt = [self.recenter_image(image_prompt) for image_prompt in images_prompt]
 
-            selected_camera_elevs, selected_camera_azims, selected_view_weights = \
-                self.config.candidate_camera_elevs, self.config.candidate_camera_azims, self.config.candidate_view_weights
+                    images_prompt = [self.models['delight_model'](image_prompt) for image_prompt in images_prompt]
 
-            normal_maps = self.render_normal_multiview(
-                selected_camera_elevs, selected_camera_azims, use_abs_coor=True)
-            position_maps = self.render_position_multiview(
-                selected_camera_elevs, selected_camera_azims)
+                selected_camera_elevs, selected_camera_azims, selected_view_weights, normal_maps, position_maps = \
+                    geometry_future.result()
 
-            camera_info = [(((azim // 30) + 9) % 12) // {-20: 1, 0: 1, 20: 1, -90: 3, 90: 3}[
-                elev] + {-20: 0, 0: 12, 20: 24, -90: 36, 90: 40}[elev] for azim, elev in
-                           zip(selected_camera_azims, selected_camera_elevs)]
-            multiviews = self.models['multiview_model'](images_prompt, normal_maps + position_maps, camera_info, **kwargs)
+            camera_info = get_camera_info(selected_camera_elevs, selected_camera_azims)
+            with timer.stage('multiview_diffusion'):
+                multiviews = self.models['multiview_model'](images_prompt, normal_maps + position_maps, camera_info, **kwargs)
 
-            for i in range(len(multiviews)):
-                # multiviews[i] = self.models['super_model'](multiviews[i])
-                multiviews[i] = multiviews[i].resize(
-                    (self.config.render_size, self.config.render_size))
+            with timer.stage('upscale'):
+                multiviews = self.upscale_views(multiviews, upscale)
 
-            texture, mask = self.bake_from_multiview(multiviews,
-                                                     selected_camera_elevs, selected_camera_azims, selected_view_weights,
-                                                     method=self.config.merge_method)
+            with timer.stage('uv_join'):
+                mesh = apply_mesh_uv_wrap(mesh, uv_future)
+                self.render.load_mesh(mesh)
 
-            mask_np = (mask.squeeze(-1).cpu().numpy() * 255).astype(np.uint8)
+            with timer.stage('bake'):
+                texture, mask = self.bake_from_multiview(multiviews,
+                                                         selected_camera_elevs, selected_camera_azims, selected_view_weights,
+                                                         method=self.config.merge_method)
 
-            texture = self.texture_inpaint(texture, mask_np)
+            with timer.stage('inpaint'):
+                texture = self.texture_inpaint(texture, mask)
 
-            self.render.set_texture(texture)
-            textured_mesh = self.render.save_mesh()
+                self.render.set_texture(texture)
+                textured_mesh = self.render.save_mesh()
 
+            self.stage_timings = timer.report()
             return textured_mesh
@@ -12,16 +12,76 @@
 # fine-tuning enabling code and other elements of the foregoing made publicly available
 # by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
 
+import numpy as np
 import torch
+from PIL import Image
 from diffusers import StableDiffusionUpscalePipeline
 
+
+def tile_starts(size, tile_size, overlap):
+    # Offsets of overlapping tiles covering [0, size), the last one flush with the edge
+    if size <= tile_size:
+        return [0]
+    starts = list(range(0, size - tile_size, tile_size - overlap))
+    return starts + [size - tile_size]
+
+
+def feather_ramp(length, overlap):
+    # 1D blend weight rising linearly over `overlap` pixels at both ends of a tile
+    i = np.arange(length, dtype=np.float32) + 0.5
+    ramp = np.minimum(i, length - i) / max(overlap, 1)
+    return np.clip(ramp, 1e-3, 1.0)
+
+
+def upscale_tiled(images, upscale_fn, scale, tile_size=128, overlap=16, batch_size=16):
+    """
+    Upscales a list of PIL images by `scale` with `upscale_fn`, which maps a list of
+    tiles to a list of tiles `scale` times larger. Tiles from all images go through
+    `upscale_fn` together in batches of `batch_size` and are blended back with linear
+    feathering across the `overlap` pixels they share.
+    """
+    tiles, slots = [], []
+    for index, image in enumerate(images):
+        width, height = image.size
+        for y in tile_starts(height, tile_size, overlap):
+            for x in tile_starts(width, tile_size, overlap):
+                tiles.append(image.crop((x, y, min(x + tile_size, width), min(y + tile_size, height))))
+                slots.append((index, x, y))
+
+    upscaled = []
+    for start in range(0, len(tiles), batch_size):
+        upscaled.extend(upscale_fn(tiles[start:start + batch_size]))
+
+    canvases = [np.zeros((image.height * scale, image.width * scale, len(image.getbands())), np.float32)
+                for image in images]
+    weights = [np.zeros((image.height * scale, image.width * scale, 1), np.float32) for image in images]
+    for (index, x, y), tile, src in zip(slots, upscaled, tiles):
+        w, h = src.width * scale, src.height * scale
+        tile = np.asarray(tile.convert(images[index].mode).resize((w, h)), dtype=np.float32)
+        tile = tile.reshape(h, w, -1)
+        weight = np.outer(feather_ramp(h, overlap * scale), feather_ramp(w, overlap * scale))[..., None]
+        canvases[index][y * scale:y * scale + h, x * scale:x * scale + w] += tile * weight
+        weights[index][y * scale:y * scale + h, x * scale:x * scale + w] += weight
+
+    results = []
+    for image, canvas, weight in zip(images, canvases, weights):
+        out = np.clip(np.rint(canvas / weight), 0, 255).astype(np.uint8)
+        results.append(Image.fromarray(out.squeeze(-1) if out.shape[-1] == 1 else out))
+    return results
+
+
 class Image_Super_Net():
+    scale = 4
+
     def __init__(self, config):
         self.up_pipeline_x4 = StableDiffusionUpscalePipeline.from_pretrained(
                         'stabilityai/stable-diffusion-x4-upscaler',
                         dtype=torch.float16,
                     ).to(config.device)
         self.up_pipeline_x4.set_progress_bar_config(disable=True)
+        self.tile_size = 128
+        self.tile_overlap = 16
+        self.batch_size = 16
 
     def __call__(self, image, prompt=''):
         with torch.no_grad():
@@ -32,3 +92,15 @@ class Image_Super_Net():
             ).images[0]
 
         return upscaled_image
+
+    @torch.no_grad()
+    def upscale(self, images, prompt=''):
+        """Upscales all images 4x, batching their overlapping tiles through the model."""
+        def run(tiles):
+            return self.up_pipeline_x4(
+                prompt=[prompt] * len(tiles),
+                image=tiles,
+                num_inference_steps=5,
+            ).images
+
+        return upscale_tiled(images, run, self.scale, self.tile_size, self.tile_overlap, self.batch_size)
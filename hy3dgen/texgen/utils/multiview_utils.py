@@ -21,6 +21,12 @@ from typing import List
 from diffusers import DiffusionPipeline
 from diffusers import EulerAncestralDiscreteScheduler, LCMScheduler
 
+from ...quantization import quantize_model
+
+# UNet blocks quantized by config.quantization: the attention and feed-forward layers of
+# every 2.5D transformer block, matched by name as the UNet class comes from the checkpoint
+QUANTIZED_UNET_BLOCKS = ('Basic2p5DTransformerBlock',)
+
 
 class Multiview_Diffusion_Net():
     def __init__(self, config) -> None:
@@ -47,6 +53,11 @@ class Multiview_Diffusion_Net():
             pipeline.set_turbo(True)
             # pipeline.prepare() 
 
+        if config.quantization is not None:
+            if config.quantization != 'int8':
+                raise ValueError(f"Unsupported quantization: {config.quantization}, expected 'int8'")
+            quantize_model(pipeline.unet, include=QUANTIZED_UNET_BLOCKS)
+
         pipeline.set_progress_bar_config(disable=True)
         self.pipeline = pipeline.to(self.device)
 
@@ -13,20 +13,34 @@
 # by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
 
 import trimesh
-import xatlas
 
+from hy3dgen.meshops import uv_ops
 
-def mesh_uv_wrap(mesh):
+
+def submit_mesh_uv_wrap(mesh, options=None):
+    """
+    Starts unwrapping on the UV worker pool. Returns the (possibly concatenated) mesh
+    and a future to pass to `apply_mesh_uv_wrap`.
+    """
     if isinstance(mesh, trimesh.Scene):
         mesh = mesh.dump(concatenate=True)
 
     if len(mesh.faces) > 500000000:
         raise ValueError("The mesh has more than 500,000,000 faces, which is not supported.")
 
-    vmapping, indices, uvs = xatlas.parametrize(mesh.vertices, mesh.faces)
+    return mesh, uv_ops.submit_unwrap(mesh.vertices, mesh.faces, options)
+
+
+def apply_mesh_uv_wrap(mesh, future):
+    vmapping, indices, uvs = future.result()
 
     mesh.vertices = mesh.vertices[vmapping]
     mesh.faces = indices
     mesh.visual.uv = uvs
 
     return mesh
+
+
+def mesh_uv_wrap(mesh, options=None):
+    mesh, future = submit_mesh_uv_wrap(mesh, options)
+    return apply_mesh_uv_wrap(mesh, future)
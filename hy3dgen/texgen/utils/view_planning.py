@@ -0,0 +1,63 @@
+# Hunyuan 3D is licensed under the TENCENT HUNYUAN NON-COMMERCIAL LICENSE AGREEMENT
+# except for the third-party components listed below.
+# Hunyuan 3D does not impose any additional limitations beyond what is outlined
+# in the repsective licenses of these third-party components.
+# Users must comply with all terms and conditions of original licenses of these third-party
+# components and must ensure that the usage of the third party components adheres to
+# all relevant laws and regulations.
+
+# For avoidance of doubts, Hunyuan 3D means the large language models and
+# their software and algorithms, including trained model weights, parameters (including
+# optimizer states), machine-learning model code, inference-enabling code, training-enabling code,
+# fine-tuning enabling code and other elements of the foregoing made publicly available
+# by Tencent in accordance with TENCENT HUNYUAN COMMUNITY LICENSE AGREEMENT.
+
+import numpy as np
+
+# Cameras the multiview model has ids for: azimuths in 30 degree steps at elevation
+# -20 / 0 / 20, plus the top and bottom views
+CAMERA_POOL = [(elev, azim) for elev in (0, 20, -20) for azim in range(0, 360, 30)] + [(90, 0), (-90, 180)]
+
+
+def get_camera_info(camera_elevs, camera_azims):
+    return [(((azim // 30) + 9) % 12) // {-20: 1, 0: 1, 20: 1, -90: 3, 90: 3}[
+        elev] + {-20: 0, 0: 12, 20: 24, -90: 36, 90: 40}[elev] for azim, elev in
+            zip(camera_azims, camera_elevs)]
+
+
+def get_view_weight(elev, azim):
+    """
+    Bake weight of a view: 1 for the front (prompt) view, 0.5 for the back, 0.1 for the
+    sides and 0.05 for top / bottom, linearly interpolated in between.
+    """
+    if abs(elev) == 90:
+        return 0.05
+    offset = abs((azim + 180) % 360 - 180)
+    return float(np.interp(offset, [0, 90, 180], [1.0, 0.1, 0.5]))
+
+
+def select_views(face_coverage, face_areas, coverage_target=0.98, max_views=6, required=(0,)):
+    """
+    Greedy set cover over candidate views.
+
+    face_coverage: [V, F] bool, faces each candidate sees at a usable angle.
+    face_areas: [F] surface area of every face.
+    Starts from the `required` candidates and adds the view that covers the most
+    uncovered area until `coverage_target` of the area any candidate can see is
+    covered or `max_views` views are chosen. Returns candidate indices in pool order.
+    """
+    face_coverage = np.asarray(face_coverage, dtype=bool)
+    face_areas = np.asarray(face_areas, dtype=np.float64)
+    coverable = (face_coverage.any(0) * face_areas).sum()
+
+    chosen = list(required)
+    covered = face_coverage[chosen].any(0) if chosen else np.zeros(face_coverage.shape[1], dtype=bool)
+    while len(chosen) < max_views and (covered * face_areas).sum() < coverage_target * coverable:
+        gain = ((face_coverage & ~covered) * face_areas).sum(1)
+        gain[chosen] = -1
+        best = int(np.argmax(gain))
+        if gain[best] <= 0:
+            break
+        chosen.append(best)
+        covered |= face_coverage[best]
+    return sorted(chosen)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the UV rasterization stage of MeshOps native baking.
+Compares the batched rasterizer against the legacy per-face loop.
+"""
+import sys
+import os
+import time
+import argparse
+import logging
+
+import numpy as np
+import trimesh
+
+# Ensure we can import hy3dgen
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import uv_texel_rays, uv_texel_rays_loop
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_mesh(target_faces: int) -> trimesh.Trimesh:
+    """Sphere with a cylindrical UV layout, close to target_faces faces."""
+    count = max(8, int(np.sqrt(target_faces / 4)))
+    mesh = trimesh.creation.uv_sphere(radius=1.0, count=[count, count])
+    v = mesh.vertices
+    uv = np.stack([
+        (np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi)) % 1.0,
+        np.arccos(np.clip(v[:, 2], -1.0, 1.0)) / np.pi,
+    ], axis=-1)
+    mesh.visual = trimesh.visual.TextureVisuals(uv=uv)
+    return mesh
+
+
+def time_call(fn, *args, **kwargs):
+    start = time.time()
+    out = fn(*args, **kwargs)
+    return out, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faces", type=int, default=50000)
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[512, 2048])
+    parser.add_argument("--skip_legacy", action="store_true", help="Only time the batched rasterizer")
+    args = parser.parse_args()
+
+    mesh = build_mesh(args.faces)
+    uvs = mesh.visual.uv
+    logger.info(f"Mesh: {len(mesh.vertices)} verts, {len(mesh.faces)} faces")
+
+    for res in args.resolutions:
+        (origins, dirs, pixels), t_new = time_call(
+            uv_texel_rays, mesh.vertices, mesh.faces, mesh.vertex_normals, uvs, res)
+        logger.info(f"[{res}x{res}] batched: {t_new:8.2f}s ({len(origins)} texels)")
+
+        if args.skip_legacy:
+            continue
+
+        (ref_origins, ref_dirs, ref_pixels), t_old = time_call(
+            uv_texel_rays_loop, mesh.vertices, mesh.faces, mesh.vertex_normals, uvs, res)
+        same = (np.array_equal(pixels, ref_pixels)
+                and np.allclose(origins, ref_origins)
+                and np.allclose(dirs, ref_dirs))
+        logger.info(f"[{res}x{res}] legacy:  {t_old:8.2f}s ({len(ref_origins)} texels)")
+        logger.info(f"[{res}x{res}] speedup: {t_old / max(t_new, 1e-9):8.2f}x, identical buffers: {same}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
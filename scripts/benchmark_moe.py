@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of MoEBlock inference across token counts.
+Compares the grouped-GEMM path and the per-expert loop against the original implementation.
+"""
+import sys
+import os
+import time
+import argparse
+import functools
+import logging
+
+import torch
+
+# Ensure we can import hy3dgen
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hy3dgen.shapegen.models.denoisers.moe_layers import MoEBlock
+from tests.helpers import moe_infer_reference
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def time_call(fn, args, repeats, device):
+    fn(*args)
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    start = time.time()
+    for _ in range(repeats):
+        out = fn(*args)
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    return out, (time.time() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--experts", type=int, default=8)
+    parser.add_argument("--top_k", type=int, default=2)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[64, 512, 2048, 8194])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--dtype", default="float16" if torch.cuda.is_available() else "float32")
+    args = parser.parse_args()
+
+    device = torch.device(args.device)
+    dtype = getattr(torch, args.dtype)
+    block = MoEBlock(args.dim, num_experts=args.experts, moe_top_k=args.top_k,
+                     ff_inner_dim=args.dim * 4).eval().to(device, dtype)
+    logger.info(f"dim={args.dim} experts={args.experts} top_k={args.top_k} {device} {dtype}, "
+                f"grouped GEMM available: {block.use_grouped_mm}")
+
+    for tokens in args.tokens:
+        x = torch.randn(tokens, args.dim, device=device, dtype=dtype)
+        with torch.no_grad():
+            topk_idx, topk_weight, _ = block.gate(x[None])
+        inputs = (x, topk_idx.view(-1), topk_weight.view(-1, 1))
+
+        reference, t_ref = time_call(functools.partial(moe_infer_reference, block), inputs, args.repeats, device)
+        line = f"[{tokens:6d} tokens] original: {t_ref * 1000:8.2f}ms"
+        paths = [('loop', block.moe_infer_loop)]
+        if block.use_grouped_mm:
+            paths.append(('grouped', block.moe_infer_grouped))
+        for name, fn in paths:
+            out, t = time_call(fn, inputs, args.repeats, device)
+            err = (out.float() - reference.float()).abs().max().item()
+            line += f" | {name}: {t * 1000:8.2f}ms ({t_ref / max(t, 1e-9):5.2f}x, max err {err:.1e})"
+        logger.info(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
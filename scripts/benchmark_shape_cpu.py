@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing of the shape pipeline on CPU at small octree resolutions.
+Compares serial and thread-parallel volume decoding. --tiny runs a randomly initialized
+model that needs no download, e.g. for CI.
+"""
+import sys
+import os
+import time
+import argparse
+import logging
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Ensure we can import hy3dgen
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hy3dgen.shapegen import Hunyuan3DDiTFlowMatchingPipeline
+from hy3dgen.shapegen.pipelines import instantiate_from_config
+from hy3dgen.shapegen.utils import synchronize_timer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STAGES = ['Encode cond', 'Diffusion Sampling', 'Volume decoding', 'Surface extraction', 'Export to trimesh']
+
+TINY_CONFIG = {
+    'model': {'target': 'hy3dgen.shapegen.models.denoisers.hunyuan3ddit.Hunyuan3DDiT',
+              'params': dict(in_channels=16, context_in_dim=64, hidden_size=256, num_heads=4, depth=2,
+                             depth_single_blocks=4, axes_dim=[64])},
+    'vae': {'target': 'hy3dgen.shapegen.models.autoencoders.ShapeVAE',
+            'params': dict(num_latents=256, embed_dim=16, width=256, heads=4, num_decoder_layers=2,
+                           num_encoder_layers=1, pc_size=64, pc_sharpedge_size=0)},
+    'conditioner': {'target': 'hy3dgen.shapegen.models.conditioner.SingleImageEncoder',
+                    'params': {'main_image_encoder': {'type': 'DinoImageEncoder', 'kwargs': {
+                        'config': {'hidden_size': 64, 'num_hidden_layers': 2, 'num_attention_heads': 4,
+                                   'intermediate_size': 256, 'image_size': 224, 'patch_size': 14},
+                        'image_size': 224}}}},
+    'image_processor': {'target': 'hy3dgen.shapegen.preprocessors.ImageProcessorV2', 'params': {'size': 224}},
+    'scheduler': {'target': 'hy3dgen.shapegen.schedulers.FlowMatchEulerDiscreteScheduler',
+                  'params': {'num_train_timesteps': 1000}},
+}
+
+
+def load_pipeline(args, dtype):
+    kwargs = dict(device='cpu', dtype=dtype, cpu_threads=args.threads)
+    if args.tiny:
+        torch.manual_seed(0)
+        components = {name: instantiate_from_config(config) for name, config in TINY_CONFIG.items()}
+        return Hunyuan3DDiTFlowMatchingPipeline(**components, **kwargs)
+    return Hunyuan3DDiTFlowMatchingPipeline.from_pretrained(
+        args.model_path, subfolder=args.subfolder, quantization=args.quantization, **kwargs)
+
+
+def load_image(path):
+    if path:
+        return Image.open(path)
+    # Opaque disc on a transparent background
+    yy, xx = np.mgrid[:512, :512]
+    image = np.zeros((512, 512, 4), dtype=np.uint8)
+    image[(yy - 256) ** 2 + (xx - 256) ** 2 < 180 ** 2] = (200, 120, 80, 255)
+    return Image.fromarray(image)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", default="tencent/Hunyuan3D-2mini")
+    parser.add_argument("--subfolder", default="hunyuan3d-dit-v2-mini-turbo")
+    parser.add_argument("--tiny", action="store_true", help="Random-weight model, no download")
+    parser.add_argument("--image", default=None)
+    parser.add_argument("--dtype", default="bfloat16", choices=["bfloat16", "float32"],
+                        help="bfloat16 falls back to float32 on CPUs without native bf16")
+    parser.add_argument("--quantization", default=None, choices=["int8"])
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--decode_workers", type=int, nargs="+", default=None,
+                        help="Volume-decoding workers to compare, default serial and the pipeline's choice")
+    parser.add_argument("--octree_resolutions", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--num_chunks", type=int, default=8000)
+    parser.add_argument("--flashvdm", action="store_true")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(args, getattr(torch, args.dtype))
+    if args.flashvdm:
+        pipeline.vae.enable_flashvdm_decoder(mc_algo='mc')
+    image = load_image(args.image)
+    workers = args.decode_workers or sorted({1, pipeline.decode_workers})
+    logger.info(f"{torch.get_num_threads()} threads, {pipeline.dtype}, decode workers {workers}")
+
+    for resolution in args.octree_resolutions:
+        for num_workers in workers:
+            pipeline.decode_workers = num_workers
+            with synchronize_timer.collect() as timings:
+                start = time.time()
+                mesh = pipeline(image=image, num_inference_steps=args.steps, octree_resolution=resolution,
+                                num_chunks=args.num_chunks, generator=torch.Generator().manual_seed(0),
+                                enable_pbar=False)[0]
+                total = time.time() - start
+            stages = " | ".join(f"{name}: {sum(timings.get(name, [0.0])) / 1000:6.2f}s" for name in STAGES)
+            faces = 0 if mesh is None else len(mesh.faces)
+            logger.info(f"[r{resolution} x{num_workers}] total {total:6.2f}s | {stages} | {faces} faces")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import numpy as np
+import torch
+
+from hy3dgen.meshops import tex_ops
+
+# Randomly initialized shape pipeline small enough for CPU tests, no download needed
+TINY_CONFIG = {
+    'model': {'target': 'hy3dgen.shapegen.models.denoisers.hunyuan3ddit.Hunyuan3DDiT',
+              'params': dict(in_channels=8, context_in_dim=32, hidden_size=64, num_heads=4, depth=1,
+                             depth_single_blocks=1, axes_dim=[16])},
+    'vae': {'target': 'hy3dgen.shapegen.models.autoencoders.ShapeVAE',
+            'params': dict(num_latents=16, embed_dim=8, width=64, heads=4, num_decoder_layers=1,
+                           num_encoder_layers=1, pc_size=64, pc_sharpedge_size=0)},
+    'conditioner': {'target': 'hy3dgen.shapegen.models.conditioner.SingleImageEncoder',
+                    'params': {'main_image_encoder': {'type': 'DinoImageEncoder', 'kwargs': {
+                        'config': {'hidden_size': 32, 'num_hidden_layers': 1, 'num_attention_heads': 2,
+                                   'intermediate_size': 64, 'image_size': 56, 'patch_size': 14},
+                        'image_size': 56}}}},
+    'image_processor': {'target': 'hy3dgen.shapegen.preprocessors.ImageProcessorV2', 'params': {'size': 56}},
+    'scheduler': {'target': 'hy3dgen.shapegen.schedulers.FlowMatchEulerDiscreteScheduler',
+                  'params': {'num_train_timesteps': 1000}},
+}
+
+
+def uv_texel_rays(vertices, faces, vertex_normals, uvs, resolution, batch_texels=tex_ops.UV_RASTER_BATCH_TEXELS):
+    """Per-texel ray origins, directions and pixel coords, as native baking casts them."""
+    faces = np.asarray(faces, dtype=np.int64)
+    all_origins, all_dirs, all_pixels = [], [], []
+    for pixels, face_idx, bary in tex_ops.iter_uv_texels(faces, uvs, resolution, batch_texels):
+        world_norm = tex_ops._normalize(tex_ops._interpolate(vertex_normals, faces, face_idx, bary))
+        all_origins.append(tex_ops._interpolate(vertices, faces, face_idx, bary) + world_norm * 0.001)
+        all_dirs.append(-world_norm)
+        all_pixels.append(pixels)
+    return np.concatenate(all_origins), np.concatenate(all_dirs), np.concatenate(all_pixels)
+
+
+def uv_texel_rays_loop(vertices, faces, vertex_normals, uvs, resolution):
+    """Reference per-face UV rasterization that iter_uv_texels replaced, same output order."""
+    all_origins, all_dirs, all_pixels = [], [], []
+    for face in faces:
+        tri_uvs = uvs[face] * (resolution - 1)
+        min_u, min_v = np.floor(np.min(tri_uvs, axis=0)).astype(int)
+        max_u, max_v = np.ceil(np.max(tri_uvs, axis=0)).astype(int)
+        min_u, max_u = np.clip([min_u, max_u], 0, resolution - 1)
+        min_v, max_v = np.clip([min_v, max_v], 0, resolution - 1)
+
+        uu, vv = np.meshgrid(np.arange(min_u, max_u + 1), np.arange(min_v, max_v + 1))
+        pts = np.stack([uu.ravel(), vv.ravel()], axis=-1)
+
+        v0 = tri_uvs[1] - tri_uvs[0]
+        v1 = tri_uvs[2] - tri_uvs[0]
+        v2 = pts - tri_uvs[0]
+        d00, d01, d11 = np.dot(v0, v0), np.dot(v0, v1), np.dot(v1, v1)
+        d20, d21 = np.einsum('ni,i->n', v2, v0), np.einsum('ni,i->n', v2, v1)
+        denom = d00 * d11 - d01 * d01
+        if abs(denom) < 1e-8:
+            continue
+        v_bary = (d11 * d20 - d01 * d21) / denom
+        w_bary = (d00 * d21 - d01 * d20) / denom
+        u_bary = 1.0 - v_bary - w_bary
+
+        mask = (u_bary >= -0.01) & (v_bary >= -0.01) & (w_bary >= -0.01)
+        if not np.any(mask):
+            continue
+
+        b = np.stack([u_bary[mask], v_bary[mask], w_bary[mask]], axis=-1)
+        world_pos = np.einsum('ni,ij->nj', b, vertices[face])
+        world_norm = np.einsum('ni,ij->nj', b, vertex_normals[face])
+        norm_len = np.linalg.norm(world_norm, axis=1, keepdims=True)
+        world_norm = np.divide(world_norm, norm_len, out=np.zeros_like(world_norm), where=norm_len > 1e-8)
+
+        all_origins.append(world_pos + world_norm * 0.001)
+        all_dirs.append(-world_norm)
+        all_pixels.append(pts[mask])
+    return np.concatenate(all_origins), np.concatenate(all_dirs), np.concatenate(all_pixels)
+
+
+@torch.no_grad()
+def moe_infer_reference(block, x, flat_expert_indices, flat_expert_weights):
+    """The per-expert scatter_reduce loop MoEBlock.moe_infer replaced."""
+    expert_cache = torch.zeros_like(x)
+    idxs = flat_expert_indices.argsort()
+    tokens_per_expert = flat_expert_indices.bincount().cpu().numpy().cumsum(0)
+    token_idxs = idxs // block.moe_top_k
+    for i, end_idx in enumerate(tokens_per_expert):
+        start_idx = 0 if i == 0 else tokens_per_expert[i - 1]
+        if start_idx == end_idx:
+            continue
+        expert = block.experts[i]
+        exp_token_idx = token_idxs[start_idx:end_idx]
+        expert_out = expert(x[exp_token_idx])
+        expert_out.mul_(flat_expert_weights[idxs[start_idx:end_idx]])
+
+        # for fp16 and other dtype
+        expert_cache = expert_cache.to(expert_out.dtype)
+        expert_cache.scatter_reduce_(0, exp_token_idx.view(-1, 1).repeat(1, x.shape[-1]), expert_out, reduce='sum')
+    return expert_cache
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import torch
+
+from hy3dgen.shapegen.models.autoencoders import attention_processors
+from hy3dgen.shapegen.models.autoencoders import FlashVDMTopMCrossAttentionProcessor, ShapeVAE
+from hy3dgen.shapegen.models.autoencoders.attention_processors import attention, select_attention_backend
+
+VAE_PARAMS = dict(num_latents=32, embed_dim=8, width=64, heads=4, num_decoder_layers=1,
+                  num_encoder_layers=1, pc_size=64, pc_sharpedge_size=0)
+
+
+class TestAttentionBackends(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+
+    def test_backends_agree(self):
+        q, k, v = torch.randn(2, 4, 300, 16), torch.randn(2, 4, 50, 16), torch.randn(2, 4, 50, 16)
+        reference = torch.nn.functional.scaled_dot_product_attention(q, k, v)
+        # A small budget makes the chunked backend split the queries
+        with mock.patch.object(attention_processors, 'CHUNKED_ATTENTION_BYTES', 2 * 4 * 50 * 4 * 7):
+            for backend in ('auto', 'flash', 'math', 'chunked'):
+                torch.testing.assert_close(attention(q, k, v, backend), reference, atol=1e-5, rtol=1e-5)
+
+    def test_select_backend(self):
+        q, k = torch.randn(1, 4, 100, 16), torch.randn(1, 4, 50, 16)
+        self.assertEqual(select_attention_backend(q, k), 'flash')
+        meta = torch.empty(1, 16, 100000, 64, device='meta')
+        self.assertEqual(select_attention_backend(meta, meta), 'chunked')
+        self.assertEqual(select_attention_backend(meta[:, :, :10], meta[:, :, :10]), 'math')
+
+    def test_topm_selection_matches_unique(self):
+        processor = FlashVDMTopMCrossAttentionProcessor()
+        q, k, v = torch.randn(1, 4, 600, 16), torch.randn(1, 4, 64, 16) * 10, torch.randn(1, 4, 64, 16)
+        k0, v0 = processor.select_topkv(q, k, v, topk=16)
+        sim = (q[:, :, ::30] @ k.transpose(-1, -2)).softmax(-1).mean(1)
+        index = torch.unique(torch.where(sim > 1e-6)[2])
+        self.assertLess(len(index), k.shape[-2])
+        torch.testing.assert_close(k0, k[:, :, index])
+        torch.testing.assert_close(v0, v[:, :, index])
+
+
+class TestLatentsProjection(unittest.TestCase):
+
+    def test_keys_and_values_projected_once(self):
+        torch.manual_seed(0)
+        decoder = ShapeVAE(**VAE_PARAMS).eval().geo_decoder
+        latents = torch.randn(1, 32, 64)
+        queries = torch.rand(3, 100, 3) * 2 - 1
+        calls = []
+        decoder.cross_attn_decoder.attn.c_kv.register_forward_hook(lambda *args: calls.append(1))
+        with torch.no_grad():
+            reference = torch.cat([decoder(queries=q[None], latents=latents) for q in queries])
+            self.assertEqual(len(calls), 3)
+            with decoder.cache_latents():
+                chunks = [decoder(queries=q[None], latents=latents) for q in queries]
+                # Latents of batch 1 serve a batch of query sets
+                batched = decoder(queries=queries, latents=latents)
+            self.assertEqual(len(calls), 4)
+        torch.testing.assert_close(torch.cat(chunks), reference)
+        torch.testing.assert_close(batched, reference)
+        self.assertIsNone(decoder._kv_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
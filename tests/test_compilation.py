@@ -0,0 +1,144 @@
+import unittest
+
+import numpy as np
+import torch
+from PIL import Image
+
+from hy3dgen.shapegen.compilation import bucket_for, pad_dim
+from hy3dgen.shapegen.pipelines import Hunyuan3DDiTFlowMatchingPipeline, instantiate_from_config
+from tests.helpers import TINY_CONFIG
+
+
+class CountingBackend:
+    """Eager torch.compile backend that counts the graphs it is handed."""
+
+    def __init__(self, fail=False):
+        self.graphs = 0
+        self.fail = fail
+
+    def __call__(self, gm, example_inputs):
+        self.graphs += 1
+        if self.fail:
+            raise RuntimeError('backend failure')
+        return gm.forward
+
+
+def tiny_pipeline():
+    torch.manual_seed(0)
+    components = {name: instantiate_from_config(config) for name, config in TINY_CONFIG.items()}
+    return Hunyuan3DDiTFlowMatchingPipeline(**components, device='cpu', dtype=torch.float32)
+
+
+def run(pipeline, image, num_chunks=3000):
+    return pipeline(image=image, num_inference_steps=2, octree_resolution=32, num_chunks=num_chunks,
+                    generator=torch.Generator().manual_seed(0), enable_pbar=False)[0]
+
+
+class TestBuckets(unittest.TestCase):
+
+    def test_bucket_for(self):
+        self.assertEqual(bucket_for(1, [2, 4]), 2)
+        self.assertEqual(bucket_for(4, [2, 4]), 4)
+        self.assertIsNone(bucket_for(5, [2, 4]))
+
+    def test_pad_dim(self):
+        x = torch.arange(6.).view(2, 3)
+        self.assertIs(pad_dim(x, 2, 0), x)
+        padded = pad_dim(x, 5, 1)
+        self.assertEqual(padded.shape, (2, 5))
+        torch.testing.assert_close(padded[:, 3:], x[:, 2:].expand(2, 2))
+
+
+class TestCompiledPipeline(unittest.TestCase):
+
+    def setUp(self):
+        torch._dynamo.reset()
+        image = np.zeros((64, 64, 4), dtype=np.uint8)
+        image[16:48, 16:48] = 255
+        self.image = Image.fromarray(image)
+
+    def test_no_recompiles_after_warmup(self):
+        reference = run(tiny_pipeline(), self.image)
+
+        pipeline = tiny_pipeline()
+        backend = CountingBackend()
+        pipeline.compile(batch_sizes=(2,), chunk_sizes=(2000, 4000), backend=backend)
+        pipeline.warmup()
+        self.assertGreater(backend.graphs, 0)
+        graphs = backend.graphs
+        # Chunk sizes below, between and above the buckets all land on warmed-up graphs
+        for num_chunks in (1500, 3000, 9000):
+            mesh = run(pipeline, self.image, num_chunks)
+        self.assertEqual(backend.graphs, graphs)
+        self.assertFalse(pipeline.compilation.failed)
+        np.testing.assert_allclose(mesh.vertices, reference.vertices, atol=1e-4)
+        np.testing.assert_array_equal(mesh.faces, reference.faces)
+
+    def test_batch_padding_matches_eager(self):
+        pipeline = tiny_pipeline()
+        x = torch.randn(1, *pipeline.vae.latent_shape)
+        t = torch.full((1,), 0.5)
+        cond = pipeline.conditioner.unconditional_embedding(1)
+        with torch.no_grad():
+            reference = pipeline.model(x, t, cond)
+            pipeline.compile(batch_sizes=(4,), backend='eager')
+            out = pipeline.model(x, t, cond)
+        self.assertEqual(out.shape, reference.shape)
+        torch.testing.assert_close(out, reference, atol=1e-5, rtol=1e-5)
+
+    def test_failed_compile_falls_back_to_eager(self):
+        pipeline = tiny_pipeline()
+        x = torch.randn(2, *pipeline.vae.latent_shape)
+        t = torch.full((2,), 0.5)
+        cond = pipeline.conditioner.unconditional_embedding(2)
+        with torch.no_grad():
+            reference = pipeline.model(x, t, cond)
+        pipeline.compile(backend=CountingBackend(fail=True))
+        pipeline.warmup()
+        self.assertTrue(pipeline.compilation.failed)
+        for module in [pipeline.model, pipeline.vae.geo_decoder, *pipeline.model.double_blocks]:
+            self.assertNotIn('forward', module.__dict__)
+        with torch.no_grad():
+            torch.testing.assert_close(pipeline.model(x, t, cond), reference)
+
+
+    def test_default_batch_bucket_follows_guidance(self):
+        pipeline = tiny_pipeline()
+        pipeline.compile(backend='eager')
+        self.assertEqual(pipeline.compilation.batch_sizes, [2])
+        # Guidance-distilled models run without CFG, at batch 1
+        pipeline = tiny_pipeline()
+        pipeline.model.guidance_embed = True
+        pipeline.compile(backend='eager')
+        self.assertEqual(pipeline.compilation.batch_sizes, [1])
+
+    def test_restore_keeps_offload_hook(self):
+        pipeline = tiny_pipeline()
+        x = torch.randn(2, *pipeline.vae.latent_shape)
+        t = torch.full((2,), 0.5)
+        cond = pipeline.conditioner.unconditional_embedding(2)
+        with torch.no_grad():
+            reference = pipeline.model(x, t, cond)
+        pipeline.compile(backend=CountingBackend(fail=True))
+
+        # What accelerate's add_hook_to_module does, as enable_model_cpu_offload after compile()
+        model, calls = pipeline.model, []
+        model._old_forward = model.forward
+
+        def hooked(*args, **kwargs):
+            calls.append(1)
+            return model._old_forward(*args, **kwargs)
+        model.forward = hooked
+
+        with torch.no_grad():
+            torch.testing.assert_close(model(x, t, cond), reference)
+        self.assertTrue(pipeline.compilation.failed)
+        self.assertIs(model.forward, hooked)
+        self.assertEqual(model._old_forward, type(model).forward.__get__(model))
+        with torch.no_grad():
+            torch.testing.assert_close(model(x, t, cond), reference)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import torch
+
+from hy3dgen.shapegen.models.conditioner import DinoImageEncoder
+from hy3dgen.shapegen.models.denoisers.hunyuan3ddit import Hunyuan3DDiT
+from hy3dgen.shapegen.models.denoisers.hunyuandit import HunYuanDiTPlain
+
+
+def count_calls(module):
+    calls = []
+    module.register_forward_hook(lambda *args: calls.append(1))
+    return calls
+
+
+def run_steps(model, x, contexts, steps=4, **kwargs):
+    outputs = []
+    for t in torch.linspace(0.1, 0.9, steps):
+        outputs.append(model(x, t.expand(x.shape[0]), contexts, **kwargs))
+    return outputs
+
+
+class TestConditionCache(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+
+    def test_hunyuandit_parity(self):
+        # The pooler and the decoupled projection are hard-wired to 1024-d contexts
+        model = HunYuanDiTPlain(input_size=16, in_channels=4, hidden_size=64, context_dim=1024, depth=4,
+                                num_heads=4, text_len=8, with_decoupled_ca=True, decoupled_ca_dim=4,
+                                additional_cond_hidden_state=16, num_moe_layers=1, num_experts=2).eval()
+        x = torch.randn(2, 16, 4)
+        contexts = {'main': torch.randn(2, 8, 1024), 'additional': torch.randn(2, 4, 16)}
+
+        with torch.no_grad():
+            reference = run_steps(model, x, contexts)
+            to_k = count_calls(model.blocks[0].attn2.to_k)
+            with model.cache_conditions():
+                cached = run_steps(model, x, contexts)
+            self.assertEqual(len(to_k), 1)
+        for a, b in zip(reference, cached):
+            torch.testing.assert_close(a, b, atol=1e-6, rtol=0)
+
+    def test_hunyuan3ddit_parity(self):
+        model = Hunyuan3DDiT(in_channels=8, context_in_dim=16, hidden_size=64, num_heads=4, depth=2,
+                             depth_single_blocks=2, axes_dim=[16]).eval()
+        x = torch.randn(2, 10, 8)
+        contexts = {'main': torch.randn(2, 6, 16)}
+
+        with torch.no_grad():
+            reference = run_steps(model, x, contexts)
+            cond_in = count_calls(model.cond_in)
+            with model.cache_conditions():
+                cached = run_steps(model, x, contexts)
+                self.assertEqual(len(cond_in), 1)
+                # A new condition is projected again
+                run_steps(model, x, {'main': torch.randn(2, 6, 16)}, steps=1)
+                self.assertEqual(len(cond_in), 2)
+        for a, b in zip(reference, cached):
+            torch.testing.assert_close(a, b, atol=0, rtol=0)
+
+
+    def test_unconditional_embedding_is_materialized_once(self):
+        encoder = DinoImageEncoder(config={'hidden_size': 32, 'num_hidden_layers': 1, 'num_attention_heads': 2,
+                                           'intermediate_size': 64, 'image_size': 56, 'patch_size': 14},
+                                   image_size=56)
+        encoder.to(torch.float16)
+        uncond = encoder.unconditional_embedding(3)
+        self.assertEqual(tuple(uncond.shape), (3, 17, 32))
+        self.assertEqual(uncond.dtype, torch.float16)
+        self.assertFalse(uncond.any())
+        self.assertEqual(uncond.data_ptr(), encoder.uncond_embedding.data_ptr())
+        self.assertNotIn('uncond_embedding', encoder.state_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
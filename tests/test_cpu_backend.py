@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+import trimesh
+from PIL import Image
+
+from hy3dgen.shapegen import cpu_backend
+from hy3dgen.shapegen.models.autoencoders import ShapeVAE
+from hy3dgen.shapegen.models.autoencoders.volume_decoders import decode_chunks
+from hy3dgen.shapegen.pipelines import Hunyuan3DDiTFlowMatchingPipeline, instantiate_from_config
+from hy3dgen.shapegen.utils import synchronize_timer
+from tests.helpers import TINY_CONFIG
+
+
+class TestCPUBackend(unittest.TestCase):
+
+    def test_resolve_cpu_dtype(self):
+        self.assertEqual(cpu_backend.resolve_cpu_dtype(torch.float32), torch.float32)
+        with mock.patch.object(cpu_backend, 'cpu_supports_bf16', return_value=True):
+            self.assertEqual(cpu_backend.resolve_cpu_dtype(torch.float16), torch.bfloat16)
+        with mock.patch.object(cpu_backend, 'cpu_supports_bf16', return_value=False):
+            self.assertEqual(cpu_backend.resolve_cpu_dtype(torch.float16), torch.float32)
+            self.assertEqual(cpu_backend.resolve_cpu_dtype(torch.bfloat16), torch.float32)
+
+    def test_parallel_map_keeps_order_and_grad_mode(self):
+        threads = torch.get_num_threads()
+        with torch.inference_mode():
+            modes = cpu_backend.parallel_map(lambda i: (i, torch.is_inference_mode_enabled()), range(8), 3)
+        self.assertEqual(modes, [(i, True) for i in range(8)])
+        self.assertEqual(torch.get_num_threads(), threads)
+
+    def test_decode_chunks_parallel_matches_serial(self):
+        torch.manual_seed(0)
+        vae = ShapeVAE(**TINY_CONFIG['vae']['params']).eval()
+        latents = torch.randn(2, 16, 64)
+        queries = torch.rand(1000, 3) * 2 - 1
+        with torch.no_grad():
+            reference = vae.geo_decoder(queries=queries[None].expand(2, -1, -1), latents=latents)
+            for workers in (1, 3):
+                logits = decode_chunks(vae.geo_decoder, queries, latents, num_chunks=128, num_workers=workers,
+                                       enable_pbar=False)
+                torch.testing.assert_close(logits, reference, atol=1e-5, rtol=0)
+
+
+class TestCPUPipeline(unittest.TestCase):
+
+    def test_image_to_mesh(self):
+        torch.manual_seed(0)
+        components = {name: instantiate_from_config(config) for name, config in TINY_CONFIG.items()}
+        pipeline = Hunyuan3DDiTFlowMatchingPipeline(**components, device='cpu', dtype=torch.float16,
+                                                    decode_workers=2)
+        self.assertIn(pipeline.dtype, (torch.bfloat16, torch.float32))
+        self.assertEqual(pipeline.decode_workers, 2)
+
+        image = np.zeros((64, 64, 4), dtype=np.uint8)
+        image[16:48, 16:48] = 255
+        with synchronize_timer.collect() as timings:
+            mesh = pipeline(image=Image.fromarray(image), num_inference_steps=2, octree_resolution=32,
+                            num_chunks=4000, generator=torch.Generator().manual_seed(0), enable_pbar=False)[0]
+        self.assertIsInstance(mesh, trimesh.Trimesh)
+        self.assertGreater(len(mesh.faces), 0)
+        for stage in ('Diffusion Sampling', 'Volume decoding', 'Surface extraction'):
+            self.assertIn(stage, timings)
+        self.assertIsNone(synchronize_timer._collected)
+
+
+if __name__ == "__main__":
+    unittest.main()
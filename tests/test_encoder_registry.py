@@ -0,0 +1,66 @@
+import gc
+import threading
+import unittest
+
+import torch
+
+from hy3dgen.encoder_registry import EncoderRegistry, encoder_registry
+from hy3dgen.shapegen.models.conditioner import DinoImageEncoder
+from hy3dgen.shapegen.pipelines import Hunyuan3DDiTFlowMatchingPipeline, instantiate_from_config
+from tests.helpers import TINY_CONFIG
+
+ENCODER_KWARGS = TINY_CONFIG['conditioner']['params']['main_image_encoder']['kwargs']
+
+
+def tiny_encoder(seed=0):
+    torch.manual_seed(seed)
+    return DinoImageEncoder(**ENCODER_KWARGS)
+
+
+class TestEncoderRegistry(unittest.TestCase):
+
+    def test_share_deduplicates_identical_weights(self):
+        registry = EncoderRegistry()
+        a, b, c = tiny_encoder(0).model, tiny_encoder(0).model, tiny_encoder(1).model
+        self.assertIs(registry.share(a), a)
+        self.assertIs(registry.share(b), a)
+        self.assertIs(registry.share(c), c)
+        self.assertIsNot(registry.share(b.to(torch.bfloat16)), a)
+        self.assertEqual(len(registry), 3)
+        del a, b, c
+        gc.collect()
+        self.assertEqual(len(registry), 0)
+
+    def test_features_cached_per_image_within_a_job(self):
+        encoder = tiny_encoder().eval()
+        calls = []
+        encoder.model.register_forward_hook(lambda *args: calls.append(1))
+        image, other = torch.rand(1, 3, 64, 64), torch.rand(1, 3, 64, 64)
+        with torch.no_grad():
+            reference = encoder(image)
+            with encoder_registry.feature_cache():
+                first = encoder(image)
+                second = encoder(image.clone())
+                encoder(other)
+                # The scope belongs to this thread's job only
+                thread = threading.Thread(target=encoder, args=(image,))
+                thread.start()
+                thread.join()
+            encoder(image)
+        self.assertEqual(len(calls), 5)
+        torch.testing.assert_close(first, reference)
+        self.assertIs(second, first)
+
+    def test_pipelines_share_the_image_encoder(self):
+        pipelines = []
+        for _ in range(2):
+            torch.manual_seed(0)
+            components = {name: instantiate_from_config(config) for name, config in TINY_CONFIG.items()}
+            pipelines.append(Hunyuan3DDiTFlowMatchingPipeline(**components, device='cpu', dtype=torch.float32))
+        first, second = (p.conditioner.main_image_encoder for p in pipelines)
+        self.assertIsNot(first, second)
+        self.assertIs(first.model, second.model)
+
+
+if __name__ == "__main__":
+    unittest.main()
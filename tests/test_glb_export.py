@@ -0,0 +1,100 @@
+import io
+import json
+import struct
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import trimesh
+from PIL import Image
+from hy3dgen.meshops import export_ops
+
+try:
+    import DracoPy
+except ImportError:
+    DracoPy = None
+
+def parse_glb(data: bytes):
+    magic, version, total = struct.unpack("<4sII", data[:12])
+    assert magic == b"glTF" and version == 2 and total == len(data)
+    json_len = struct.unpack("<I", data[12:16])[0]
+    gltf = json.loads(data[20:20 + json_len])
+    bin_start = 20 + json_len + 8
+    return gltf, data[bin_start:]
+
+def read_accessor(gltf, binary, index, components, dtype, stride=None):
+    acc = gltf["accessors"][index]
+    bv = gltf["bufferViews"][acc["bufferView"]]
+    raw = np.frombuffer(binary, dtype=dtype, count=bv["byteLength"] // np.dtype(dtype).itemsize,
+                        offset=bv["byteOffset"])
+    width = (stride or components * np.dtype(dtype).itemsize) // np.dtype(dtype).itemsize
+    return raw.reshape(acc["count"], width)[:, :components]
+
+class TestGLBExport(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = trimesh.creation.icosphere(subdivisions=3)
+        uv = self.mesh.vertices[:, :2] * 0.5 + 0.5
+        image = Image.fromarray((np.random.rand(64, 64, 3) * 255).astype(np.uint8))
+        material = trimesh.visual.material.SimpleMaterial(image=image, diffuse=(255, 255, 255))
+        self.mesh.visual = trimesh.visual.TextureVisuals(uv=uv, material=material)
+
+    def export(self, **kwargs) -> bytes:
+        buf = io.BytesIO()
+        export_ops.export_glb(self.mesh, buf, **kwargs)
+        return buf.getvalue()
+
+    def test_uncompressed_roundtrip(self):
+        loaded = trimesh.load(io.BytesIO(self.export()), file_type="glb", force="mesh")
+        np.testing.assert_allclose(loaded.vertices, self.mesh.vertices, atol=1e-6)
+        np.testing.assert_array_equal(loaded.faces, self.mesh.faces)
+        np.testing.assert_allclose(loaded.visual.uv, self.mesh.visual.uv, atol=1e-6)
+
+    def test_quantized_positions(self):
+        gltf, binary = parse_glb(self.export(compression="quantize"))
+        self.assertIn("KHR_mesh_quantization", gltf["extensionsRequired"])
+        prim = gltf["meshes"][0]["primitives"][0]
+        acc = gltf["accessors"][prim["attributes"]["POSITION"]]
+        self.assertEqual(acc["componentType"], 5122)
+
+        q = read_accessor(gltf, binary, prim["attributes"]["POSITION"], 3, np.int16, stride=8)
+        node = gltf["nodes"][0]
+        positions = q / 32767.0 * np.array(node["scale"]) + np.array(node["translation"])
+        np.testing.assert_allclose(positions, self.mesh.vertices, atol=1e-4)
+
+        faces = read_accessor(gltf, binary, prim["indices"], 1, np.uint16).reshape(-1, 3)
+        np.testing.assert_array_equal(faces, self.mesh.faces)
+
+    def test_webp_textures(self):
+        png_size = len(self.export())
+        data = self.export(texture_format="webp", texture_quality=80)
+        gltf, _ = parse_glb(data)
+        self.assertEqual(gltf["images"][0]["mimeType"], "image/webp")
+        self.assertIn("EXT_texture_webp", gltf["extensionsRequired"])
+        self.assertLess(len(data), png_size)
+
+    def test_draco_falls_back_to_quantize(self):
+        buf = io.BytesIO()
+        with mock.patch.dict(sys.modules, {"DracoPy": None}):
+            applied = export_ops.export_glb(self.mesh, buf, compression="draco")
+        self.assertEqual(applied, "quantize")
+        gltf, _ = parse_glb(buf.getvalue())
+        self.assertIn("KHR_mesh_quantization", gltf["extensionsRequired"])
+        self.assertNotIn("KHR_draco_mesh_compression", gltf.get("extensionsUsed", []))
+
+    @unittest.skipIf(DracoPy is None, "DracoPy not installed")
+    def test_draco(self):
+        gltf, binary = parse_glb(self.export(compression="draco"))
+        prim = gltf["meshes"][0]["primitives"][0]
+        draco = prim["extensions"]["KHR_draco_mesh_compression"]
+        bv = gltf["bufferViews"][draco["bufferView"]]
+        decoded = DracoPy.decode(binary[bv["byteOffset"]:bv["byteOffset"] + bv["byteLength"]])
+
+        self.assertEqual(set(draco["attributes"]), {"POSITION", "NORMAL", "TEXCOORD_0"})
+        self.assertEqual(gltf["accessors"][prim["attributes"]["POSITION"]]["count"], len(decoded.points))
+        self.assertEqual(len(decoded.faces), len(self.mesh.faces))
+        self.assertLess(np.abs(np.linalg.norm(decoded.points, axis=1) - 1.0).max(), 1e-3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageFile
+
+from hy3dgen import image_io
+from hy3dgen.image_io import ImageTooLargeError, load_image
+
+
+def encode(image, fmt, **kwargs):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def gradient(width, height):
+    yy, xx = np.mgrid[:height, :width]
+    return Image.fromarray(np.stack([xx * 255 // width, yy * 255 // height, (xx + yy) % 256], -1).astype(np.uint8))
+
+
+class TestLoadImage(unittest.TestCase):
+
+    def test_small_image_unchanged(self):
+        image = gradient(100, 80)
+        loaded = load_image(encode(image, 'PNG'))
+        self.assertEqual(loaded.mode, 'RGB')
+        self.assertTrue(np.array_equal(np.asarray(loaded), np.asarray(image)))
+
+    def test_keeps_alpha(self):
+        rgba = np.zeros((64, 64, 4), dtype=np.uint8)
+        rgba[16:48, 16:48] = 255
+        loaded = load_image(encode(Image.fromarray(rgba), 'PNG'))
+        self.assertEqual(loaded.mode, 'RGBA')
+        self.assertTrue(np.array_equal(np.asarray(loaded), rgba))
+        self.assertEqual(load_image(encode(Image.new('P', (8, 8)), 'PNG', transparency=0)).mode, 'RGBA')
+
+    def test_jpeg_decoded_at_reduced_scale(self):
+        data = encode(gradient(4000, 3000), 'JPEG', quality=90)
+        decoded, original = [], Image.Image.convert
+
+        def convert(image, *args, **kwargs):
+            decoded.append(image.size)
+            return original(image, *args, **kwargs)
+
+        with mock.patch.object(Image.Image, 'convert', autospec=True, side_effect=convert):
+            loaded = load_image(data, max_side=512)
+        self.assertEqual(loaded.size, (512, 384))
+        # libjpeg decoded at 1/4 scale, not the full 4000x3000
+        self.assertEqual(decoded[0], (1000, 750))
+
+    def test_exif_orientation(self):
+        image = gradient(60, 40)
+        exif = image.getexif()
+        exif[0x0112] = 6
+        self.assertEqual(load_image(encode(image, 'JPEG', exif=exif)).size, (40, 60))
+
+    def test_rejects_before_decoding(self):
+        data = encode(Image.new('L', (6000, 6000)), 'PNG')
+        with mock.patch.object(ImageFile.ImageFile, 'load') as load:
+            with self.assertRaises(ImageTooLargeError):
+                load_image(data, max_pixels=4000 * 4000)
+            load.assert_not_called()
+        # Bounds what is decoded, a JPEG as large reduces below it
+        load_image(encode(Image.new('L', (6000, 6000)), 'JPEG'), max_pixels=4000 * 4000)
+        with mock.patch.object(image_io, 'MAX_IMAGE_DIMENSION', 5000):
+            with self.assertRaises(ImageTooLargeError):
+                load_image(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
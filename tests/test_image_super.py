@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from hy3dgen.texgen.utils.imagesuper_utils import tile_starts, upscale_tiled
+
+
+def nearest_x4(tiles):
+    return [tile.resize((tile.width * 4, tile.height * 4), Image.NEAREST) for tile in tiles]
+
+
+class TestTiledUpscale(unittest.TestCase):
+
+    def test_tiles_cover_image(self):
+        self.assertEqual(tile_starts(100, 128, 16), [0])
+        starts = tile_starts(300, 128, 16)
+        self.assertEqual(starts[0], 0)
+        self.assertEqual(starts[-1], 300 - 128)
+        self.assertTrue(all(b - a <= 128 - 16 for a, b in zip(starts, starts[1:])))
+
+    def test_matches_whole_image_upscale(self):
+        rng = np.random.default_rng(0)
+        images = [Image.fromarray(rng.integers(0, 256, (70, 90, c), dtype=np.uint8).squeeze())
+                  for c in (3, 4, 1)]
+        batches = []
+
+        def upscale(tiles):
+            batches.append(len(tiles))
+            return nearest_x4(tiles)
+
+        results = upscale_tiled(images, upscale, 4, tile_size=32, overlap=8, batch_size=10)
+        # 3 x 4 tiles per image, all images batched together
+        self.assertEqual(batches, [10, 10, 10, 6])
+        for image, result in zip(images, results):
+            self.assertEqual(result.mode, image.mode)
+            np.testing.assert_array_equal(np.asarray(result), np.asarray(nearest_x4([image])[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
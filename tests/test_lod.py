@@ -0,0 +1,96 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+import trimesh
+from PIL import Image
+from hy3dgen.meshops import lod_ops
+
+class TestLOD(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = trimesh.creation.icosphere(subdivisions=4)
+
+    def test_normalize_levels(self):
+        self.assertEqual(lod_ops.normalize_levels([0.25, 1.0, 0.5, 0.5, 2.0, 0.0]), [1.0, 0.5, 0.25])
+        self.assertEqual(lod_ops.normalize_levels([]), lod_ops.DEFAULT_LOD_LEVELS)
+
+    def test_generate_lod_chain(self):
+        lods = lod_ops.generate_lod_chain(self.mesh, [1.0, 0.5, 0.25, 0.1])
+        self.assertEqual(len(lods), 4)
+        self.assertIs(lods[0], self.mesh)
+        faces = [len(lod.faces) for lod in lods]
+        self.assertEqual(faces, sorted(faces, reverse=True))
+        self.assertLessEqual(faces[-1], int(len(self.mesh.faces) * 0.1) + 2)
+
+    def textured_mesh(self):
+        # Cylindrical unwrap with a seam, as split vertices like a loaded GLB has them
+        mesh = self.mesh.copy()
+        angle = np.arctan2(mesh.vertices[:, 1], mesh.vertices[:, 0])
+        uv = np.column_stack([(angle + np.pi) / (2 * np.pi), (mesh.vertices[:, 2] + 1) / 2])
+        material = trimesh.visual.material.PBRMaterial(baseColorTexture=Image.new("RGB", (8, 8), (200, 60, 30)))
+        mesh.visual = trimesh.visual.TextureVisuals(uv=uv, material=material)
+        return mesh
+
+    def test_textured_lods_keep_uvs(self):
+        mesh = self.textured_mesh()
+        lods = lod_ops.generate_lod_chain(mesh, [1.0, 0.5, 0.25, 0.1])
+        for lod in lods:
+            self.assertIsInstance(lod.visual, trimesh.visual.TextureVisuals)
+            self.assertEqual(lod.visual.uv.shape, (len(lod.vertices), 2))
+            self.assertIs(lod.visual.material, mesh.visual.material)
+            # v follows height everywhere, the collapses interpolated UVs with their vertices
+            np.testing.assert_allclose(lod.visual.uv[:, 1], (lod.vertices[:, 2] + 1) / 2, atol=0.02)
+        faces = [len(lod.faces) for lod in lods]
+        self.assertEqual(faces, sorted(faces, reverse=True))
+        self.assertLessEqual(faces[-1], int(len(mesh.faces) * 0.1) + 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lod.glb")
+            lod_ops.export_lod_glb(lods, path, compression="quantize", texture_format="jpeg")
+            with open(path, "rb") as f:
+                data = f.read()
+        gltf = json.loads(data[20:20 + struct.unpack("<I", data[12:16])[0]])
+        self.assertIn("KHR_mesh_quantization", gltf["extensionsRequired"])
+        self.assertEqual(len(gltf["images"]), 1)
+        self.assertEqual(gltf["images"][0]["mimeType"], "image/jpeg")
+        for mesh_entry in gltf["meshes"]:
+            primitive = mesh_entry["primitives"][0]
+            self.assertIn("TEXCOORD_0", primitive["attributes"])
+            self.assertEqual(primitive["material"], 0)
+        with self.assertRaises(ValueError):
+            lod_ops.export_lod_glb(lods, path, compression="zstd")
+
+    def test_decimate_below_target_is_noop(self):
+        self.assertIs(lod_ops.decimate_mesh(self.mesh, len(self.mesh.faces)), self.mesh)
+
+    def test_export_lod_glb(self):
+        lods = lod_ops.generate_lod_chain(self.mesh, [1.0, 0.5, 0.25])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lod.glb")
+            self.assertEqual(lod_ops.export_lod_glb(lods, path, [1.0, 0.5, 0.25]), "none")
+            with open(path, "rb") as f:
+                data = f.read()
+
+            magic, _, total = struct.unpack("<4sII", data[:12])
+            self.assertEqual(magic, b"glTF")
+            self.assertEqual(total, len(data))
+            json_len = struct.unpack("<I", data[12:16])[0]
+            gltf = json.loads(data[20:20 + json_len])
+
+            self.assertIn("MSFT_lod", gltf["extensionsUsed"])
+            root_id = gltf["scenes"][gltf.get("scene", 0)]["nodes"]
+            self.assertEqual(len(root_id), 1)
+            root = gltf["nodes"][root_id[0]]
+            self.assertEqual(len(root["extensions"]["MSFT_lod"]["ids"]), 2)
+            self.assertEqual(root["extras"]["MSFT_screencoverage"], [0.5, 0.25, 0.0])
+
+            # Still loadable as a regular GLB
+            loaded = trimesh.load(path, file_type="glb")
+            self.assertGreater(len(loaded.geometry), 0)
+
+if __name__ == "__main__":
+    unittest.main()
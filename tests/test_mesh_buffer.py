@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import trimesh
+from hy3dgen.meshops.mesh_buffer import MeshBuffer
+
+class TestMeshBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = trimesh.creation.icosphere(subdivisions=2)
+        self.mesh.visual = trimesh.visual.TextureVisuals(uv=self.mesh.vertices[:, :2] * 0.5 + 0.5)
+
+    def test_layout(self):
+        buf = MeshBuffer.from_trimesh(self.mesh, with_normals=True)
+        self.assertEqual(buf.vertices.dtype, np.float32)
+        self.assertEqual(buf.faces.dtype, np.int32)
+        self.assertTrue(buf.vertices.flags.c_contiguous)
+        self.assertEqual(buf.uv.shape, (len(self.mesh.vertices), 2))
+        self.assertIsNone(buf.colors)
+        with self.assertRaises(AttributeError):
+            buf.extra = 1
+
+    def test_trimesh_roundtrip_keeps_topology(self):
+        # Duplicate vertices must survive: to_trimesh never re-merges
+        faces = np.array([[0, 1, 2], [3, 4, 5]])
+        verts = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]] * 2, dtype=np.float32)
+        mesh = MeshBuffer(verts, faces).to_trimesh()
+        self.assertEqual(len(mesh.vertices), 6)
+
+        mesh = MeshBuffer.from_trimesh(self.mesh).to_trimesh()
+        np.testing.assert_array_equal(mesh.faces, self.mesh.faces)
+        np.testing.assert_allclose(mesh.visual.uv, self.mesh.visual.uv, atol=1e-6)
+
+    def test_flip_winding(self):
+        buf = MeshBuffer.from_trimesh(self.mesh)
+        np.testing.assert_array_equal(buf.flip_winding().faces, buf.faces[:, ::-1])
+
+    def test_pymeshlab_roundtrip(self):
+        buf = MeshBuffer.from_trimesh(self.mesh)
+        ms = buf.to_pymeshlab()
+        self.assertEqual(ms.current_mesh().face_number(), len(self.mesh.faces))
+        back = MeshBuffer.from_pymeshlab(ms)
+        np.testing.assert_allclose(back.vertices, buf.vertices, atol=1e-6)
+        np.testing.assert_array_equal(back.faces, buf.faces)
+        self.assertIsNone(back.colors)
+
+    def test_pymeshlab_plain_mesh_has_no_visual(self):
+        from hy3dgen.shapegen.postprocessors import DegenerateFaceRemover, pymeshlab2trimesh, trimesh2pymeshlab
+        plain = trimesh.creation.icosphere(subdivisions=2)
+        self.assertIsNone(pymeshlab2trimesh(trimesh2pymeshlab(plain)).visual.kind)
+        self.assertIsNone(DegenerateFaceRemover()(plain).visual.kind)
+
+        colored = plain.copy()
+        colored.visual = trimesh.visual.ColorVisuals(
+            colored, vertex_colors=np.random.randint(0, 255, (len(plain.vertices), 4), dtype=np.uint8))
+        back = DegenerateFaceRemover()(colored)
+        self.assertEqual(back.visual.kind, 'vertex')
+        np.testing.assert_array_equal(back.visual.vertex_colors, colored.visual.vertex_colors)
+
+    def test_save_load_mmap(self):
+        colors = np.random.randint(0, 255, (len(self.mesh.vertices), 4), dtype=np.uint8)
+        buf = MeshBuffer(self.mesh.vertices, self.mesh.faces, uv=self.mesh.visual.uv, colors=colors)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "mesh.hymb")
+            buf.save(path)
+            for mmap in (True, False):
+                loaded = MeshBuffer.load(path, mmap=mmap)
+                self.assertEqual(isinstance(loaded.vertices, np.memmap), mmap)
+                for name in ("vertices", "faces", "uv", "colors"):
+                    np.testing.assert_array_equal(getattr(loaded, name), getattr(buf, name))
+                self.assertIsNone(loaded.normals)
+                del loaded
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+
+import numpy as np
+import torch
+import trimesh
+
+from hy3dgen.texgen.differentiable_renderer.mesh_processor import meshVerticeInpaint
+from hy3dgen.texgen.differentiable_renderer.mesh_render import push_pull_fill, dilate_fill
+
+
+def reference_inpaint(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx):
+    # Scalar implementation the vectorized version replaced, kept verbatim as the oracle
+    texture_height, texture_width, texture_channel = texture.shape
+    vtx_num = vtx_pos.shape[0]
+
+    vtx_mask = np.zeros(vtx_num, dtype=np.float32)
+    vtx_color = [np.zeros(texture_channel, dtype=np.float32) for _ in range(vtx_num)]
+    uncolored_vtxs = []
+    G = [[] for _ in range(vtx_num)]
+
+    for i in range(uv_idx.shape[0]):
+        for k in range(3):
+            vtx_uv_idx = uv_idx[i, k]
+            vtx_idx = pos_idx[i, k]
+            uv_v = int(round(vtx_uv[vtx_uv_idx, 0] * (texture_width - 1)))
+            uv_u = int(round((1.0 - vtx_uv[vtx_uv_idx, 1]) * (texture_height - 1)))
+            if mask[uv_u, uv_v] > 0:
+                vtx_mask[vtx_idx] = 1.0
+                vtx_color[vtx_idx] = texture[uv_u, uv_v]
+            else:
+                uncolored_vtxs.append(vtx_idx)
+            G[pos_idx[i, k]].append(pos_idx[i, (k + 1) % 3])
+
+    smooth_count = 2
+    last_uncolored_vtx_count = 0
+    while smooth_count > 0:
+        uncolored_vtx_count = 0
+        for vtx_idx in uncolored_vtxs:
+            sum_color = np.zeros(texture_channel, dtype=np.float32)
+            total_weight = 0.0
+            vtx_0 = vtx_pos[vtx_idx]
+            for connected_idx in G[vtx_idx]:
+                if vtx_mask[connected_idx] > 0:
+                    vtx1 = vtx_pos[connected_idx]
+                    dist = np.sqrt(np.sum((vtx_0 - vtx1) ** 2))
+                    dist_weight = 1.0 / max(dist, 1e-4)
+                    dist_weight *= dist_weight
+                    sum_color += vtx_color[connected_idx] * dist_weight
+                    total_weight += dist_weight
+            if total_weight > 0:
+                vtx_color[vtx_idx] = sum_color / total_weight
+                vtx_mask[vtx_idx] = 1.0
+            else:
+                uncolored_vtx_count += 1
+
+        if last_uncolored_vtx_count == uncolored_vtx_count:
+            smooth_count -= 1
+        else:
+            smooth_count += 1
+        last_uncolored_vtx_count = uncolored_vtx_count
+
+    new_texture = texture.copy()
+    new_mask = mask.copy()
+    for face_idx in range(uv_idx.shape[0]):
+        for k in range(3):
+            vtx_uv_idx = uv_idx[face_idx, k]
+            vtx_idx = pos_idx[face_idx, k]
+            if vtx_mask[vtx_idx] == 1.0:
+                uv_v = int(round(vtx_uv[vtx_uv_idx, 0] * (texture_width - 1)))
+                uv_u = int(round((1.0 - vtx_uv[vtx_uv_idx, 1]) * (texture_height - 1)))
+                new_texture[uv_u, uv_v] = vtx_color[vtx_idx]
+                new_mask[uv_u, uv_v] = 255
+    return new_texture, new_mask
+
+
+def sphere_inputs(count, size, seed=0):
+    mesh = trimesh.creation.uv_sphere(radius=1.0, count=[count, count])
+    v = np.asarray(mesh.vertices)
+    uv = np.stack([(np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi)) % 1.0,
+                   np.arccos(np.clip(v[:, 2], -1.0, 1.0)) / np.pi], axis=-1)
+    rng = np.random.default_rng(seed)
+    texture = rng.random((size, size, 3)).astype(np.float32)
+    # A large unseen region plus scattered holes, so colors need several sweeps to propagate
+    mask = np.zeros((size, size), dtype=np.uint8)
+    mask[:, :size // 2] = 255
+    mask[rng.random((size, size)) < 0.05] = 255
+    faces = np.asarray(mesh.faces, dtype=np.int32)
+    return texture, mask, v.astype(np.float32), uv.astype(np.float32), faces, faces.copy()
+
+
+class TestMeshVerticeInpaint(unittest.TestCase):
+
+    def assert_matches_reference(self, inputs):
+        ref_texture, ref_mask = reference_inpaint(*inputs)
+        texture, mask = meshVerticeInpaint(*inputs)
+        np.testing.assert_array_equal(mask, ref_mask)
+        np.testing.assert_allclose(texture, ref_texture, rtol=0, atol=1e-5)
+
+    def test_matches_reference(self):
+        self.assert_matches_reference(sphere_inputs(24, 64))
+
+    def test_matches_reference_with_unreachable_vertices(self):
+        texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx = sphere_inputs(16, 32, seed=1)
+        # A separate component that never sees a colored texel stays unpainted
+        island = vtx_pos[:3] + 5.0
+        vtx_pos = np.concatenate([vtx_pos, island])
+        vtx_uv = np.concatenate([vtx_uv, np.full((3, 2), 0.99, dtype=np.float32)])
+        tri = np.arange(len(vtx_pos) - 3, len(vtx_pos), dtype=np.int32)[None]
+        pos_idx = np.concatenate([pos_idx, tri])
+        uv_idx = np.concatenate([uv_idx, tri])
+        self.assert_matches_reference((texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx))
+
+    def test_fully_masked_texture_is_unchanged(self):
+        texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx = sphere_inputs(8, 16)
+        mask[:] = 255
+        new_texture, new_mask = meshVerticeInpaint(texture, mask, vtx_pos, vtx_uv, pos_idx, uv_idx)
+        np.testing.assert_array_equal(new_texture, texture)
+        np.testing.assert_array_equal(new_mask, mask)
+
+
+class TestPushPullFill(unittest.TestCase):
+
+    def test_keeps_valid_texels_and_fills_holes(self):
+        torch.manual_seed(0)
+        texture = torch.rand(37, 50, 3)
+        valid = torch.rand(37, 50) < 0.3
+        valid[10:30, 5:45] = False
+        filled = push_pull_fill(texture, valid)
+        self.assertEqual(filled.shape, texture.shape)
+        torch.testing.assert_close(filled[valid], texture[valid])
+        self.assertTrue(torch.isfinite(filled).all())
+        self.assertGreaterEqual(filled.min().item(), texture[valid].min().item() - 1e-6)
+        self.assertLessEqual(filled.max().item(), texture[valid].max().item() + 1e-6)
+
+    def test_constant_texture_fills_with_constant(self):
+        texture = torch.zeros(64, 64, 3)
+        texture[..., 0] = 0.25
+        valid = torch.zeros(64, 64, dtype=torch.bool)
+        valid[60:, 60:] = True
+        filled = push_pull_fill(texture * valid[..., None], valid)
+        torch.testing.assert_close(filled, texture)
+
+    def test_dilation_grows_from_nearest_chart(self):
+        texture = torch.zeros(16, 16, 1)
+        texture[:, :4] = 1.0
+        valid = torch.zeros(16, 16, dtype=torch.bool)
+        valid[:, :4] = True
+        valid[:, 12:] = True
+        grown_texture, grown = dilate_fill(texture, valid, 2)
+        self.assertTrue(grown[:, :6].all() and grown[:, 10:].all())
+        self.assertFalse(grown[:, 6:10].any())
+        self.assertTrue((grown_texture[:, 4:6] == 1.0).all())
+        self.assertTrue((grown_texture[:, 10:12] == 0.0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import torch
+
+from hy3dgen.shapegen.models.denoisers.moe_layers import MoEBlock
+from tests.helpers import moe_infer_reference
+
+
+class TestMoEInference(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.block = MoEBlock(32, num_experts=4, moe_top_k=2, ff_inner_dim=64).eval()
+
+    def routed(self, tokens):
+        x = torch.randn(tokens, 32)
+        topk_idx, topk_weight, _ = self.block.gate(x[None])
+        return x, topk_idx.view(-1), topk_weight.view(-1, 1)
+
+    def test_paths_match_reference(self):
+        for tokens in (1, 7, 300):
+            args = self.routed(tokens)
+            reference = moe_infer_reference(self.block, *args)
+            torch.testing.assert_close(self.block.moe_infer_loop(*args), reference, atol=1e-5, rtol=1e-5)
+            if self.block.use_grouped_mm:
+                torch.testing.assert_close(self.block.moe_infer_grouped(*args), reference, atol=1e-5, rtol=1e-5)
+
+    def test_unused_experts(self):
+        x = torch.randn(5, 32)
+        indices = torch.tensor([2, 3] * 5)
+        weights = torch.rand(10, 1)
+        reference = moe_infer_reference(self.block, x, indices, weights)
+        torch.testing.assert_close(self.block.moe_infer(x, indices, weights), reference, atol=1e-5, rtol=1e-5)
+
+    def test_stacking_shares_expert_storage(self):
+        keys = set(self.block.state_dict())
+        w1, b1, w2, b2 = self.block.stacked_expert_weights()
+        self.assertEqual(tuple(w1.shape), (4, 64, 32))
+        self.assertEqual(tuple(w2.shape), (4, 32, 64))
+        self.assertEqual(self.block.experts[3].net[2].weight.data_ptr(), w2[3].data_ptr())
+        self.assertIs(self.block.stacked_expert_weights()[0], w1)
+        self.assertEqual(set(self.block.state_dict()), keys)
+
+        # Replaced parameters are stacked again
+        self.block.to(torch.float64)
+        self.assertEqual(self.block.stacked_expert_weights()[0].dtype, torch.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+import trimesh
+
+try:
+    import custom_rasterizer_kernel  # noqa: F401
+    from hy3dgen.texgen.differentiable_renderer.mesh_render import MeshRender
+except ImportError:
+    MeshRender = None
+
+ELEVS = [0, 0, 0, 0, 90, -90]
+AZIMS = [0, 90, 180, 270, 0, 180]
+
+@unittest.skipIf(MeshRender is None, "custom_rasterizer not built")
+class TestMultiviewRender(unittest.TestCase):
+
+    def setUp(self):
+        self.render = MeshRender(default_resolution=128, texture_size=128, device='cpu')
+        mesh = trimesh.creation.uv_sphere(radius=1.0, count=[32, 32])
+        v = mesh.vertices
+        uvs = np.stack([(np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi)) % 1.0,
+                        np.arccos(np.clip(v[:, 2], -1.0, 1.0)) / np.pi], axis=-1)
+        mesh.visual = trimesh.visual.TextureVisuals(uv=uvs)
+        self.render.load_mesh(mesh)
+
+    def test_matches_single_view_renders(self):
+        maps = self.render.render_normal_position_multiview(ELEVS, AZIMS, use_abs_coor=True)
+        self.assertEqual(tuple(maps.shape), (len(ELEVS), 128, 128, 6))
+        for i, (elev, azim) in enumerate(zip(ELEVS, AZIMS)):
+            normal = self.render.render_normal(elev, azim, use_abs_coor=True)
+            position = self.render.render_position(elev, azim)
+            torch.testing.assert_close(maps[i, ..., :3], normal)
+            torch.testing.assert_close(maps[i, ..., 3:], position)
+
+    def test_camera_space_normals(self):
+        maps = self.render.render_normal_position_multiview(ELEVS, AZIMS, use_abs_coor=False)
+        for i, (elev, azim) in enumerate(zip(ELEVS, AZIMS)):
+            normal = self.render.render_normal(elev, azim, use_abs_coor=False)
+            torch.testing.assert_close(maps[i, ..., :3], normal, atol=1e-5, rtol=0)
+
+    def test_fast_bake_multiview_matches_per_view(self):
+        rng = np.random.default_rng(0)
+        views = [rng.random((128, 128, 3)).astype(np.float32) for _ in ELEVS]
+        weights = [1, 0.1, 0.5, 0.1, 0.05, 0.05]
+
+        textures, cos_maps = [], []
+        for view, elev, azim, weight in zip(views, ELEVS, AZIMS, weights):
+            texture, cos_map, _ = self.render.back_project(view, elev, azim)
+            textures.append(texture)
+            cos_maps.append(weight * cos_map ** 4)
+        ref_texture, ref_mask = self.render.fast_bake_texture(textures, cos_maps)
+
+        texture, mask = self.render.fast_bake_multiview(views, ELEVS, AZIMS, weights, exp=4)
+        torch.testing.assert_close(texture, ref_texture, atol=1e-5, rtol=0)
+        self.assertTrue(torch.equal(mask, ref_mask))
+        self.assertGreater(mask.float().mean().item(), 0.5)
+
+    def test_tiled_bake_matches_fast_bake(self):
+        rng = np.random.default_rng(1)
+        views = [rng.random((128, 128, 3)).astype(np.float32) for _ in ELEVS]
+        weights = [1, 0.1, 0.5, 0.1, 0.05, 0.05]
+
+        ref_texture, ref_mask = self.render.fast_bake_multiview(views, ELEVS, AZIMS, weights)
+        for dtype in (torch.float32, torch.float16):
+            texture, mask = self.render.tiled_bake_multiview(
+                views, ELEVS, AZIMS, weights, tile_size=37, dtype=dtype)
+            self.assertEqual(texture.dtype, dtype)
+            self.assertTrue(torch.equal(mask, ref_mask))
+            atol = 1e-5 if dtype == torch.float32 else 1e-2
+            torch.testing.assert_close(texture.float(), ref_texture, atol=atol, rtol=0)
+
+    def test_fast_uv_inpaint_fills_holes(self):
+        torch.manual_seed(0)
+        texture = torch.rand(128, 128, 3)
+        mask = torch.zeros(128, 128, 1, dtype=torch.bool)
+        mask[:, :64] = True
+        filled = self.render.fast_uv_inpaint(texture, mask)
+        self.assertEqual(filled.shape, texture.shape)
+        self.assertTrue(torch.isfinite(filled).all())
+        self.assertGreaterEqual(filled.min().item(), 0.0)
+        self.assertLessEqual(filled.max().item(), 1.0)
+
+        # Only vertex texels may be rewritten inside the baked region
+        changed = (filled != texture).any(-1) & mask[..., 0]
+        self.assertLess(changed.float().sum().item(), len(self.render.uv_idx) * 3)
+
+    def test_face_visibility_and_view_plan(self):
+        from hy3dgen.texgen.utils.view_planning import CAMERA_POOL, select_views
+        elevs, azims = zip(*CAMERA_POOL)
+        coverage = self.render.face_visibility(elevs, azims, resolution=128).cpu().numpy()
+        self.assertEqual(coverage.shape, (len(CAMERA_POOL), len(self.render.pos_idx)))
+        # A view sees well under half of a sphere at a usable angle, the pool sees all of it
+        self.assertLess(coverage[0].mean(), 0.5)
+        self.assertGreater(coverage.any(0).mean(), 0.99)
+        # Opposite views see disjoint faces
+        self.assertFalse((coverage[CAMERA_POOL.index((0, 0))] & coverage[CAMERA_POOL.index((0, 180))]).any())
+
+        chosen = select_views(coverage, np.ones(coverage.shape[1]), coverage_target=0.9, max_views=8)
+        self.assertIn(0, chosen)
+        self.assertLessEqual(len(chosen), 8)
+
+    def test_rasterization_reused_for_same_mesh(self):
+        mesh = self.render.mesh_copy
+        first = self.render.render_normal_position_multiview(ELEVS, AZIMS)
+        with mock.patch.object(self.render, 'raster_rasterize', wraps=self.render.raster_rasterize) as raster:
+            # Reloading identical geometry keeps the device buffers and every view rasterization
+            self.render.load_mesh(mesh)
+            again = self.render.render_normal_position_multiview(ELEVS, AZIMS)
+            self.assertEqual(raster.call_count, 0)
+            self.assertTrue(torch.equal(first, again))
+
+            self.render.load_mesh(trimesh.creation.icosphere(subdivisions=2))
+            self.render.render_normal_position_multiview(ELEVS, AZIMS)
+            self.assertEqual(raster.call_count, len(ELEVS))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ import os
 import unittest
 from hy3dgen.meshops import tex_ops
 from hy3dgen.api.schemas import MapType
+from tests.helpers import uv_texel_rays, uv_texel_rays_loop
 
 class TestNativeTexturing(unittest.IsolatedAsyncioTestCase):
     
@@ -37,5 +38,38 @@ class TestNativeTexturing(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(img.size, (256, 256))
             print(f"Native baking verified for {mtype}: {path}")
 
+    async def test_bake_all_maps_sphere(self):
+        # Self-bake of a convex sphere: unoccluded AO and a flat tangent-space normal map
+        low = trimesh.creation.uv_sphere(radius=1.0, count=[16, 16])
+        v = low.vertices
+        uvs = np.stack([(np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi)) % 1.0,
+                        np.arccos(np.clip(v[:, 2], -1.0, 1.0)) / np.pi], axis=-1)
+        low.visual = trimesh.visual.TextureVisuals(uv=uvs)
+        maps = ["normal", "ao", "height", "curvature", "position"]
+        results = await tex_ops.bake_maps_native(low, low, maps, resolution=32,
+                                                 ray_distance=0.05, antialiasing="2x", ao_samples=4)
+
+        from PIL import Image
+        self.assertEqual(set(results), set(maps))
+        normal = np.array(Image.open(results["normal"])).reshape(-1, 3)
+        np.testing.assert_allclose(np.median(normal, axis=0), [128, 128, 255], atol=3)
+        ao = np.array(Image.open(results["ao"]))
+        self.assertGreater(np.median(ao), 250)
+
+    def test_iter_uv_texels_matches_loop(self):
+        mesh = trimesh.creation.uv_sphere(radius=1.0, count=[24, 24])
+        v = mesh.vertices
+        uvs = np.stack([(np.arctan2(v[:, 1], v[:, 0]) / (2 * np.pi)) % 1.0,
+                        np.arccos(np.clip(v[:, 2], -1.0, 1.0)) / np.pi], axis=-1)
+        args = (mesh.vertices, mesh.faces, mesh.vertex_normals, uvs, 128)
+
+        ref_origins, ref_dirs, ref_pixels = uv_texel_rays_loop(*args)
+        # Small batch budget to exercise the face batching
+        origins, dirs, pixels = uv_texel_rays(*args, batch_texels=500)
+
+        np.testing.assert_array_equal(pixels, ref_pixels)
+        np.testing.assert_allclose(origins, ref_origins, atol=1e-12)
+        np.testing.assert_allclose(dirs, ref_dirs, atol=1e-12)
+
 if __name__ == "__main__":
     unittest.main()
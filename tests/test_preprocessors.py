@@ -0,0 +1,71 @@
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from hy3dgen.shapegen.preprocessors import (ImageProcessorV2, MVImageProcessorV2, array_to_tensor,
+                                            composite_on_white, object_bbox)
+
+
+def smooth_rgba(n, center=(0.45, 0.55)):
+    yy, xx = np.mgrid[:n, :n]
+    image = np.zeros((n, n, 4), dtype=np.uint8)
+    image[..., 0] = xx * 255 // n
+    image[..., 1] = yy * 255 // n
+    image[..., 2] = 128 + 100 * np.sin(xx / n * 20)
+    ellipse = (yy - n * center[0]) ** 2 / (0.3 * n) ** 2 + (xx - n * center[1]) ** 2 / (0.2 * n) ** 2
+    image[..., 3] = np.clip((1.2 - ellipse) * 600, 0, 255).astype(np.uint8)
+    return image
+
+
+def two_pass(processor, image, border_ratio=0.15):
+    # The recenter-then-resize path the single-resample one replaces
+    image, mask = processor.recenter(image, border_ratio=border_ratio)
+    image = cv2.resize(image, (processor.size, processor.size), interpolation=cv2.INTER_CUBIC)
+    return array_to_tensor(image)
+
+
+class TestImageProcessorV2(unittest.TestCase):
+
+    def test_object_bbox(self):
+        mask = np.zeros((40, 30), dtype=np.uint8)
+        mask[5:12, 7:20] = 3
+        self.assertEqual(object_bbox(mask), (5, 11, 7, 19))
+        with self.assertRaises(ValueError):
+            object_bbox(np.zeros((4, 4), dtype=np.uint8))
+
+    def test_composite_on_white(self):
+        image = np.random.default_rng(0).integers(0, 256, (64, 64, 4), dtype=np.uint8)
+        alpha = image[..., 3:] / 255
+        expected = np.rint(image[..., :3] * alpha + 255 * (1 - alpha))
+        self.assertLessEqual(np.abs(composite_on_white(image) - expected).max(), 1)
+
+    def test_matches_two_pass_recenter(self):
+        processor = ImageProcessorV2(size=256)
+        for n in (200, 1024):
+            image = smooth_rgba(n)
+            outputs = processor(Image.fromarray(image))
+            self.assertEqual(outputs['image'].shape, (1, 3, 256, 256))
+            self.assertEqual(outputs['mask'].shape, (1, 1, 256, 256))
+            diff = (outputs['image'] - two_pass(processor, image)).abs() * 127.5
+            self.assertLess(diff.mean().item(), 1.0)
+
+        rgb = smooth_rgba(300)[..., :3]
+        image, mask = processor.load_image(Image.fromarray(rgb), to_tensor=False)
+        self.assertEqual(image.shape, (256, 256, 3))
+        self.assertEqual(mask.shape, (256, 256, 1))
+        self.assertEqual(mask.max(), 255)
+
+    def test_multiview_batch(self):
+        processor = MVImageProcessorV2(size=128)
+        views = {'back': smooth_rgba(300, (0.5, 0.5)), 'front': smooth_rgba(200), 'left': smooth_rgba(400)}
+        outputs = processor({tag: Image.fromarray(view) for tag, view in views.items()})
+        self.assertEqual(outputs['view_idxs'], (0, 1, 2))
+        self.assertEqual(outputs['image'].shape, (1, 3, 3, 128, 128))
+        single = ImageProcessorV2(size=128)(Image.fromarray(views['back']))['image']
+        self.assertTrue(outputs['image'][0, 2].equal(single[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.nn as nn
+import yaml
+
+from hy3dgen.quantization import Int8Linear, quantize_model, quantized_layers
+from hy3dgen.shapegen.models.autoencoders import CrossAttentionDecoder, ShapeVAE
+from hy3dgen.shapegen.models.denoisers.hunyuan3ddit import Hunyuan3DDiT
+from hy3dgen.shapegen.models.denoisers.hunyuandit import HunYuanDiTPlain
+from hy3dgen.shapegen.pipelines import Hunyuan3DDiTFlowMatchingPipeline
+
+MODEL_PARAMS = dict(in_channels=8, context_in_dim=16, hidden_size=64, num_heads=4, depth=2,
+                    depth_single_blocks=2, axes_dim=[16])
+VAE_PARAMS = dict(num_latents=16, embed_dim=8, width=64, heads=4, num_decoder_layers=1,
+                  num_encoder_layers=1, pc_size=64, pc_sharpedge_size=0)
+
+
+def relative_error(a, b):
+    return ((a - b).norm() / b.norm()).item()
+
+
+class TestInt8Linear(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+
+    def test_matches_linear(self):
+        linear = nn.Linear(256, 128)
+        quantized = Int8Linear.from_linear(linear)
+        self.assertEqual(quantized.qweight.dtype, torch.int8)
+        self.assertLess(relative_error(quantized.weight, linear.weight.detach()), 1e-2)
+
+        x = torch.randn(3, 7, 256)
+        with torch.no_grad():
+            reference = linear(x)
+            for dtype, tolerance in ((torch.float32, 1e-2), (torch.bfloat16, 2e-2)):
+                out = quantized.to(dtype)(x.to(dtype))
+                self.assertEqual(out.dtype, dtype)
+                self.assertEqual(out.shape, reference.shape)
+                self.assertLess(relative_error(out.float(), reference), tolerance)
+
+    def test_denoisers_parity(self):
+        cases = [
+            (Hunyuan3DDiT(**MODEL_PARAMS),
+             lambda m: m(torch.randn(2, 10, 8), torch.full((2,), 0.5), {'main': torch.randn(2, 6, 16)})),
+            # The pooler and the decoupled projection are hard-wired to 1024-d contexts
+            (HunYuanDiTPlain(input_size=16, in_channels=4, hidden_size=64, context_dim=1024, depth=2,
+                             num_heads=4, text_len=8, num_moe_layers=1, num_experts=2),
+             lambda m: m(torch.randn(2, 16, 4), torch.full((2,), 0.5), {'main': torch.randn(2, 8, 1024)})),
+        ]
+        for model, run in cases:
+            model.eval()
+            with torch.no_grad():
+                torch.manual_seed(1)
+                reference = run(model)
+                self.assertGreater(len(quantize_model(model, min_features=1)), 0)
+                self.assertFalse(any(isinstance(m, nn.Linear) for m in model.modules()))
+                torch.manual_seed(1)
+                self.assertLess(relative_error(run(model), reference), 3e-2)
+
+    def test_include_limits_scope(self):
+        vae = ShapeVAE(**VAE_PARAMS).eval()
+        names = quantize_model(vae, include=('CrossAttentionDecoder',), min_features=1)
+        self.assertTrue(names)
+        self.assertTrue(all(name.startswith('geo_decoder.') for name in names))
+        self.assertIsInstance(vae.post_kl, nn.Linear)
+        self.assertIsInstance(vae.geo_decoder, CrossAttentionDecoder)
+
+
+class TestQuantizedCheckpoint(unittest.TestCase):
+
+    def write_config(self, path):
+        config = {
+            'model': {'target': 'hy3dgen.shapegen.models.denoisers.hunyuan3ddit.Hunyuan3DDiT',
+                      'params': MODEL_PARAMS},
+            'vae': {'target': 'hy3dgen.shapegen.models.autoencoders.ShapeVAE', 'params': VAE_PARAMS},
+            'conditioner': {'target': 'torch.nn.Linear', 'params': {'in_features': 4, 'out_features': 4}},
+            'image_processor': {'target': 'hy3dgen.shapegen.preprocessors.ImageProcessorV2',
+                                'params': {'size': 64}},
+            'scheduler': {'target': 'hy3dgen.shapegen.schedulers.FlowMatchEulerDiscreteScheduler',
+                          'params': {'num_train_timesteps': 1000}},
+        }
+        with open(path, 'w') as f:
+            yaml.safe_dump(config, f)
+
+    def test_save_and_reload(self):
+        import safetensors.torch
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.yaml')
+            self.write_config(config_path)
+            # Float checkpoint as the upstream release ships it
+            torch.manual_seed(0)
+            model = Hunyuan3DDiT(**MODEL_PARAMS)
+            vae = ShapeVAE(**VAE_PARAMS)
+            conditioner = nn.Linear(4, 4)
+            state_dict = {f'{name}.{key}': value for name, module in
+                          (('model', model), ('vae', vae), ('conditioner', conditioner))
+                          for key, value in module.state_dict().items()}
+            float_path = os.path.join(tmp, 'model.fp16.safetensors')
+            safetensors.torch.save_file(state_dict, float_path)
+
+            pipeline = Hunyuan3DDiTFlowMatchingPipeline.from_single_file(
+                float_path, config_path, device='cpu', dtype=torch.float32, use_safetensors=True,
+                quantization='int8')
+            self.assertEqual(pipeline.quantization, 'int8')
+            self.assertTrue(quantized_layers(pipeline.model))
+            self.assertTrue(all(name.startswith('geo_decoder.') for name in quantized_layers(pipeline.vae)))
+
+            int8_path = os.path.join(tmp, 'model.int8.safetensors')
+            pipeline.save_quantized(int8_path)
+            self.assertLess(os.path.getsize(int8_path), os.path.getsize(float_path))
+
+            reloaded = Hunyuan3DDiTFlowMatchingPipeline.from_single_file(
+                int8_path, config_path, device='cpu', dtype=torch.float32, use_safetensors=True)
+            self.assertEqual(reloaded.quantization, 'int8')
+            self.assertEqual(quantized_layers(reloaded.model), quantized_layers(pipeline.model))
+            for a, b in zip(pipeline.model.state_dict().values(), reloaded.model.state_dict().values()):
+                self.assertTrue(torch.equal(a, b))
+
+            x, t, cond = torch.randn(1, 10, 8), torch.full((1,), 0.5), {'main': torch.randn(1, 6, 16)}
+            with torch.no_grad():
+                torch.testing.assert_close(reloaded.model(x, t, cond), pipeline.model(x, t, cond))
+
+
+if __name__ == "__main__":
+    unittest.main()
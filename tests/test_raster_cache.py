@@ -0,0 +1,70 @@
+import sys
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+import trimesh
+
+from hy3dgen.texgen.differentiable_renderer.mesh_render import MeshRender
+from hy3dgen.texgen.pipelines import Hunyuan3DTexGenConfig
+
+
+def fake_rasterize(pos, tri, resolution):
+    height, width = resolution
+    return torch.ones(height, width, dtype=torch.int32), torch.zeros(height, width, 3)
+
+
+def textured_box(extent):
+    mesh = trimesh.creation.box(extents=extent)
+    mesh.visual = trimesh.visual.TextureVisuals(uv=np.abs(mesh.vertices[:, :2]) / extent[0] * 2)
+    return mesh
+
+
+class TestRasterCache(unittest.TestCase):
+    """Replays the rasterizations of a texturing job without the custom_rasterizer kernel."""
+
+    def setUp(self):
+        self.config = Hunyuan3DTexGenConfig('delight', 'multiview', 'hunyuan3d-paint-v2-0')
+        stub = types.SimpleNamespace(rasterize=fake_rasterize)
+        with mock.patch.dict(sys.modules, {'custom_rasterizer': stub}):
+            self.render = MeshRender(default_resolution=16, texture_size=32, device='cpu',
+                                     raster_cache_size=self.config.view_raster_cache_size())
+
+    def run_job(self, mesh, unwrapped, texture_size=32):
+        elevs, azims = self.config.candidate_camera_elevs, self.config.candidate_camera_azims
+        for geometry in (mesh, unwrapped):
+            # Control maps on the input mesh, back-projection on the unwrapped one
+            self.render.load_mesh(geometry)
+            pos_clip = torch.zeros(len(elevs), len(geometry.vertices), 4)
+            self.render.rasterize_views(pos_clip, elevs, azims, (16, 16))
+        return self.render.uv_coverage(resolution=(texture_size, texture_size))
+
+    def test_second_identical_job_rasterizes_nothing(self):
+        mesh, unwrapped = textured_box([1, 1, 1]), textured_box([1, 2, 1])
+        with mock.patch.object(self.render, 'raster_rasterize', wraps=self.render.raster_rasterize) as raster:
+            first = self.run_job(mesh, unwrapped)
+            self.assertEqual(raster.call_count, 2 * len(self.config.candidate_camera_azims) + 1)
+            again = self.run_job(mesh, unwrapped)
+            self.assertEqual(raster.call_count, 2 * len(self.config.candidate_camera_azims) + 1)
+        self.assertTrue(torch.equal(first, again))
+        self.assertEqual(first.dtype, torch.bool)
+
+    def test_large_atlas_coverage_not_kept(self):
+        mesh, unwrapped = textured_box([1, 1, 1]), textured_box([1, 2, 1])
+        self.render.coverage_cache_max_side = 32
+        self.run_job(mesh, unwrapped)
+        with mock.patch.object(self.render, 'raster_rasterize', wraps=self.render.raster_rasterize) as raster:
+            self.run_job(mesh, unwrapped)
+            self.assertEqual(raster.call_count, 1)
+
+    def test_cache_sized_from_views(self):
+        self.config.max_views = 8
+        self.assertEqual(self.config.view_raster_cache_size(), 16)
+        self.config.raster_cache_size = 4
+        self.assertEqual(self.config.view_raster_cache_size(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+try:
+    import rembg
+    from hy3dgen.rembg import BackgroundRemover, has_transparency
+except ImportError:
+    rembg = None
+
+
+def disc(radius, color):
+    yy, xx = np.mgrid[:256, :256]
+    image = np.full((256, 256, 3), 255, dtype=np.uint8)
+    image[(yy - 128) ** 2 + (xx - 128) ** 2 < radius ** 2] = color
+    return Image.fromarray(image)
+
+
+@unittest.skipIf(rembg is None, "rembg not installed")
+class TestBackgroundRemover(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.remover = BackgroundRemover(model_name='u2netp', num_threads=2)
+
+    def test_transparent_images_pass_through(self):
+        image = disc(60, (200, 50, 50)).convert('RGBA')
+        self.assertFalse(has_transparency(image))
+        image.putalpha(Image.fromarray(np.where(np.asarray(image)[..., 0] == 255, 0, 255).astype(np.uint8)))
+        self.assertTrue(has_transparency(image))
+        output = self.remover(image)
+        np.testing.assert_array_equal(np.asarray(output), np.asarray(image))
+
+    def test_batch_matches_single_and_is_cached(self):
+        images = [disc(r, c) for r, c in ((40, (200, 50, 50)), (80, (50, 200, 50)), (100, (50, 50, 200)))]
+        expected = [rembg.remove(image, session=self.remover.session, bgcolor=[255, 255, 255, 0])
+                    for image in images]
+        outputs = self.remover.remove_batch(images + [images[0]])
+        for output, reference in zip(outputs, expected + expected[:1]):
+            self.assertEqual(output.mode, 'RGBA')
+            diff = np.abs(np.asarray(output, dtype=np.int16) - np.asarray(reference, dtype=np.int16))
+            self.assertLessEqual(diff.max(), 2)
+        self.assertEqual(len(self.remover._cache), 3)
+        again = self.remover(images[1])
+        np.testing.assert_array_equal(np.asarray(again), np.asarray(outputs[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
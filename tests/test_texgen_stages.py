@@ -0,0 +1,129 @@
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+import trimesh
+from PIL import Image
+
+from hy3dgen.texgen import pipelines
+from hy3dgen.texgen.pipelines import Hunyuan3DPaintPipeline, StageTimer
+
+
+class FakeRender:
+    def __init__(self):
+        self.loaded = []
+
+    def load_mesh(self, mesh):
+        self.loaded.append(len(mesh.vertices))
+
+    def set_texture(self, texture):
+        self.texture = texture
+
+    def save_mesh(self):
+        return "textured"
+
+
+class TestPaintPipelineStages(unittest.TestCase):
+
+    def make_pipeline(self, events):
+        pipe = Hunyuan3DPaintPipeline.__new__(Hunyuan3DPaintPipeline)
+        pipe.config = mock.Mock(candidate_camera_elevs=[0, 0], candidate_camera_azims=[0, 90],
+                                candidate_view_weights=[1, 0.5], render_size=8,
+                                merge_method='fast', uv_unwrap_options=None, upscale='off')
+        pipe.render = FakeRender()
+        geometry_started = threading.Event()
+
+        def delight(image):
+            # The control-map renders must already be running while the delight model works
+            events.append(('delight', geometry_started.wait(5)))
+            return image
+
+        def render_geometry(elevs, azims, use_abs_coor=True):
+            geometry_started.set()
+            time.sleep(0.05)
+            return [Image.new('RGB', (8, 8))] * 2, [Image.new('RGB', (8, 8))] * 2
+
+        def multiview(images, control, camera_info, **kwargs):
+            events.append(('multiview', len(control)))
+            return [Image.new('RGB', (4, 4)) for _ in camera_info]
+
+        pipe.models = {'delight_model': delight, 'multiview_model': multiview}
+        pipe.render_geometry_multiview = render_geometry
+        pipe.bake_from_multiview = lambda *args, **kwargs: ('texture', 'mask')
+        pipe.texture_inpaint = lambda texture, mask: texture
+        return pipe
+
+    def test_geometry_overlaps_delight_and_uv_joins_before_bake(self):
+        events = []
+        pipe = self.make_pipeline(events)
+        mesh = trimesh.creation.box()
+        with mock.patch.object(pipelines, 'submit_mesh_uv_wrap') as submit, \
+                mock.patch.object(pipelines, 'apply_mesh_uv_wrap') as apply:
+            future = Future()
+            future.set_result(None)
+            submit.return_value = (mesh, future)
+            apply.side_effect = lambda m, f: m
+            result = pipe(mesh, Image.new('RGBA', (8, 8), (255, 0, 0, 255)))
+
+        self.assertEqual(result, "textured")
+        self.assertEqual(events, [('delight', True), ('multiview', 4)])
+        apply.assert_called_once_with(mesh, future)
+        # Geometry loaded once for the control maps and once more with the unwrapped UVs
+        self.assertEqual(len(pipe.render.loaded), 2)
+        self.assertEqual(set(pipe.stage_timings['stages']),
+                         {'uv_unwrap', 'geometry_render', 'delight', 'multiview_diffusion',
+                          'upscale', 'uv_join', 'bake', 'inpaint'})
+
+
+class FakeSuperModel:
+    scale = 4
+
+    def __init__(self):
+        self.calls = []
+
+    def upscale(self, images):
+        self.calls.append([image.size for image in images])
+        return [image.resize((image.width * 4, image.height * 4), Image.NEAREST) for image in images]
+
+
+class TestUpscaleViews(unittest.TestCase):
+
+    def make_pipeline(self):
+        pipe = Hunyuan3DPaintPipeline.__new__(Hunyuan3DPaintPipeline)
+        pipe.config = mock.Mock(render_size=64)
+        pipe.models = {'super_model': FakeSuperModel()}
+        return pipe
+
+    def test_off_only_resizes(self):
+        pipe = self.make_pipeline()
+        views = pipe.upscale_views([Image.new('RGB', (16, 16))] * 3, 'off')
+        self.assertEqual([v.size for v in views], [(64, 64)] * 3)
+        self.assertEqual(pipe.models['super_model'].calls, [])
+
+    def test_all_views_go_through_one_upscale_call(self):
+        pipe = self.make_pipeline()
+        views = pipe.upscale_views([Image.new('RGB', (16, 16))] * 3, '4x')
+        self.assertEqual(pipe.models['super_model'].calls, [[(16, 16)] * 3])
+        self.assertEqual([v.size for v in views], [(64, 64)] * 3)
+
+        pipe.upscale_views([Image.new('RGB', (16, 16))] * 3, '2x')
+        self.assertEqual(pipe.models['super_model'].calls[-1], [(8, 8)] * 3)
+        with self.assertRaises(ValueError):
+            pipe.upscale_views([Image.new('RGB', (16, 16))], '3x')
+
+
+class TestStageTimer(unittest.TestCase):
+
+    def test_reports_overlap(self):
+        timer = StageTimer()
+        timer.record('a', timer.origin, timer.origin + 1.0)
+        timer.record('b', timer.origin + 0.5, timer.origin + 1.5)
+        report = timer.report()
+        self.assertAlmostEqual(report['serial'], 2.0)
+        self.assertEqual(report['stages']['b'], (0.5, 1.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
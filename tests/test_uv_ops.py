@@ -0,0 +1,69 @@
+import os
+import signal
+import unittest
+from unittest import mock
+
+import numpy as np
+import trimesh
+
+from hy3dgen.meshops import uv_ops
+
+def fake_unwrap(vertices, faces, options):
+    return np.arange(len(vertices), dtype=np.uint32), faces.reshape(-1), np.zeros((len(vertices), 2), np.float32)
+
+class TestUVOps(unittest.TestCase):
+
+    def setUp(self):
+        uv_ops.clear_cache()
+        self.mesh = trimesh.creation.box(extents=[2, 2, 2])
+
+    def test_normalize_options(self):
+        opts = uv_ops.normalize_options({"padding": 4, "brute_force": 1, "resolution": None})
+        self.assertEqual(opts["padding"], 4)
+        self.assertIs(opts["brute_force"], True)
+        self.assertEqual(opts["resolution"], uv_ops.DEFAULT_UNWRAP_OPTIONS["resolution"])
+        with self.assertRaises(ValueError):
+            uv_ops.normalize_options({"texels": 3})
+
+    def test_geometry_hash(self):
+        v, f = self.mesh.vertices, self.mesh.faces
+        key = uv_ops.geometry_hash(v, f)
+        self.assertEqual(key, uv_ops.geometry_hash(v.copy(), f.copy(), {}))
+        self.assertNotEqual(key, uv_ops.geometry_hash(v + 1e-3, f))
+        self.assertNotEqual(key, uv_ops.geometry_hash(v, f, {"padding": 2}))
+
+    def test_unwrap_mesh_and_cache(self):
+        opts = {"padding": 2, "resolution": 256}
+        mesh = uv_ops.unwrap_mesh(self.mesh, opts)
+        self.assertEqual(len(mesh.faces), len(self.mesh.faces))
+        self.assertEqual(mesh.visual.uv.shape, (len(mesh.vertices), 2))
+        self.assertTrue(((mesh.visual.uv >= 0) & (mesh.visual.uv <= 1)).all())
+        np.testing.assert_allclose(mesh.triangles, self.mesh.triangles, atol=1e-6)
+
+        # Same geometry and options resolve from the cache without touching the pool
+        with mock.patch.object(uv_ops, "_uv_pool", side_effect=AssertionError("pool used")):
+            future = uv_ops.submit_unwrap(self.mesh.vertices, self.mesh.faces, opts)
+            self.assertTrue(future.done())
+            cached = uv_ops.apply_uvs(self.mesh, future.result())
+        np.testing.assert_array_equal(cached.visual.uv, mesh.visual.uv)
+        # Hits hand out copies, mutating one leaves the cache intact
+        future.result()[2][:] = -1
+        np.testing.assert_array_equal(uv_ops.unwrap(self.mesh.vertices, self.mesh.faces, opts)[2],
+                                      mesh.visual.uv)
+
+    @unittest.skipIf(os.name == "nt", "needs SIGKILL")
+    def test_recovers_from_dead_worker(self):
+        # Workers run a stand-in for xatlas, the test is about the pool
+        with mock.patch.object(uv_ops, "_unwrap", fake_unwrap):
+            uv_ops.unwrap(self.mesh.vertices, self.mesh.faces)
+            pool = uv_ops._uv_pool()
+            self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+            for process in list(pool._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+            uv_ops.clear_cache()
+            vmapping, indices, uvs = uv_ops.unwrap(self.mesh.vertices, self.mesh.faces)
+        np.testing.assert_array_equal(indices, self.mesh.faces.reshape(-1))
+        self.assertIsNot(uv_ops._uv_pool(), pool)
+
+if __name__ == "__main__":
+    unittest.main()
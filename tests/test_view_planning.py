@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from hy3dgen.texgen.utils.view_planning import CAMERA_POOL, get_camera_info, get_view_weight, select_views
+
+
+class TestViewPlanning(unittest.TestCase):
+
+    def test_default_views_keep_their_weights_and_ids(self):
+        elevs = [0, 0, 0, 0, 90, -90]
+        azims = [0, 90, 180, 270, 0, 180]
+        weights = [get_view_weight(e, a) for e, a in zip(elevs, azims)]
+        np.testing.assert_allclose(weights, [1, 0.1, 0.5, 0.1, 0.05, 0.05])
+        self.assertEqual(get_camera_info(elevs, azims), [21, 12, 15, 18, 43, 37])
+
+    def test_pool_has_camera_ids(self):
+        elevs, azims = zip(*CAMERA_POOL)
+        ids = get_camera_info(elevs, azims)
+        self.assertEqual(len(set(ids)), len(CAMERA_POOL))
+
+    def test_greedy_cover_stops_at_target(self):
+        # 4 candidates over 10 unit-area faces; 0 and 2 together cover everything
+        coverage = np.zeros((4, 10), dtype=bool)
+        coverage[0, :5] = True
+        coverage[1, 3:7] = True
+        coverage[2, 5:] = True
+        coverage[3, :2] = True
+        chosen = select_views(coverage, np.ones(10), coverage_target=1.0, max_views=4)
+        self.assertEqual(chosen, [0, 2])
+
+    def test_greedy_cover_respects_max_views_and_area(self):
+        coverage = np.eye(4, dtype=bool)
+        areas = np.array([1.0, 5.0, 2.0, 0.5])
+        chosen = select_views(coverage, areas, coverage_target=1.0, max_views=3, required=[0])
+        self.assertEqual(chosen, [0, 1, 2])
+        self.assertEqual(select_views(coverage, areas, coverage_target=0.5, max_views=6, required=[0]), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()